@@ -1,13 +1,29 @@
 import os
+import time
 import aiohttp
 from typing import Optional
 from dotenv import load_dotenv
 
+from util.geocode_cache import MISSING, get_cache
+from util.metrics import record_http
+
 load_dotenv()
 API_KEY = os.getenv("JUSO_API_KEY")
 API_URL = os.getenv("JUSO_API_URL")
+CACHE_NAMESPACE = "juso"
+
+async def fetch_road_address(session, lotno_addr: str, limiter=None) -> Optional[str]:
+    """limiter는 캐시에 없어서 실제로 호출할 때만 잡음 (캐시 적중은 토큰을 쓰지 않음)"""
+    cached = get_cache().get(CACHE_NAMESPACE, lotno_addr)
+    if cached is not MISSING:
+        return cached
+    if limiter is None:
+        return await _request_road_address(session, lotno_addr)
+    async with limiter:
+        return await _request_road_address(session, lotno_addr)
+
 
-async def fetch_road_address(session, lotno_addr: str) -> Optional[str]:
+async def _request_road_address(session, lotno_addr: str) -> Optional[str]:
     params = {
         "confmKey": API_KEY,
         "currentPage": 1,
@@ -16,11 +32,19 @@ async def fetch_road_address(session, lotno_addr: str) -> Optional[str]:
         "resultType": "json"
     }
 
+    started = time.perf_counter()
+    status = "error"
     try:
         async with session.get(API_URL, params=params, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            status = resp.status
             data = await resp.json()
-            if data["results"]["common"]["errorCode"] == "0" and data["results"]["juso"]:
-                return data["results"]["juso"][0]["roadAddr"]
+            if data["results"]["common"]["errorCode"] == "0":
+                juso = data["results"]["juso"]
+                road = juso[0]["roadAddr"] if juso else None
+                get_cache().set(CACHE_NAMESPACE, lotno_addr, road)
+                return road
     except Exception as e:
         print(f"실패 {lotno_addr} → {e}")
-    return None
\ No newline at end of file
+    finally:
+        record_http("juso", status, time.perf_counter() - started)
+    return None
@@ -1,25 +1,98 @@
+import os
+import time
+
+import aiohttp
 import requests
 from typing import Union, Tuple
 
+from util.geocode_cache import MISSING, get_cache
+from util.metrics import record_http
+
+KAKAO_API_URL = os.getenv("KAKAO_API_URL", "https://dapi.kakao.com/v2/local/search/address.json")
+CACHE_NAMESPACE = "kakao"
+
+
+def _cached_coordinates(address: str):
+    cached = get_cache().get(CACHE_NAMESPACE, address)
+    if cached is MISSING:
+        return MISSING
+    if cached is None:
+        return None, None
+    return cached[0], cached[1]
+
 
 def get_coordinates(address: str, api_key: str) -> Union[Tuple[float, float], Tuple[None, None]]:
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
+    cached = _cached_coordinates(address)
+    if cached is not MISSING:
+        return cached
+
+    url = KAKAO_API_URL
     headers = {
         "Authorization": f"KakaoAK {api_key}"
     }
+    started = time.perf_counter()
+    status = "error"
     try:
         print(f"요청 주소: {address}")
 
         res = requests.get(url, headers=headers, params={"query": address}, timeout=5)
+        status = res.status_code
 
         res.raise_for_status()
         data = res.json()
         if data['documents']:
             doc = data['documents'][0]
-            return float(doc['y']), float(doc['x'])
+            lat, lng = float(doc['y']), float(doc['x'])
+            get_cache().set(CACHE_NAMESPACE, address, [lat, lng])
+            return lat, lng
         else:
             print("좌표 반환 실패")
+            get_cache().set(CACHE_NAMESPACE, address, None)
             return None, None
     except Exception as e:
         print(f"예외 : {e}")
         return None, None
+    finally:
+        record_http("kakao", status, time.perf_counter() - started)
+
+
+async def fetch_coordinates(session, address: str, api_key: str,
+                            limiter=None) -> Union[Tuple[float, float], Tuple[None, None]]:
+    """
+    get_coordinates의 비동기 버전. 공유 aiohttp 세션(keep-alive)을 그대로 사용함.
+    limiter(TokenBucketRateLimiter)는 캐시에 없어서 실제로 호출할 때만 잡음
+    → 캐시 적중은 토큰/in-flight 슬롯을 쓰지 않음
+    """
+    cached = _cached_coordinates(address)
+    if cached is not MISSING:
+        return cached
+    if limiter is None:
+        return await _request_coordinates(session, address, api_key)
+    async with limiter:
+        return await _request_coordinates(session, address, api_key)
+
+
+async def _request_coordinates(session, address: str, api_key: str):
+    headers = {
+        "Authorization": f"KakaoAK {api_key}"
+    }
+    started = time.perf_counter()
+    status = "error"
+    try:
+        async with session.get(KAKAO_API_URL, headers=headers, params={"query": address},
+                               timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            status = resp.status
+            resp.raise_for_status()
+            data = await resp.json()
+            if data['documents']:
+                doc = data['documents'][0]
+                lat, lng = float(doc['y']), float(doc['x'])
+                get_cache().set(CACHE_NAMESPACE, address, [lat, lng])
+                return lat, lng
+            get_cache().set(CACHE_NAMESPACE, address, None)
+            return None, None
+    except Exception as e:
+        print(f"예외 : {address} → {e}")
+        return None, None
+    finally:
+        record_http("kakao", status, time.perf_counter() - started)
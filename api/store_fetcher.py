@@ -1,55 +1,208 @@
 import asyncio
 import logging
+import math
 import os
+import random
+import time
+from collections import deque
 
-from aiohttp import ClientTimeout
+from aiohttp import ClientResponseError, ClientTimeout
+
+from util.metrics import inc, record_http
 
 API_URL = os.getenv("OPEN_API_URL")
-TIMEOUT = ClientTimeout(total=100)
+# 시도 1회당 제한 시간 - 한 요청이 semaphore를 오래 붙잡지 않도록 짧게, 대신 재시도
+TIMEOUT = ClientTimeout(total=float(os.getenv("OPEN_API_TIMEOUT", "30")))
+MAX_RETRIES = int(os.getenv("OPEN_API_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("OPEN_API_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX = float(os.getenv("OPEN_API_BACKOFF_MAX", "30"))
+NUM_OF_ROWS = 1500
 MAX_CONCURRENCY = 10
+MAX_CONSECUTIVE_FAILURES = 3
+PAGE_PREFETCH = max(1, int(os.getenv("OPEN_API_PAGE_PREFETCH", str(MAX_CONCURRENCY))))
 SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENCY)
 
 logger = logging.getLogger(__name__)
 
 
-async def fetch_page(session, instt_code, page, semaphore):
+class PageFetchError(Exception):
+    """재시도를 모두 소진해도 페이지를 받지 못함"""
+
+    def __init__(self, instt_code, page, reason):
+        super().__init__(f"기관코드: {instt_code}, 페이지: {page} - {reason}")
+        self.instt_code = instt_code
+        self.page = page
+        self.reason = reason
+
+
+def _retryable(e):
+    if isinstance(e, ClientResponseError):
+        return e.status == 429 or e.status >= 500
+    return True  # 타임아웃/연결 오류 등
+
+
+def _backoff(attempt, e):
+    """지수 백오프 + full jitter. 429/503의 Retry-After가 있으면 그만큼은 기다림"""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    if isinstance(e, ClientResponseError) and e.headers:
+        try:
+            delay = max(delay, float(e.headers.get("Retry-After", 0)))
+        except (TypeError, ValueError):
+            pass
+    return delay
+
+
+async def fetch_page_body(session, instt_code, page, semaphore):
+    """응답의 body 전체를 반환 (items, totalCount 등). 재시도 후에도 실패하면 PageFetchError"""
     params = {
         "serviceKey": os.getenv("OPEN_API_KEY_PUBLIC"),
         "pageNo": page,
-        "numOfRows": 1500,
+        "numOfRows": NUM_OF_ROWS,
         "type": "json",
         "instt_code": instt_code
     }
 
-    async with semaphore:
-        try:
-            async with session.get(API_URL, params=params, timeout=TIMEOUT) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("response", {}).get("body", {}).get("items", [])
-        except asyncio.TimeoutError:
-            logger.error(f"TimeoutError - 기관코드: {instt_code}, 페이지: {page}")
-        except Exception as e:
-            logger.exception(f"기타 오류 발생 - 기관코드: {instt_code}, 페이지: {page} - {e}")
-        return []
+    for attempt in range(MAX_RETRIES + 1):
+        async with semaphore:
+            started = time.perf_counter()
+            status = "error"
+            try:
+                async with session.get(API_URL, params=params, timeout=TIMEOUT) as resp:
+                    status = resp.status
+                    resp.raise_for_status()
+                    data = await resp.json()
+                    return data.get("response", {}).get("body", {}) or {}
+            except Exception as e:
+                error = e
+                if isinstance(e, asyncio.TimeoutError):
+                    status = "timeout"
+            finally:
+                record_http("open_api", status, time.perf_counter() - started)
+        reason = "TimeoutError" if isinstance(error, asyncio.TimeoutError) else repr(error)
+        if attempt == MAX_RETRIES or not _retryable(error):
+            inc("pages_failed_total", endpoint="open_api")
+            logger.error(f"페이지 수집 실패 - 기관코드: {instt_code}, 페이지: {page} - {reason}")
+            raise PageFetchError(instt_code, page, reason)
+        delay = _backoff(attempt, error)
+        inc("http_retries_total", endpoint="open_api")
+        logger.warning(f"재시도 {attempt + 1}/{MAX_RETRIES} ({delay:.1f}s 후) - 기관코드: {instt_code}, "
+                       f"페이지: {page} - {reason}")
+        # semaphore 밖에서 대기 → 다른 요청을 막지 않음
+        await asyncio.sleep(delay)
 
 
-async def fetch_and_parse(session, instt_code, region_name, semaphore):
-    items = []
-    page = 1
-    numOfRows = 1500
+async def fetch_page(session, instt_code, page, semaphore):
+    body = await fetch_page_body(session, instt_code, page, semaphore)
+    return body.get("items", []) or []
+
+
+async def _fetch_page_or_record(session, instt_code, page, semaphore, failed_pages):
+    """실패한 페이지는 failed_pages 큐에 남기고 None 반환 (빈 페이지 = 끝과 구분)"""
+    try:
+        return await fetch_page(session, instt_code, page, semaphore)
+    except PageFetchError as e:
+        if failed_pages is None:
+            raise
+        failed_pages.add(instt_code, page, e.reason)
+        return None
 
+
+def _total_count(body):
+    try:
+        return int(body.get("totalCount"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def iter_pages(session, instt_code, semaphore, failed_pages=None, start_page=1):
+    """
+    기관코드의 페이지를 start_page부터 순서대로 하나씩 yield (전체를 메모리에 모으지 않음).
+    첫 페이지의 totalCount로 전체 페이지 수를 알면 나머지 페이지는 최대 PAGE_PREFETCH개까지만
+    앞서 요청하고(공유 semaphore 안에서), 순서대로 꺼내 줌. totalCount가 없으면 기존처럼 한 페이지씩 순회.
+    failed_pages(FailedPageQueue)를 주면 실패한 페이지는 기록하고 다음 페이지로 넘어감.
+    첫 페이지를 못 받았거나 한 페이지씩 순회하다 연속 실패로 멈추면 끝 페이지를 모르므로
+    "그 페이지부터 이어받기"(resume) 항목을 남김 → --retry-failed가 지역 나머지를 다시 받음.
+    """
+    numOfRows = NUM_OF_ROWS
+    try:
+        body = await fetch_page_body(session, instt_code, start_page, semaphore)
+    except PageFetchError as e:
+        if failed_pages is None:
+            raise
+        failed_pages.add(instt_code, start_page, e.reason, resume=True)
+        return
+    first_items = body.get("items", []) or []
+    if not first_items:
+        return
+
+    yield first_items
+    if len(first_items) < numOfRows:
+        return
+
+    total = _total_count(body)
+    if total is not None:
+        last_page = math.ceil(total / numOfRows)
+        # 받는 중이거나 받아 두고 아직 넘기지 않은 페이지를 최대 PAGE_PREFETCH개로 유지
+        # → 소비자(쓰기 큐)가 막혀 있으면 다음 페이지도 요청하지 않으므로 메모리가 늘지 않음
+        window = deque()
+        next_page = start_page + 1
+
+        def schedule():
+            nonlocal next_page
+            window.append(asyncio.create_task(
+                _fetch_page_or_record(session, instt_code, next_page, semaphore, failed_pages)))
+            next_page += 1
+
+        while next_page <= last_page and len(window) < PAGE_PREFETCH:
+            schedule()
+        try:
+            while window:
+                page_items = await window.popleft()
+                if next_page <= last_page:
+                    schedule()
+                if page_items:
+                    yield page_items
+        finally:
+            for task in window:
+                task.cancel()
+        return
+
+    page = start_page + 1
+    failed = []  # 연속으로 실패한 (페이지, 사유)
     while True:
-        page_items = await fetch_page(session, instt_code, page, semaphore)
+        try:
+            page_items = await fetch_page(session, instt_code, page, semaphore)
+        except PageFetchError as e:
+            if failed_pages is None:
+                raise
+            # 실패한 페이지가 꽉 찬 페이지였다고 보고 다음 페이지 계속 (연속 실패가 길면 중단)
+            failed.append((page, e.reason))
+            if len(failed) >= MAX_CONSECUTIVE_FAILURES:
+                failed_pages.add(instt_code, failed[0][0], failed[-1][1], resume=True)
+                logger.error(f"연속 {len(failed)}페이지 실패로 중단 - 기관코드: {instt_code}, "
+                             f"{failed[0][0]}페이지부터 재수집 대상으로 기록")
+                return
+            page += 1
+            continue
+        # 뒤 페이지를 받았으면 앞의 실패는 그 페이지만 다시 받으면 됨
+        for failed_page, reason in failed:
+            failed_pages.add(instt_code, failed_page, reason)
+        failed = []
         if not page_items:
             break
 
-        items.extend(page_items)
+        yield page_items
 
         if len(page_items) < numOfRows:
             break
 
         page += 1
 
+
+async def fetch_and_parse(session, instt_code, region_name, semaphore):
+    items = []
+    async for page_items in iter_pages(session, instt_code, semaphore):
+        items.extend(page_items)
+
     logger.info(f"{region_name} 수집 완료 - 총 {len(items)}건")
     return items
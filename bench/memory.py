@@ -0,0 +1,14 @@
+"""
+벤치마크 메모리 측정.
+
+tracemalloc은 모든 할당을 가로채서 CPU 위주 코드를 몇 배 느리게 만듦 → 처리량/지연을 재는 동안에는 쓰지 않고
+프로세스 최대 RSS(ru_maxrss)로 봄. 최대치라 줄어들지 않으므로 측정 구간 전후의 증가분을 그 구간의 값으로 씀.
+"""
+import resource
+import sys
+
+
+def max_rss_mb():
+    """프로세스 최대 RSS(MB). macOS는 bytes, Linux는 KB 단위"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
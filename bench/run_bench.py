@@ -0,0 +1,199 @@
+"""
+오프라인 벤치마크: 로컬 스텁 API + 로컬 MySQL(벤치 전용 DB)로 배치 단계별 처리량 측정.
+
+    python -m bench.run_bench --codes 20 --rows-per-code 3000 --latency-ms 50
+    python -m bench.run_bench --compare bench/results/a.json bench/results/b.json
+
+DB 접속 정보는 DB_HOST/DB_PORT/DB_USER/DB_PASSWORD를 그대로 쓰고, DB 이름만 --db(기본 sparta_bench)로
+바꿔서 시작 시 테이블을 비움. 실수로 운영 DB를 비우지 않도록 이름에 'bench'가 없으면 실행하지 않음.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from bench.memory import max_rss_mb
+from bench.stub_servers import JUSO_PATH, KAKAO_PATH, OPEN_API_PATH, StubConfig, StubServer
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="스텁 API 기반 오프라인 배치 벤치마크")
+    parser.add_argument("--db", default="sparta_bench", help="벤치 전용 DB 이름 ('bench' 포함 필수)")
+    parser.add_argument("--codes", type=int, default=20, help="기관코드 수")
+    parser.add_argument("--rows-per-code", type=int, default=3000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0, help="엔드포인트별 초당 허용 요청 (0 = 무제한)")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--stages", nargs="+", default=["store_sync", "cleaned_transform", "kakao", "road_address"])
+    parser.add_argument("--label", default="", help="결과 파일에 남길 설명")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="저장된 두 결과 비교")
+    return parser.parse_args()
+
+
+def configure_env(args, server_url, workdir):
+    """벤치 대상 모듈을 import하기 전에 환경변수를 스텁/벤치 DB로 바꿔둠"""
+    os.environ["DB_NAME"] = args.db
+    os.environ["OPEN_API_URL"] = server_url + OPEN_API_PATH
+    os.environ["KAKAO_API_URL"] = server_url + KAKAO_PATH
+    os.environ["JUSO_API_URL"] = server_url + JUSO_PATH
+    os.environ.setdefault("KAKAO_API_KEY", "bench")
+    os.environ.setdefault("JUSO_API_KEY", "bench")
+    # 캐시/체크포인트/지표는 임시 폴더에 → 매 실행이 같은 조건에서 시작
+    os.environ["GEOCODE_CACHE_PATH"] = os.path.join(workdir, "geocode_cache.sqlite3")
+    os.environ["CHECKPOINT_DIR"] = os.path.join(workdir, "checkpoints")
+    os.environ["FAILED_PAGES_FILE"] = os.path.join(workdir, "failed_pages.jsonl")
+    os.environ["METRICS_DIR"] = os.path.join(workdir, "metrics")
+
+
+def prepare_db(args):
+    import pymysql
+    from db.change_tracking import CHANGE_TRACKED_TABLES, ensure_updated_at_column
+    from db.connection import DB_CONFIG, pooled_connection
+
+    server = {k: v for k, v in DB_CONFIG.items() if k != "db"}
+    conn = pymysql.connect(**server, autocommit=True)
+    with conn.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{args.db}` DEFAULT CHARACTER SET utf8mb4")
+    conn.close()
+
+    with open(os.path.join(os.path.dirname(__file__), "schema.sql"), encoding="utf-8") as f:
+        sql = "\n".join(line for line in f if not line.lstrip().startswith("--"))
+    statements = [s.strip() for s in sql.split(";") if s.strip()]
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        # 운영에서는 execute.migrate_change_tracking으로 한 번 실행하는 마이그레이션
+        for table in CHANGE_TRACKED_TABLES:
+            ensure_updated_at_column(conn, table)
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for table in ("local_store_coordinate", "local_store_cleaned", "local_store", "institution_code",
+                      "local_store_fingerprint", "batch_watermark"):
+            cursor.execute(f"SHOW TABLES LIKE %s", (table,))
+            if cursor.fetchone():
+                cursor.execute(f"TRUNCATE TABLE {table}")
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        cursor.executemany("INSERT INTO institution_code (code, region_name) VALUES (%s, %s)",
+                           [(f"99{i:05d}", f"벤치지역{i}") for i in range(args.codes)])
+
+
+def _latency(summary, endpoint):
+    """metrics 요약에서 해당 엔드포인트의 200 응답 p50/p99"""
+    for name, h in summary["histograms"].items():
+        if name.startswith("http_request_seconds") and f"[endpoint={endpoint}]" in name and "[status=200]" in name:
+            return {"p50_ms": h["p50"] and h["p50"] * 1000, "p99_ms": h["p99"] and h["p99"] * 1000,
+                    "requests": h["count"]}
+    return None
+
+
+def _counter(summary, prefix):
+    return sum(v for k, v in summary["counters"].items() if k.startswith(prefix))
+
+
+def run_stage(name, fn, rows_counter, endpoint=None):
+    from util.metrics import REGISTRY
+
+    # 메모리는 최대 RSS 증가분 (bench.memory 참고). 단계 순서대로 실행하므로 증가분이 그 단계의 최대치 증가
+    REGISTRY.reset()
+    rss_before = max_rss_mb()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    rss_after = max_rss_mb()
+
+    summary = REGISTRY.summary()
+    rows = _counter(summary, rows_counter)
+    result = {
+        "stage": name,
+        "seconds": round(elapsed, 3),
+        "rows": rows,
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+        "max_rss_mb": round(rss_after, 1),
+        "max_rss_growth_mb": round(rss_after - rss_before, 1),
+        "latency": _latency(summary, endpoint) if endpoint else None,
+        "db_statements": {k: v for k, v in summary["histograms"].items() if k.startswith("db_statement_seconds")},
+    }
+    print(f"[{name}] {rows} rows / {elapsed:.1f}s = {result['rows_per_sec']} rows/s, "
+          f"max RSS {result['max_rss_mb']}MB (+{result['max_rss_growth_mb']}MB), latency {result['latency']}")
+    return result
+
+
+def run(args):
+    if "bench" not in args.db:
+        sys.exit(f"--db 이름에 'bench'가 포함되어야 합니다: {args.db}")
+
+    cfg = StubConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                     rate_limit_rps=args.rate_limit, rows_per_code=args.rows_per_code)
+    server = StubServer(cfg, port=args.port).start()
+    workdir = tempfile.mkdtemp(prefix="sparta_bench_")
+    configure_env(args, server.base_url, workdir)
+
+    try:
+        prepare_db(args)
+
+        from db.cleaned_store_repository import transform_incremental
+        from db.connection import pooled_connection
+        from service.kakao_coordinate_update_service import KakaoCoordinateUpdateService
+        from service.road_address_update_service import run_async_batch
+        from service.store_sync_service import sync_all_regions
+
+        def cleaned_transform():
+            with pooled_connection() as conn:
+                transform_incremental(conn)
+
+        def road_address():
+            # 수집 시 road_addr가 lotno_addr로 채워지므로, 일부를 비워서 보정 대상을 만듦
+            with pooled_connection() as conn, conn.cursor() as cursor:
+                cursor.execute("UPDATE local_store SET road_addr = NULL WHERE id % 3 = 0")
+            asyncio.run(run_async_batch(min_id=1, max_id=2 ** 62, resume=False))
+
+        stages = {
+            "store_sync": (lambda: asyncio.run(sync_all_regions()), "rows_fetched_total", "open_api"),
+            "cleaned_transform": (cleaned_transform, "rows_written_total", None),
+            "kakao": (lambda: KakaoCoordinateUpdateService().run(), "rows_processed_total", "kakao"),
+            "road_address": (road_address, "rows_processed_total", "juso"),
+        }
+        results = [run_stage(name, *stages[name]) for name in args.stages]
+    finally:
+        server.stop()
+
+    record = {
+        "label": args.label,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare",)},
+        "stages": results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {path}")
+
+
+def compare(base_path, new_path):
+    with open(base_path, encoding="utf-8") as f:
+        base = {s["stage"]: s for s in json.load(f)["stages"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = {s["stage"]: s for s in json.load(f)["stages"]}
+
+    print(f"{'stage':<18} {'base rows/s':>12} {'new rows/s':>12} {'change':>8}")
+    for stage in sorted(set(base) | set(new)):
+        b = (base.get(stage) or {}).get("rows_per_sec")
+        n = (new.get(stage) or {}).get("rows_per_sec")
+        change = f"{(n - b) / b:+.1%}" if b and n else "-"
+        print(f"{stage:<18} {b or '-':>12} {n or '-':>12} {change:>8}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
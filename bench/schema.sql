@@ -0,0 +1,50 @@
+-- 벤치마크 전용 DB 스키마 (운영 스키마를 코드에서 추정한 최소 버전)
+CREATE TABLE IF NOT EXISTS institution_code (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  code VARCHAR(50) NOT NULL UNIQUE,
+  region_name VARCHAR(100) NOT NULL,
+  uuid BINARY(16) NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS local_store (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  affiliate_name VARCHAR(255),
+  local_bill VARCHAR(100),
+  ctpv_name VARCHAR(50),
+  sgg_name VARCHAR(50),
+  road_addr VARCHAR(255),
+  lotno_addr VARCHAR(255),
+  sector_name VARCHAR(100),
+  main_prd VARCHAR(255),
+  telno VARCHAR(50),
+  instt_code VARCHAR(50),
+  instt_name VARCHAR(100),
+  crtr_ymd DATE,
+  UNIQUE KEY uk_local_store (affiliate_name, lotno_addr, instt_code)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS local_store_cleaned (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  store_name VARCHAR(255) NOT NULL,
+  local_bill VARCHAR(100) NOT NULL,
+  region VARCHAR(100),
+  address VARCHAR(255),
+  sector_name VARCHAR(100),
+  main_product VARCHAR(255),
+  tel_number VARCHAR(50),
+  institution_code VARCHAR(50),
+  institution_name VARCHAR(100),
+  created_at DATE,
+  hits INT DEFAULT 0,
+  latitude DOUBLE NULL,
+  longitude DOUBLE NULL,
+  uuid BINARY(16) NULL,
+  UNIQUE KEY uk_local_store_cleaned (store_name, address, institution_code)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS local_store_coordinate (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  cleaned_id BIGINT NOT NULL UNIQUE,
+  location POINT NOT NULL SRID 4326,
+  SPATIAL INDEX idx_location (location)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
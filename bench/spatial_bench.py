@@ -0,0 +1,232 @@
+"""
+주변 가게 조회 벤치마크: 메모리 격자 인덱스(NearbyStoreIndex) vs MySQL ST_Distance_Sphere.
+MySQL은 풀스캔(거리 조건만)과 SPATIAL INDEX를 타는 쿼리(사각 범위 MBRContains → 거리로 다시 거름)를 둘 다 잼.
+
+    python -m bench.spatial_bench --queries 300 --radius 500 --k 10
+    python -m bench.spatial_bench --synthetic 500000          # DB 없이 인덱스만 측정
+
+DB는 읽기만 하므로 현재 DB_* 설정을 그대로 씀. 조회 지점은 적재된 가게 좌표 근처에서 무작위로 뽑음.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime
+
+from bench.memory import max_rss_mb
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+MYSQL_RADIUS_SQL = """
+    SELECT coord.cleaned_id,
+           ST_Distance_Sphere(coord.location, ST_SRID(POINT(%s, %s), 4326)) AS distance
+    FROM local_store_coordinate AS coord
+    {sector_join}
+    WHERE ST_Distance_Sphere(coord.location, ST_SRID(POINT(%s, %s), 4326)) <= %s
+    ORDER BY distance
+"""
+MYSQL_KNN_SQL = """
+    SELECT coord.cleaned_id,
+           ST_Distance_Sphere(coord.location, ST_SRID(POINT(%s, %s), 4326)) AS distance
+    FROM local_store_coordinate AS coord
+    {sector_join}
+    ORDER BY distance
+    LIMIT %s
+"""
+# 반경을 감싸는 사각형으로 먼저 거르면 idx_location(SPATIAL)을 타고, 남은 후보만 정확한 거리로 다시 거름
+MYSQL_INDEXED_RADIUS_SQL = """
+    SELECT coord.cleaned_id,
+           ST_Distance_Sphere(coord.location, ST_SRID(POINT(%s, %s), 4326)) AS distance
+    FROM local_store_coordinate AS coord
+    {sector_join}
+    WHERE MBRContains(ST_GeomFromText(%s, 4326, 'axis-order=long-lat'), coord.location)
+      AND ST_Distance_Sphere(coord.location, ST_SRID(POINT(%s, %s), 4326)) <= %s
+    ORDER BY distance
+"""
+# k개를 다 못 채우면 반경을 두 배씩 넓혀 다시 조회, 이 배수를 넘으면 풀스캔으로 넘어감
+KNN_MAX_EXPAND = 64
+SECTOR_JOIN = "JOIN local_store_cleaned AS s ON s.id = coord.cleaned_id AND s.sector_name = %s"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="메모리 공간 인덱스 vs MySQL 공간 쿼리 벤치마크")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--mysql-queries", type=int, default=30, help="MySQL 쪽은 풀스캔이 있어 적게")
+    parser.add_argument("--radius", type=float, default=500, help="반경 조회 거리(m)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--sector", default=None, help="업종(sector_name) 필터")
+    parser.add_argument("--cell-deg", type=float, default=None)
+    parser.add_argument("--synthetic", type=int, default=0, help="DB 대신 무작위 좌표 N건으로 인덱스만 측정")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="")
+    return parser.parse_args()
+
+
+def _percentiles_us(samples_ns):
+    if not samples_ns:
+        return None
+    ordered = sorted(samples_ns)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1000, 1)
+    return {"p50_us": pick(0.5), "p99_us": pick(0.99), "max_us": round(ordered[-1] / 1000, 1)}
+
+
+def _timed(fn, points):
+    samples, results = [], []
+    for lat, lng in points:
+        started = time.perf_counter_ns()
+        results.append(fn(lat, lng))
+        samples.append(time.perf_counter_ns() - started)
+    return _percentiles_us(samples), results
+
+
+def _recall(index_results, mysql_results):
+    """MySQL 결과 id 중 인덱스도 찾은 비율"""
+    expected = found = 0
+    for ours, theirs in zip(index_results, mysql_results):
+        theirs = {id for id, _ in theirs}
+        expected += len(theirs)
+        found += len(theirs & {id for id, _ in ours})
+    return round(found / expected, 4) if expected else None
+
+
+def _bbox_wkt(lat, lng, radius_m):
+    """(lat, lng) 중심 반경 radius_m을 감싸는 사각형 WKT (경도, 위도 순)"""
+    dlat = radius_m / 111320 * 1.01
+    dlng = radius_m / (111320 * max(math.cos(math.radians(lat)), 0.01)) * 1.01
+    south, north, west, east = lat - dlat, lat + dlat, lng - dlng, lng + dlng
+    return (f"POLYGON(({west} {south}, {east} {south}, {east} {north}, "
+            f"{west} {north}, {west} {south}))")
+
+
+def build_index(args):
+    from service.nearby_store_index import CELL_DEG, NearbyStoreIndex
+
+    cell_deg = args.cell_deg or CELL_DEG
+    # 메모리는 적재 전후 최대 RSS 증가분 (bench.memory 참고)
+    rss_before = max_rss_mb()
+    started = time.perf_counter()
+    if args.synthetic:
+        # 수도권 정도 범위에 무작위 분포
+        rng = random.Random(args.seed)
+        sectors = ["일반음식점", "편의점", "마트", "학원", "병원", None]
+        index = NearbyStoreIndex(cell_deg)
+        for id in range(1, args.synthetic + 1):
+            index.add(id, rng.uniform(37.2, 37.8), rng.uniform(126.6, 127.4), rng.choice(sectors))
+    else:
+        from db.connection import pooled_connection
+
+        with pooled_connection() as conn:
+            index = NearbyStoreIndex.load(conn, cell_deg)
+    load_seconds = time.perf_counter() - started
+    return index, round(load_seconds, 3), round(max_rss_mb() - rss_before, 1)
+
+
+def run(args):
+    index, load_seconds, rss_growth_mb = build_index(args)
+    if not len(index):
+        print("좌표가 있는 가게가 없습니다.")
+        return
+
+    rng = random.Random(args.seed)
+    live = [pos for pos in range(len(index.ids)) if index.alive[pos]]
+    points = []
+    for _ in range(args.queries):
+        pos = rng.choice(live)
+        points.append((index.lats[pos] + rng.uniform(-0.002, 0.002), index.lngs[pos] + rng.uniform(-0.002, 0.002)))
+
+    radius_latency, radius_results = _timed(
+        lambda lat, lng: index.radius(lat, lng, args.radius, args.sector), points)
+    knn_latency, knn_results = _timed(
+        lambda lat, lng: index.nearest(lat, lng, args.k, args.sector), points)
+    result = {
+        "index": {
+            "load_seconds": load_seconds,
+            "load_rss_growth_mb": rss_growth_mb,
+            **index.stats(),
+            "radius": radius_latency,
+            "knn": knn_latency,
+            "avg_radius_hits": round(sum(map(len, radius_results)) / len(points), 1),
+        },
+    }
+
+    if not args.synthetic:
+        result["mysql"] = run_mysql(args, points[:args.mysql_queries],
+                                    radius_results[:args.mysql_queries], knn_results[:args.mysql_queries])
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    record = {
+        "label": args.label,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": vars(args),
+        "result": result,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"spatial_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {path}")
+
+
+def run_mysql(args, points, index_radius, index_knn):
+    from db.connection import pooled_connection
+
+    sector_join = SECTOR_JOIN if args.sector else ""
+    sector_params = (args.sector,) if args.sector else ()
+    radius_sql = MYSQL_RADIUS_SQL.format(sector_join=sector_join)
+    knn_sql = MYSQL_KNN_SQL.format(sector_join=sector_join)
+    indexed_radius_sql = MYSQL_INDEXED_RADIUS_SQL.format(sector_join=sector_join)
+    knn_rounds = []
+
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        def radius(lat, lng):
+            cursor.execute(radius_sql, (lng, lat, *sector_params, lng, lat, args.radius))
+            return [(row["cleaned_id"], row["distance"]) for row in cursor.fetchall()]
+
+        def knn(lat, lng):
+            cursor.execute(knn_sql, (lng, lat, *sector_params, args.k))
+            return [(row["cleaned_id"], row["distance"]) for row in cursor.fetchall()]
+
+        def indexed_radius(lat, lng, radius_m=args.radius):
+            cursor.execute(indexed_radius_sql,
+                           (lng, lat, *sector_params, _bbox_wkt(lat, lng, radius_m), lng, lat, radius_m))
+            return [(row["cleaned_id"], row["distance"]) for row in cursor.fetchall()]
+
+        def indexed_knn(lat, lng):
+            # 반경 안 결과는 정확하므로 k개 이상이면 앞의 k개가 곧 최근접 k개
+            radius_m = args.radius
+            for rounds in range(1, KNN_MAX_EXPAND.bit_length() + 1):
+                rows = indexed_radius(lat, lng, radius_m)
+                if len(rows) >= args.k:
+                    knn_rounds.append(rounds)
+                    return rows[:args.k]
+                radius_m *= 2
+            knn_rounds.append(rounds + 1)
+            return knn(lat, lng)
+
+        radius_latency, radius_results = _timed(radius, points)
+        knn_latency, knn_results = _timed(knn, points)
+        indexed_radius_latency, indexed_radius_results = _timed(indexed_radius, points)
+        indexed_knn_latency, indexed_knn_results = _timed(indexed_knn, points)
+
+    return {
+        "queries": len(points),
+        "full_scan": {
+            "radius": radius_latency,
+            "knn": knn_latency,
+            "radius_recall": _recall(index_radius, radius_results),
+            "knn_recall": _recall(index_knn, knn_results),
+        },
+        "spatial_index": {
+            "radius": indexed_radius_latency,
+            "knn": indexed_knn_latency,
+            "radius_recall": _recall(index_radius, indexed_radius_results),
+            "knn_recall": _recall(index_knn, indexed_knn_results),
+            "avg_knn_rounds": round(sum(knn_rounds) / len(knn_rounds), 2) if knn_rounds else None,
+        },
+    }
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,143 @@
+"""
+오픈API / 카카오 주소검색 / 도로명주소 API를 흉내 내는 로컬 HTTP 서버 (벤치마크용).
+지연, 오류율, 초당 요청 제한(429), 데이터셋 크기를 설정할 수 있음.
+"""
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from aiohttp import web
+
+OPEN_API_PATH = "/openapi/store"
+KAKAO_PATH = "/kakao/v2/local/search/address.json"
+JUSO_PATH = "/juso/addrLinkApi.do"
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 50          # 평균 응답 지연
+    jitter_ms: float = 20           # 지연 편차 (균등분포 ±)
+    error_rate: float = 0.0         # 500 응답 비율
+    rate_limit_rps: float = 0       # 엔드포인트별 초당 허용 요청 수 (0 = 제한 없음, 초과 시 429)
+    rows_per_code: int = 3000       # 기관코드당 가맹점 수
+    distinct_address_ratio: float = 0.7  # 주소 중복 정도 (체인점/상가)
+    not_found_rate: float = 0.05    # 카카오/주소 API의 결과 없음 비율
+
+
+class _Limiter:
+    def __init__(self, rps):
+        self.rps = rps
+        self.window = int(time.monotonic())
+        self.count = 0
+
+    def allow(self):
+        if self.rps <= 0:
+            return True
+        now = int(time.monotonic())
+        if now != self.window:
+            self.window, self.count = now, 0
+        self.count += 1
+        return self.count <= self.rps
+
+
+def _ratio(key: str) -> float:
+    """문자열 → [0, 1) 결정적 값 (실행마다 같은 데이터)"""
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+
+def make_item(code: str, i: int, cfg: StubConfig):
+    addr_no = int(i * cfg.distinct_address_ratio) + 1
+    return {
+        "affiliateNm": f"벤치가맹점{code}-{i}",
+        "localBill": "벤치페이",
+        "ctpvNm": "서울특별시",
+        "sggNm": f"벤치구{code[-2:]}",
+        "lctnRoadNmAddr": f"서울특별시 벤치구{code[-2:]} 벤치로 {addr_no}",
+        "lctnLotnoAddr": f"서울특별시 벤치구{code[-2:]} 벤치동 {addr_no}-1",
+        "sectorNm": ("음식점", "소매", "서비스")[i % 3],
+        "mainPrd": "상품",
+        "telno": f"02-000-{i:04d}",
+        "insttCode": code,
+        "insttNm": f"벤치기관{code}",
+        "crtrYmd": "2024-01-01",
+    }
+
+
+def build_app(cfg: StubConfig) -> web.Application:
+    limiters = {OPEN_API_PATH: _Limiter(cfg.rate_limit_rps), KAKAO_PATH: _Limiter(cfg.rate_limit_rps),
+                JUSO_PATH: _Limiter(cfg.rate_limit_rps)}
+
+    @web.middleware
+    async def chaos(request, handler):
+        limiter = limiters.get(request.path)
+        if limiter and not limiter.allow():
+            return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "1"})
+        delay = max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if random.random() < cfg.error_rate:
+            return web.json_response({"error": "stub failure"}, status=500)
+        return await handler(request)
+
+    async def open_api(request):
+        code = request.query.get("instt_code", "")
+        page = int(request.query.get("pageNo", 1))
+        per_page = int(request.query.get("numOfRows", 1500))
+        start = (page - 1) * per_page
+        end = min(start + per_page, cfg.rows_per_code)
+        items = [make_item(code, i, cfg) for i in range(start, end)]
+        return web.json_response({"response": {"body": {
+            "items": items, "totalCount": cfg.rows_per_code, "pageNo": page, "numOfRows": per_page}}})
+
+    async def kakao(request):
+        query = request.query.get("query", "")
+        if _ratio("kakao" + query) < cfg.not_found_rate:
+            return web.json_response({"documents": []})
+        lat = 37.4 + _ratio("lat" + query) * 0.3
+        lng = 126.8 + _ratio("lng" + query) * 0.4
+        return web.json_response({"documents": [{"y": str(lat), "x": str(lng)}]})
+
+    async def juso(request):
+        keyword = request.query.get("keyword", "")
+        juso_list = [] if _ratio("juso" + keyword) < cfg.not_found_rate else [
+            {"roadAddr": keyword.replace("동", "로").replace("-1", "")}]
+        return web.json_response({"results": {"common": {"errorCode": "0", "errorMessage": "정상"},
+                                              "juso": juso_list}})
+
+    app = web.Application(middlewares=[chaos])
+    app.router.add_get(OPEN_API_PATH, open_api)
+    app.router.add_get(KAKAO_PATH, kakao)
+    app.router.add_get(JUSO_PATH, juso)
+    return app
+
+
+class StubServer:
+    """별도 스레드의 이벤트 루프에서 스텁 서버를 띄움 (벤치 대상 코드의 asyncio.run과 분리)"""
+
+    def __init__(self, cfg: StubConfig, host="127.0.0.1", port=18080):
+        self.cfg = cfg
+        self.host = host
+        self.port = port
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    async def _start(self):
+        self._runner = web.AppRunner(build_app(self.cfg))
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
@@ -0,0 +1,145 @@
+from db.shard_map_repository import institution_filter
+
+
+def ensure_quota_tables(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS api_quota_usage (
+          api VARCHAR(20) NOT NULL,
+          usage_date DATE NOT NULL,
+          used INT NOT NULL DEFAULT 0,
+          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+          PRIMARY KEY (api, usage_date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS geocode_attempt (
+          cleaned_id BIGINT PRIMARY KEY,
+          address_hash BINARY(20) NOT NULL,
+          status VARCHAR(10) NOT NULL,
+          attempts INT NOT NULL DEFAULT 0,
+          last_attempt_at DATETIME(6) NOT NULL,
+          next_attempt_at DATETIME(6) NULL,
+          INDEX idx_geocode_attempt_retry (status, next_attempt_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+
+
+def get_usage(conn, api: str) -> int:
+    """오늘(DB 기준 날짜) 사용한 호출 수"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT used FROM api_quota_usage WHERE api = %s AND usage_date = CURDATE()", (api,))
+        row = cursor.fetchone()
+        return row["used"] if row else 0
+
+
+def add_usage(conn, api: str, calls: int):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       INSERT INTO api_quota_usage (api, usage_date, used)
+                       VALUES (%s, CURDATE(), %s)
+                       ON DUPLICATE KEY UPDATE used = used + VALUES(used)
+                       """, (api, calls))
+
+
+# local_store_cleaned의 유니크 키는 (store_name, address, institution_code)라서 주소가 바뀌면 같은 id가
+# 갱신되지 않고 새 행이 생김 → 주소 변경은 "같은 가게(store_name + institution_code)의 이전 행은 지오코딩을
+# 시도했는데 이 행은 아직 안 한 경우"로 찾음. 같은 id의 주소가 직접 바뀐 경우(수동 수정 등)도 함께 봄.
+_READDRESSED_SQL = """EXISTS (
+              SELECT 1
+              FROM local_store_cleaned AS prev
+              JOIN geocode_attempt AS pa ON pa.cleaned_id = prev.id
+              WHERE prev.store_name = c.store_name
+                AND prev.institution_code <=> c.institution_code
+                AND prev.id <> c.id
+          )"""
+
+# 우선순위별 대상: 1) 한 번도 지오코딩 안 한 가게(최신 id부터) 2) 마지막 시도 이후 주소가 바뀐 가게
+# 3) 실패 후 재시도 시각이 지난 행(오래 기다린 순)
+PRIORITY_QUERIES = (
+    ("new", f"""
+        SELECT c.id, c.address
+        FROM local_store_cleaned AS c
+        LEFT JOIN geocode_attempt AS a ON a.cleaned_id = c.id
+        WHERE a.cleaned_id IS NULL
+          AND (c.latitude IS NULL OR c.longitude IS NULL)
+          AND NOT {_READDRESSED_SQL}
+          {{code_sql}}
+        ORDER BY c.id DESC
+        LIMIT %s
+    """),
+    ("changed", f"""
+        SELECT c.id, c.address
+        FROM local_store_cleaned AS c
+        LEFT JOIN geocode_attempt AS a ON a.cleaned_id = c.id
+        WHERE (a.address_hash <> UNHEX(SHA1(COALESCE(c.address, '')))
+               OR (a.cleaned_id IS NULL
+                   AND (c.latitude IS NULL OR c.longitude IS NULL)
+                   AND {_READDRESSED_SQL}))
+          {{code_sql}}
+        ORDER BY c.id DESC
+        LIMIT %s
+    """),
+    ("retry", """
+        SELECT c.id, c.address
+        FROM local_store_cleaned AS c
+        JOIN geocode_attempt AS a ON a.cleaned_id = c.id
+        WHERE a.status = 'failed'
+          AND a.address_hash = UNHEX(SHA1(COALESCE(c.address, '')))
+          AND a.next_attempt_at <= NOW(6)
+          {code_sql}
+        ORDER BY a.next_attempt_at
+        LIMIT %s
+    """),
+)
+
+
+def fetch_prioritized_rows(conn, limit: int, institution_codes=None):
+    """
+    우선순위 순서대로 limit개까지 채움.
+    return: [{"id": ..., "address": ..., "priority": "new"|"changed"|"retry"}]
+    """
+    code_sql, code_params = institution_filter("c.institution_code", institution_codes)
+    rows = []
+    for priority, sql in PRIORITY_QUERIES:
+        if len(rows) >= limit:
+            break
+        with conn.cursor() as cursor:
+            cursor.execute(sql.format(code_sql=code_sql), (*code_params, limit - len(rows)))
+            rows.extend({**row, "priority": priority} for row in cursor.fetchall())
+    return rows
+
+
+def record_attempts(conn, succeeded, failed, backoff_base_seconds: int, backoff_max_seconds: int):
+    """
+    succeeded/failed: [(id, address)]. 시도한 주소의 해시를 남겨 이후 주소 변경을 감지하고,
+    실패는 연속 실패 횟수에 따라 base * 2^(n-1)초(최대 max) 뒤로 재시도 시각을 미룸.
+    """
+    with conn.cursor() as cursor:
+        if succeeded:
+            cursor.executemany("""
+                               INSERT INTO geocode_attempt
+                                   (cleaned_id, address_hash, status, attempts, last_attempt_at, next_attempt_at)
+                               VALUES (%s, UNHEX(SHA1(%s)), 'ok', 0, NOW(6), NULL)
+                               ON DUPLICATE KEY UPDATE
+                                   address_hash    = VALUES(address_hash),
+                                   status          = 'ok',
+                                   attempts        = 0,
+                                   last_attempt_at = NOW(6),
+                                   next_attempt_at = NULL
+                               """, [(id, address or "") for id, address in succeeded])
+        if failed:
+            # 대입은 왼쪽부터 적용 → attempts는 이전 status/hash 기준, next_attempt_at은 새 attempts 기준
+            cursor.executemany("""
+                               INSERT INTO geocode_attempt
+                                   (cleaned_id, address_hash, status, attempts, last_attempt_at, next_attempt_at)
+                               VALUES (%s, UNHEX(SHA1(%s)), 'failed', 1, NOW(6), NOW(6) + INTERVAL %s SECOND)
+                               ON DUPLICATE KEY UPDATE
+                                   attempts        = IF(status = 'failed' AND address_hash = VALUES(address_hash),
+                                                        attempts + 1, 1),
+                                   next_attempt_at = NOW(6) + INTERVAL LEAST(%s * POW(2, attempts - 1), %s) SECOND,
+                                   address_hash    = VALUES(address_hash),
+                                   status          = 'failed',
+                                   last_attempt_at = NOW(6)
+                               """, [(id, address or "", backoff_base_seconds, backoff_base_seconds,
+                                      backoff_max_seconds) for id, address in failed])
@@ -0,0 +1,78 @@
+import logging
+
+
+CHANGE_TRACKED_TABLES = ("local_store", "local_store_cleaned")
+
+
+def has_updated_at_column(conn, table_name: str) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       SELECT COUNT(*) AS cnt
+                       FROM information_schema.COLUMNS
+                       WHERE TABLE_SCHEMA = DATABASE()
+                         AND TABLE_NAME = %s
+                         AND COLUMN_NAME = 'updated_at'
+                       """, (table_name,))
+        return cursor.fetchone()["cnt"] > 0
+
+
+def require_updated_at_column(conn, table_name: str):
+    """증분 처리 전에 확인만 함. 컬럼 추가(테이블 재작성)는 배치가 아니라 마이그레이션에서 따로 실행"""
+    if not has_updated_at_column(conn, table_name):
+        raise RuntimeError(f"{table_name}.updated_at 컬럼이 없습니다. "
+                           f"먼저 python -m execute.migrate_change_tracking 을 실행하세요.")
+
+
+def ensure_updated_at_column(conn, table_name: str):
+    """
+    [마이그레이션 전용] 증분 처리용 변경 시각 컬럼(updated_at)이 없으면 추가.
+    ON UPDATE CURRENT_TIMESTAMP라서 값이 실제로 바뀐 행만 갱신됨.
+    ALTER TABLE + 인덱스 생성이라 큰 테이블에서는 오래 걸림 → 배치 중에는 호출하지 않음
+    return: 추가했으면 True
+    """
+    if has_updated_at_column(conn, table_name):
+        return False
+    with conn.cursor() as cursor:
+        logging.info(f"{table_name}.updated_at 컬럼 추가")
+        cursor.execute(f"""
+            ALTER TABLE {table_name}
+                ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+                    DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+                ADD INDEX idx_{table_name}_updated_at (updated_at)
+        """)
+    return True
+
+
+def ensure_watermark_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS batch_watermark (
+          name VARCHAR(100) PRIMARY KEY,
+          watermark DATETIME(6) NOT NULL,
+          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+
+
+def get_watermark(conn, name: str):
+    """마지막 성공 실행 기준 시각. 없으면 None"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT watermark FROM batch_watermark WHERE name = %s", (name,))
+        row = cursor.fetchone()
+        return row["watermark"] if row else None
+
+
+def save_watermark(conn, name: str, watermark):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       INSERT INTO batch_watermark (name, watermark)
+                       VALUES (%s, %s)
+                       ON DUPLICATE KEY UPDATE watermark = VALUES(watermark)
+                       """, (name, watermark))
+    conn.commit()
+
+
+def db_now(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT NOW(6) AS now")
+        return cursor.fetchone()["now"]
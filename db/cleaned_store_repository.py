@@ -1,47 +1,180 @@
 import logging
 
+import pymysql
+
+from db.change_tracking import (
+    db_now, ensure_watermark_table, require_updated_at_column, get_watermark, save_watermark
+)
+from util.metrics import inc, timer
+
+WATERMARK_NAME = "cleaned_transform"
+CHUNK_SIZE = 20000
+
+TRANSFORM_SQL = """
+    INSERT INTO local_store_cleaned (
+        store_name,
+        local_bill,
+        region,
+        address,
+        sector_name,
+        main_product,
+        tel_number,
+        institution_code,
+        institution_name,
+        created_at,
+        hits
+    )
+    SELECT
+        affiliate_name,
+        local_bill,
+        CONCAT(ctpv_name, ' ', sgg_name) AS region,
+        CASE
+            WHEN road_addr IS NOT NULL AND road_addr != '' THEN road_addr
+            WHEN lotno_addr IS NOT NULL AND lotno_addr != '' THEN lotno_addr
+            ELSE NULL
+        END AS address,
+        sector_name,
+        main_prd,
+        telno,
+        instt_code,
+        instt_name,
+        crtr_ymd,
+        0
+    FROM local_store
+    WHERE affiliate_name IS NOT NULL
+      AND local_bill IS NOT NULL
+      AND crtr_ymd IS NOT NULL
+      {extra_where}
+    ON DUPLICATE KEY UPDATE
+        sector_name = VALUES(sector_name),
+        main_product = VALUES(main_product),
+        tel_number = VALUES(tel_number),
+        institution_name = VALUES(institution_name);
+"""
+
+
 def transform_and_upsert_cleaned_data(conn):
+    """
+    local_store 전체를 다시 변환. 성공하면 실행 시작 시각을 워터마크로 저장
+    → 다음 증분 실행은 이 시점 이후 변경분만 처리
+    """
+    ensure_watermark_table(conn)
+    started_at = db_now(conn)
     with conn.cursor() as cursor:
-        sql = """
-            INSERT INTO local_store_cleaned (
-                store_name,
-                local_bill,
-                region,
-                address,
-                sector_name,
-                main_product,
-                tel_number,
-                institution_code,
-                institution_name,
-                created_at,
-                hits
-            )
-            SELECT
-                affiliate_name,
-                local_bill,
-                CONCAT(ctpv_name, ' ', sgg_name) AS region,
-                CASE
-                    WHEN road_addr IS NOT NULL AND road_addr != '' THEN road_addr
-                    WHEN lotno_addr IS NOT NULL AND lotno_addr != '' THEN lotno_addr
-                    ELSE NULL
-                END AS address,
-                sector_name,
-                main_prd,
-                telno,
-                instt_code,
-                instt_name,
-                crtr_ymd,
-                0
-            FROM local_store
-            WHERE affiliate_name IS NOT NULL
-              AND local_bill IS NOT NULL
-              AND crtr_ymd IS NOT NULL
-            ON DUPLICATE KEY UPDATE
-                sector_name = VALUES(sector_name),
-                main_product = VALUES(main_product),
-                tel_number = VALUES(tel_number),
-                institution_name = VALUES(institution_name);
-            """
         logging.info("정제 테이블 UPSERT 시작")
-        cursor.execute(sql)
+        with timer("db_statement_seconds", statement="cleaned_transform_full"):
+            affected = cursor.execute(TRANSFORM_SQL.format(extra_where=""))
+        inc("rows_written_total", affected, table="local_store_cleaned", stage="cleaned_transform")
         logging.info("정제 테이블 UPSERT 완료")
+    save_watermark(conn, WATERMARK_NAME, started_at)
+    return affected
+
+
+def transform_incremental(conn, chunk_size=CHUNK_SIZE):
+    """
+    마지막 성공 실행 이후 변경된 local_store 행만 id 구간(chunk_size) 단위로 변환.
+    구간마다 커밋하고, 전부 끝나면 실행 시작 시각을 워터마크로 저장.
+    return: 반영된 affected rows 합계
+    """
+    require_updated_at_column(conn, "local_store")
+    ensure_watermark_table(conn)
+    since = get_watermark(conn, WATERMARK_NAME)
+    started_at = db_now(conn)
+
+    changed_where = "AND updated_at >= %s" if since else ""
+    changed_params = (since,) if since else ()
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+                       SELECT MIN(id) AS min_id, MAX(id) AS max_id
+                       FROM local_store
+                       WHERE 1 = 1 {changed_where}
+                       """, changed_params)
+        bounds = cursor.fetchone()
+
+    if bounds["min_id"] is None:
+        logging.info("정제 테이블 증분 변환 - 변경 없음")
+        save_watermark(conn, WATERMARK_NAME, started_at)
+        return 0
+
+    min_id, max_id = bounds["min_id"], bounds["max_id"]
+    logging.info(f"정제 테이블 증분 변환 시작 - 기준 {since or '전체'}, id {min_id}~{max_id}")
+    sql = TRANSFORM_SQL.format(extra_where=f"AND id BETWEEN %s AND %s {changed_where}")
+    affected = 0
+
+    for start in range(min_id, max_id + 1, chunk_size):
+        end = min(start + chunk_size - 1, max_id)
+        conn.begin()
+        try:
+            with conn.cursor() as cursor, timer("db_statement_seconds", statement="cleaned_transform_chunk"):
+                chunk_affected = cursor.execute(sql, (start, end, *changed_params))
+            conn.commit()
+            affected += chunk_affected
+            inc("rows_written_total", chunk_affected, table="local_store_cleaned", stage="cleaned_transform")
+        except Exception:
+            conn.rollback()
+            raise
+        done = (end - min_id + 1) / (max_id - min_id + 1)
+        logging.info(f"정제 테이블 증분 변환 - id {start}~{end} 완료 ({done:.1%}, affected {affected})")
+
+    save_watermark(conn, WATERMARK_NAME, started_at)
+    logging.info(f"정제 테이블 증분 변환 완료 - affected {affected}")
+    return affected
+
+
+def get_table_columns(conn, table_name: str) -> list:
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       SELECT COLUMN_NAME AS name
+                       FROM information_schema.COLUMNS
+                       WHERE TABLE_SCHEMA = DATABASE()
+                         AND TABLE_NAME = %s
+                       ORDER BY ORDINAL_POSITION
+                       """, (table_name,))
+        return [row["name"] for row in cursor.fetchall()]
+
+
+def get_column_types(conn, table_name: str) -> dict:
+    """컬럼명 → information_schema 타입 정보 (DATA_TYPE, COLUMN_TYPE, 길이/정밀도)"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       SELECT COLUMN_NAME AS name,
+                              DATA_TYPE AS data_type,
+                              COLUMN_TYPE AS column_type,
+                              CHARACTER_MAXIMUM_LENGTH AS max_length,
+                              NUMERIC_PRECISION AS num_precision,
+                              NUMERIC_SCALE AS num_scale
+                       FROM information_schema.COLUMNS
+                       WHERE TABLE_SCHEMA = DATABASE()
+                         AND TABLE_NAME = %s
+                       """, (table_name,))
+        return {row["name"]: row for row in cursor.fetchall()}
+
+
+def iter_cleaned_chunks(conn, columns, chunk_size=CHUNK_SIZE, since=None):
+    """
+    local_store_cleaned를 id 키셋으로 chunk_size행씩 읽음 (서버 사이드 커서, 튜플).
+    since를 주면 updated_at >= since 인 행만. columns 첫 번째는 id여야 함.
+    yield: 튜플 리스트
+    """
+    changed_where = "AND updated_at >= %s" if since else ""
+    changed_params = (since,) if since else ()
+    sql = f"""
+          SELECT {", ".join(columns)}
+          FROM local_store_cleaned
+          WHERE id > %s {changed_where}
+          ORDER BY id
+          LIMIT %s
+          """
+    last_id = 0
+    while True:
+        with conn.cursor(pymysql.cursors.SSCursor) as cursor, \
+                timer("db_statement_seconds", statement="cleaned_export_chunk"):
+            cursor.execute(sql, (last_id, *changed_params, chunk_size))
+            rows = list(cursor.fetchall_unbuffered())
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+        if len(rows) < chunk_size:
+            return
@@ -1,18 +1,206 @@
 import pymysql
 import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pymysql.constants import SERVER_STATUS
 from dotenv import load_dotenv
 
 load_dotenv()
 
+DB_CONFIG = dict(
+    host=os.getenv("DB_HOST", "127.0.0.1"),
+    port=int(os.getenv("DB_PORT", "3307")),
+    user=os.getenv("DB_USER", "root"),
+    password=os.getenv("DB_PASSWORD", ""),
+    db=os.getenv("DB_NAME", "sparta"),
+    charset="utf8mb4",
+)
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+POOL_HEALTH_CHECK_SEC = float(os.getenv("DB_POOL_HEALTH_CHECK_SEC", "30"))
+LOCK_RETRIES = int(os.getenv("DB_LOCK_RETRIES", "3"))
+LOCK_RETRY_ERRORS = (1213, 1205)  # 데드락, 락 대기 시간 초과
+
 
 def get_db_connection():
     return pymysql.connect(
-        host=os.getenv("DB_HOST"),
-        port=int(os.getenv("DB_PORT")),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        db=os.getenv("DB_NAME"),
-        charset="utf8mb4",
+        **DB_CONFIG,
         cursorclass=pymysql.cursors.DictCursor,
         autocommit=True
     )
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 pymysql 커넥션 풀.
+    - max_size: 동시에 열 수 있는 최대 커넥션 수 (초과 시 반납될 때까지 대기)
+    - idle_timeout: 이 시간 이상 놀고 있는 커넥션은 닫음
+    - health_check_sec: 이 시간 이상 놀았던 커넥션은 꺼낼 때 ping으로 확인
+    """
+
+    def __init__(self, max_size=POOL_MAX_SIZE, timeout=POOL_TIMEOUT, idle_timeout=POOL_IDLE_TIMEOUT,
+                 health_check_sec=POOL_HEALTH_CHECK_SEC, connect=get_db_connection):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_sec = health_check_sec
+        self._connect = connect
+        self._idle = []  # [(conn, 반납 시각)] - 뒤쪽이 최근
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {"created": 0, "checkouts": 0, "waits": 0, "wait_seconds": 0.0,
+                       "evicted": 0, "health_check_failures": 0}
+
+    def _evict_idle(self, now):
+        keep = []
+        for conn, released_at in self._idle:
+            if now - released_at > self.idle_timeout:
+                self._close(conn)
+                self._stats["evicted"] += 1
+            else:
+                keep.append((conn, released_at))
+        self._idle = keep
+
+    def _close(self, conn):
+        self._size -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn, released_at, now):
+        if now - released_at < self.health_check_sec:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            self._stats["health_check_failures"] += 1
+            return False
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        waited_from = None
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._evict_idle(now)
+                while self._idle:
+                    conn, released_at = self._idle.pop()
+                    if self._healthy(conn, released_at, now):
+                        self._checked_out(waited_from, now)
+                        return conn
+                    self._close(conn)
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                if waited_from is None:
+                    waited_from = now
+                    self._stats["waits"] += 1
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise TimeoutError(f"DB 커넥션 풀 대기 시간 초과 ({self.timeout}s)")
+                self._cond.wait(remaining)
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["created"] += 1
+            self._checked_out(waited_from, time.monotonic())
+        return conn
+
+    def _checked_out(self, waited_from, now):
+        self._stats["checkouts"] += 1
+        if waited_from is not None:
+            self._stats["wait_seconds"] += now - waited_from
+
+    def release(self, conn, broken=False):
+        """반납 전에 열린 트랜잭션은 롤백하고 autocommit을 원래대로 돌려놓음"""
+        if not broken:
+            try:
+                if conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                    conn.rollback()
+                if not conn.get_autocommit():
+                    conn.autocommit(True)
+            except Exception:
+                broken = True
+        with self._cond:
+            if broken or not conn.open:
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except pymysql.err.OperationalError:
+            broken = True
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    def metrics(self):
+        with self._cond:
+            return {**self._stats, "size": self._size, "idle": len(self._idle),
+                    "in_use": self._size - len(self._idle)}
+
+    def close(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                self._close(conn)
+            self._idle = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """프로세스 단위로 공유하는 기본 커넥션 풀"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+
+def pooled_connection():
+    """with pooled_connection() as conn: 형태로 풀에서 커넥션을 빌려 씀"""
+    return get_pool().connection()
+
+
+def run_in_transaction(conn, fn, retries=LOCK_RETRIES):
+    """
+    conn.begin() → fn(conn) → commit. 같은 행을 건드리는 단계가 동시에 돌 때를 대비해
+    데드락(1213)/락 대기 시간 초과(1205)면 롤백하고 잠깐 쉬었다가 트랜잭션 전체를 다시 실행.
+    그 밖의 오류는 롤백 후 그대로 올림. return: fn의 반환값
+    """
+    from util.metrics import inc
+
+    for attempt in range(retries + 1):
+        conn.begin()
+        try:
+            result = fn(conn)
+            conn.commit()
+            return result
+        except pymysql.err.MySQLError as e:
+            conn.rollback()
+            if not e.args or e.args[0] not in LOCK_RETRY_ERRORS or attempt == retries:
+                raise
+            inc("db_lock_retries_total", code=e.args[0])
+            time.sleep(random.uniform(0, 0.2 * 2 ** attempt))
+        except Exception:
+            conn.rollback()
+            raise
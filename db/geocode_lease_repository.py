@@ -0,0 +1,104 @@
+from db.shard_map_repository import institution_filter
+
+
+def ensure_lease_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS geocode_lease (
+          cleaned_id BIGINT PRIMARY KEY,
+          worker_id VARCHAR(100) NOT NULL,
+          leased_until DATETIME(6) NOT NULL,
+          INDEX idx_geocode_lease_worker (worker_id, leased_until)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+
+
+def claim_rows(conn, worker_id: str, limit: int, lease_seconds: int, institution_codes=None):
+    """
+    좌표가 없고 유효한 리스도 없는 행을 limit개까지 worker_id 이름으로 리스.
+    - FOR UPDATE SKIP LOCKED: 동시에 고르는 다른 워커가 잡은 행은 건너뜀
+    - 이미 유효한 리스가 있으면 덮어쓰지 않고, 실제로 내 것이 된 행만 반환
+    return: [{"id": ..., "address": ...}]
+    """
+    code_sql, code_params = institution_filter("c.institution_code", institution_codes)
+    conn.begin()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                           SELECT c.id, c.address
+                           FROM local_store_cleaned AS c
+                           LEFT JOIN geocode_lease AS l
+                               ON l.cleaned_id = c.id
+                              AND l.leased_until > NOW(6)
+                           WHERE (c.latitude IS NULL OR c.longitude IS NULL)
+                             AND l.cleaned_id IS NULL
+                             {code_sql}
+                           ORDER BY c.id
+                           LIMIT %s
+                           FOR UPDATE OF c SKIP LOCKED
+                           """, (*code_params, limit))
+            rows = cursor.fetchall()
+            if rows:
+                # worker_id를 먼저 바꾸고(만료된 리스만), 내 것이 된 행만 만료 시각 갱신
+                cursor.executemany("""
+                                   INSERT INTO geocode_lease (cleaned_id, worker_id, leased_until)
+                                   VALUES (%s, %s, NOW(6) + INTERVAL %s SECOND)
+                                   ON DUPLICATE KEY UPDATE
+                                       worker_id    = IF(leased_until <= NOW(6), VALUES(worker_id), worker_id),
+                                       leased_until = IF(worker_id = VALUES(worker_id), VALUES(leased_until), leased_until)
+                                   """, [(row["id"], worker_id, lease_seconds) for row in rows])
+                placeholders = ", ".join(["%s"] * len(rows))
+                cursor.execute(f"""
+                               SELECT cleaned_id
+                               FROM geocode_lease
+                               WHERE worker_id = %s
+                                 AND cleaned_id IN ({placeholders})
+                               """, (worker_id, *[row["id"] for row in rows]))
+                mine = {row["cleaned_id"] for row in cursor.fetchall()}
+                rows = [row for row in rows if row["id"] in mine]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return rows
+
+
+def renew_leases(conn, worker_id: str, ids, lease_seconds: int):
+    """
+    작업 중인 청크(ids)의 리스만 연장 (flush 때마다 호출).
+    같은 worker_id라도 defer_leases로 뒤로 미룬 이전 청크의 실패 행은 건드리지 않음.
+    """
+    ids = list(ids)
+    for start in range(0, len(ids), 1000):
+        chunk = ids[start:start + 1000]
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                           UPDATE geocode_lease
+                           SET leased_until = NOW(6) + INTERVAL %s SECOND
+                           WHERE worker_id = %s
+                             AND leased_until > NOW(6)
+                             AND cleaned_id IN ({', '.join(['%s'] * len(chunk))})
+                           """, (lease_seconds, worker_id, *chunk))
+
+
+def release_leases(conn, ids):
+    """좌표 저장이 끝난 행의 리스 삭제"""
+    ids = list(ids)
+    for start in range(0, len(ids), 1000):
+        chunk = ids[start:start + 1000]
+        with conn.cursor() as cursor:
+            cursor.execute(f"DELETE FROM geocode_lease WHERE cleaned_id IN ({', '.join(['%s'] * len(chunk))})",
+                           chunk)
+
+
+def defer_leases(conn, ids, retry_after_seconds: int):
+    """실패한 행은 리스를 retry_after_seconds 뒤로 미뤄 그동안 다른 워커도 다시 잡지 않게 함"""
+    ids = list(ids)
+    for start in range(0, len(ids), 1000):
+        chunk = ids[start:start + 1000]
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                           UPDATE geocode_lease
+                           SET leased_until = NOW(6) + INTERVAL %s SECOND
+                           WHERE cleaned_id IN ({', '.join(['%s'] * len(chunk))})
+                           """, (retry_after_seconds, *chunk))
@@ -1,11 +1,8 @@
-from db.connection import get_db_connection
+from db.connection import pooled_connection
 
 
 def get_institution_codes():
-    conn = get_db_connection()
-    try:
+    with pooled_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT code, region_name FROM institution_code")
             return cursor.fetchall()
-    finally:
-        conn.close()
@@ -1,12 +1,19 @@
-def get_batch_after_id(conn, last_id: int, batch_size: int):
+import pymysql
+
+from db.shard_map_repository import institution_filter
+
+
+def get_batch_after_id(conn, last_id: int, batch_size: int, institution_codes=None):
+    code_sql, code_params = institution_filter("institution_code", institution_codes)
     with conn.cursor() as cursor:
-        cursor.execute("""
+        cursor.execute(f"""
                        SELECT id, address
                        FROM local_store_cleaned
                        WHERE id > %s
+                         {code_sql}
                        ORDER BY id ASC
                            LIMIT %s
-                       """, (last_id, batch_size))
+                       """, (last_id, *code_params, batch_size))
         return cursor.fetchall()
 
 
@@ -18,3 +25,72 @@ def update_coordinates(conn, id: int, lat: float, lng: float):
                            longitude = %s
                        WHERE id = %s
                        """, (lat, lng, id))
+
+
+def _staged_points(rows):
+    """rows: [(id, lat, lng)] → UNION ALL 파생 테이블 SQL과 파라미터"""
+    staged = " UNION ALL ".join(["SELECT %s AS id, %s AS lat, %s AS lng"] * len(rows))
+    return staged, [value for row in rows for value in row]
+
+
+def update_coordinates_bulk(conn, rows, chunk_size: int = 500) -> int:
+    """
+    rows: [(id, lat, lng)] 를 chunk_size개씩 UPDATE JOIN 한 번으로 반영.
+    local_store_cleaned 좌표와 local_store_coordinate POINT를 같이 씀 (커밋은 호출자가 관리).
+    return: 반영된 좌표 테이블 행 수
+    """
+    touched = 0
+    for start in range(0, len(rows), chunk_size):
+        staged, params = _staged_points(rows[start:start + chunk_size])
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                           UPDATE local_store_cleaned AS c
+                           JOIN ({staged}) AS v ON v.id = c.id
+                           SET c.latitude  = v.lat,
+                               c.longitude = v.lng
+                           """, params)
+
+            touched += cursor.execute(f"""
+                           UPDATE local_store_coordinate AS coord
+                           JOIN ({staged}) AS v ON v.id = coord.cleaned_id
+                           SET coord.location = ST_SRID(POINT(v.lng, v.lat), 4326)
+                           WHERE coord.location IS NULL
+                              OR NOT ST_Equals(coord.location, ST_SRID(POINT(v.lng, v.lat), 4326))
+                           """, params)
+
+            touched += cursor.execute(f"""
+                           INSERT INTO local_store_coordinate (cleaned_id, location)
+                           SELECT v.id, ST_SRID(POINT(v.lng, v.lat), 4326)
+                           FROM ({staged}) AS v
+                           LEFT JOIN local_store_coordinate AS coord
+                               ON coord.cleaned_id = v.id
+                           WHERE coord.cleaned_id IS NULL
+                           """, params)
+    return touched
+
+
+def iter_store_points(conn, ids=None, fetch_size: int = 10000):
+    """
+    좌표가 있는 가게를 서버 사이드 커서로 스트리밍 (id, lat, lng, sector_name).
+    ids를 주면 해당 id만 (좌표가 없어진 행은 결과에서 빠짐).
+    """
+    sql = """
+          SELECT id, latitude, longitude, sector_name
+          FROM local_store_cleaned
+          WHERE latitude IS NOT NULL
+            AND longitude IS NOT NULL
+          """
+    params = ()
+    if ids is not None:
+        if not ids:
+            return
+        sql += f" AND id IN ({', '.join(['%s'] * len(ids))})"
+        params = tuple(ids)
+
+    with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                return
+            yield from rows
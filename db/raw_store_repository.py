@@ -1,5 +1,22 @@
+import hashlib
 import logging
 
+from util.metrics import inc, timer
+
+BULK_CHUNK_SIZE = 500
+
+COLUMNS = (
+    "affiliate_name", "local_bill", "ctpv_name", "sgg_name",
+    "road_addr", "lotno_addr", "sector_name", "main_prd",
+    "telno", "instt_code", "instt_name", "crtr_ymd",
+)
+# local_store 유니크 키(uk_local_store) = 가맹점 식별 기준
+IDENTITY_COLUMNS = ("affiliate_name", "lotno_addr", "instt_code")
+# 기존 행에 ON DUPLICATE KEY UPDATE로 덮어쓰는 컬럼 = 내용 해시 대상
+# (road_addr는 도로명주소 보정 단계가 고쳐 쓰므로 수집 데이터로 덮어쓰지 않음 → 해시에서도 제외)
+UPDATE_COLUMNS = ("sector_name", "main_prd", "telno", "instt_name")
+CONTENT_COLUMNS = UPDATE_COLUMNS
+
 
 def convert_keys(item):
     return {
@@ -18,6 +35,75 @@ def convert_keys(item):
     }
 
 
+def map_item(item):
+    mapped = convert_keys(item)
+    if not mapped["road_addr"]:
+        mapped["road_addr"] = mapped["lotno_addr"]
+    return mapped
+
+
+def _digest(mapped, columns):
+    raw = "\x1f".join("" if mapped[col] is None else str(mapped[col]) for col in columns)
+    return hashlib.sha1(raw.encode("utf-8")).digest()
+
+
+def fingerprint(mapped):
+    """(식별 키, 내용 해시) - convert_keys로 매핑된 필드 기준"""
+    return _digest(mapped, IDENTITY_COLUMNS), _digest(mapped, CONTENT_COLUMNS)
+
+
+def ensure_fingerprint_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS local_store_fingerprint (
+          store_key BINARY(20) PRIMARY KEY,
+          content_hash BINARY(20) NOT NULL,
+          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+
+
+def classify_items(conn, items, chunk_size=BULK_CHUNK_SIZE, keep_unchanged=False):
+    """
+    저장된 지문과 비교해서 신규/변경/동일로 분류.
+    keep_unchanged=True면 동일한 항목도 쓰기 대상에 "unchanged"로 남김.
+    return: ([(item, "new" | "changed" | "unchanged")], {"new", "changed", "skipped"})
+    """
+    entries = {}
+    for item in items:
+        key, content = fingerprint(map_item(item))
+        entries[key] = (item, content)  # 같은 응답 안의 중복은 마지막 값 기준
+
+    stored = {}
+    keys = list(entries)
+    with conn.cursor() as cursor:
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"SELECT store_key, content_hash FROM local_store_fingerprint WHERE store_key IN ({placeholders})",
+                chunk)
+            for row in cursor.fetchall():
+                stored[bytes(row["store_key"])] = bytes(row["content_hash"])
+
+    counts = {"new": 0, "changed": 0, "skipped": len(items) - len(entries)}
+    targets = []
+    for key, (item, content) in entries.items():
+        if key not in stored:
+            status = "new"
+        elif stored[key] != content:
+            status = "changed"
+        elif keep_unchanged:
+            targets.append((item, "unchanged"))
+            continue
+        else:
+            counts["skipped"] += 1
+            continue
+        counts[status] += 1
+        targets.append((item, status))
+    return targets, counts
+
+
 def upsert_store_data(conn, items):
     if not items:
         return
@@ -40,11 +126,87 @@ def upsert_store_data(conn, items):
 
         for item in items:
             try:
-                mapped = convert_keys(item)
-
-                if not mapped["road_addr"]:
-                    mapped["road_addr"] = mapped["lotno_addr"]
+                mapped = map_item(item)
 
                 cursor.execute(sql, mapped)
             except Exception as e:
                 logging.error(f"❌ UPSERT 실패 - {item.get('affiliateNm', '알 수 없음')}: {e}")
+
+
+def _bulk_sql(row_count):
+    row = "(" + ", ".join(["%s"] * len(COLUMNS)) + ")"
+    return f"""
+        INSERT INTO local_store ({", ".join(COLUMNS)})
+        VALUES {", ".join([row] * row_count)}
+        ON DUPLICATE KEY UPDATE
+            {", ".join(f"{col} = VALUES({col})" for col in UPDATE_COLUMNS)}
+    """
+
+
+def _write_chunk(conn, entries):
+    """
+    classify_items가 분류한 [(item, 상태)]를 하나의 multi-VALUES INSERT로 하나의 트랜잭션에 기록.
+    return: 상태별 기록 건수 {"new", "changed", "unchanged"}
+    """
+    params = []
+    fingerprints = []
+    written = {"new": 0, "changed": 0, "unchanged": 0}
+    for item, status in entries:
+        mapped = map_item(item)
+        params.extend(mapped[col] for col in COLUMNS)
+        fingerprints.append(fingerprint(mapped))
+        written[status] += 1
+
+    conn.begin()
+    try:
+        with conn.cursor() as cursor, timer("db_statement_seconds", statement="raw_upsert"):
+            cursor.execute(_bulk_sql(len(entries)), params)
+            # 지문은 같은 트랜잭션에서 저장 → 실패한 청크의 지문은 남지 않음
+            cursor.executemany("""
+                INSERT INTO local_store_fingerprint (store_key, content_hash)
+                VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE content_hash = VALUES(content_hash)
+            """, fingerprints)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    inc("rows_written_total", len(entries), table="local_store", stage="raw_upsert")
+    return written
+
+
+def _write_bisect(conn, entries, result):
+    try:
+        written = _write_chunk(conn, entries)
+        result["inserted"] += written["new"]
+        result["updated"] += written["changed"]
+        result["unchanged"] += written["unchanged"]
+    except Exception as e:
+        if len(entries) == 1:
+            result["failed"] += 1
+            inc("rows_failed_total", table="local_store", stage="raw_upsert")
+            logging.error(f"❌ UPSERT 실패 - {entries[0][0].get('affiliateNm', '알 수 없음')}: {e}")
+            return
+        mid = len(entries) // 2
+        _write_bisect(conn, entries[:mid], result)
+        _write_bisect(conn, entries[mid:], result)
+
+
+def upsert_store_data_bulk(conn, items, chunk_size=BULK_CHUNK_SIZE, skip_unchanged=True):
+    """
+    chunk_size개씩 multi-VALUES INSERT ... ON DUPLICATE KEY UPDATE (청크당 트랜잭션 1개).
+    청크가 실패하면 절반씩 나눠 재시도해서 문제 행만 골라 로그로 남김.
+    skip_unchanged=True면 내용 해시가 저장된 것과 같은 항목은 쓰지 않음.
+    inserted/updated/unchanged는 지문 분류 기준으로, 기록에 성공한 행만 셈.
+    (ensure_fingerprint_table이 먼저 호출되어 있어야 함)
+    return: {"new", "changed", "skipped", "inserted", "updated", "unchanged", "failed"}
+    """
+    with timer("db_statement_seconds", statement="fingerprint_lookup"):
+        entries, counts = classify_items(conn, items or [], chunk_size, keep_unchanged=not skip_unchanged)
+    inc("rows_skipped_total", counts["skipped"], table="local_store", stage="raw_upsert")
+
+    result = {**counts, "inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+    for start in range(0, len(entries), chunk_size):
+        _write_bisect(conn, entries[start:start + chunk_size], result)
+    return result
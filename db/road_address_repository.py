@@ -1,32 +1,71 @@
-from db.connection import get_db_connection
+from db.connection import pooled_connection
+from db.shard_map_repository import institution_filter
 
 
 def fetch_target_rows(batch_size=100, min_id=400000, max_id=500000):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-                   SELECT id, lotno_addr
-                   FROM local_store
-                   WHERE id >= %s
-                     AND id <= %s
-                     AND (road_addr IS NULL OR road_addr = '')
-                     AND lotno_addr IS NOT NULL
-                     AND lotno_addr != ''
-                   ORDER BY id ASC
-                       LIMIT %s
-                   """, (min_id, max_id, batch_size))
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+                       SELECT id, lotno_addr
+                       FROM local_store
+                       WHERE id >= %s
+                         AND id <= %s
+                         AND (road_addr IS NULL OR road_addr = '')
+                         AND lotno_addr IS NOT NULL
+                         AND lotno_addr != ''
+                       ORDER BY id ASC
+                           LIMIT %s
+                       """, (min_id, max_id, batch_size))
+        return cursor.fetchall()
 
 
 def update_road_address(row_id, road_addr):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-                   UPDATE local_store
-                   SET road_addr = %s
-                   WHERE id = %s
-                   """, (road_addr, row_id))
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+                       UPDATE local_store
+                       SET road_addr = %s
+                       WHERE id = %s
+                       """, (road_addr, row_id))
+        conn.commit()
+
+
+def fetch_target_rows_after(conn, last_id, max_id, batch_size=1000, institution_codes=None):
+    """
+    id 키셋 페이지네이션: last_id 이후의 도로명주소 누락 행을 batch_size만큼 조회
+    """
+    code_sql, code_params = institution_filter("instt_code", institution_codes)
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+                       SELECT id, lotno_addr
+                       FROM local_store
+                       WHERE id > %s
+                         AND id <= %s
+                         AND (road_addr IS NULL OR road_addr = '')
+                         AND lotno_addr IS NOT NULL
+                         AND lotno_addr != ''
+                         {code_sql}
+                       ORDER BY id ASC
+                           LIMIT %s
+                       """, (last_id, max_id, *code_params, batch_size))
+        return cursor.fetchall()
+
+
+def update_road_addresses(conn, pairs, chunk_size=500):
+    """
+    pairs: [(row_id, road_addr)] → CASE 문으로 chunk_size개씩 한 번에 UPDATE
+    return: 변경된 행 수
+    """
+    updated = 0
+    with conn.cursor() as cursor:
+        for start in range(0, len(pairs), chunk_size):
+            chunk = pairs[start:start + chunk_size]
+            cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+            placeholders = ", ".join(["%s"] * len(chunk))
+            params = [v for row_id, road in chunk for v in (row_id, road)]
+            params += [row_id for row_id, _ in chunk]
+            updated += cursor.execute(f"""
+                                      UPDATE local_store
+                                      SET road_addr = CASE id {cases} END
+                                      WHERE id IN ({placeholders})
+                                      """, params)
     conn.commit()
-    conn.close()
+    return updated
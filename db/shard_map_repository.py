@@ -0,0 +1,16 @@
+def get_shard_codes(conn) -> dict:
+    """shard_map → {shard_id: [institution_code, ...]}"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT institution_code, shard_id FROM shard_map ORDER BY shard_id, institution_code")
+        shards = {}
+        for row in cursor.fetchall():
+            shards.setdefault(int(row["shard_id"]), []).append(str(row["institution_code"]))
+        return shards
+
+
+def institution_filter(column: str, institution_codes):
+    """샤드 워커용 기관코드 필터 → (sql 조각, params). 코드가 없으면 빈 조건"""
+    if not institution_codes:
+        return "", ()
+    placeholders = ", ".join(["%s"] * len(institution_codes))
+    return f"AND {column} IN ({placeholders})", tuple(institution_codes)
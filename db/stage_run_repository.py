@@ -0,0 +1,47 @@
+import json
+
+
+def ensure_stage_run_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS batch_stage_run (
+          id BIGINT AUTO_INCREMENT PRIMARY KEY,
+          run_id VARCHAR(32) NOT NULL,
+          stage VARCHAR(50) NOT NULL,
+          status VARCHAR(12) NOT NULL,
+          input_fingerprint CHAR(40) NULL,
+          input_rows BIGINT NULL,
+          output_rows BIGINT NULL,
+          detail TEXT NULL,
+          started_at DATETIME(6) NOT NULL,
+          finished_at DATETIME(6) NOT NULL,
+          INDEX idx_batch_stage_run_stage (stage, status, id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+
+
+def last_success(conn, stage: str):
+    """stage의 마지막 성공(ok) 실행. 없으면 None"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       SELECT run_id, input_fingerprint, input_rows, output_rows, finished_at
+                       FROM batch_stage_run
+                       WHERE stage = %s
+                         AND status = 'ok'
+                       ORDER BY id DESC
+                       LIMIT 1
+                       """, (stage,))
+        return cursor.fetchone()
+
+
+def record_stage_run(conn, run_id: str, stage: str, status: str, started_at, finished_at,
+                     input_fingerprint=None, input_rows=None, output_rows=None, detail=None):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       INSERT INTO batch_stage_run
+                           (run_id, stage, status, input_fingerprint, input_rows, output_rows, detail,
+                            started_at, finished_at)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                       """, (run_id, stage, status, input_fingerprint, input_rows, output_rows,
+                             json.dumps(detail, ensure_ascii=False, default=str) if detail else None,
+                             started_at, finished_at))
@@ -0,0 +1,18 @@
+import argparse
+
+from service.cleaned_export_service import FORMATS, PARTITIONS, export_cleaned
+from util.metrics import timer, write_run_metrics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="local_store_cleaned → Parquet/Arrow 컬럼 파일 내보내기")
+    parser.add_argument("--incremental", action="store_true", help="지난 내보내기 이후 변경된 행만 추가")
+    parser.add_argument("--partition-by", choices=PARTITIONS, default="institution_code")
+    parser.add_argument("--format", choices=tuple(FORMATS), default="parquet")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    options = {"chunk_size": args.chunk_size} if args.chunk_size else {}
+    with timer("stage_seconds", stage="cleaned_export"):
+        export_cleaned(incremental=args.incremental, partition_by=args.partition_by,
+                       file_format=args.format, **options)
+    write_run_metrics("cleaned_export")
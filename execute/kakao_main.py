@@ -1,4 +1,29 @@
-from service.kakao_coordinate_update_service import KakaoCoordinateUpdateService
+import argparse
+
+from db.connection import get_pool
+from service.api_quota import ApiQuota
+from service.kakao_coordinate_update_service import KakaoCoordinateUpdateService, run_lease_workers
+from util.metrics import timer, write_run_metrics
 
 if __name__ == "__main__":
-    KakaoCoordinateUpdateService().run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="카카오 좌표 보정 배치")
+    parser.add_argument("--lease", action="store_true",
+                        help="progress 커서 대신 리스 테이블로 행을 나눠 받음 (여러 워커/호스트 동시 실행 가능)")
+    parser.add_argument("--workers", type=int, default=1, help="리스 모드에서 이 호스트에 띄울 워커 수")
+    parser.add_argument("--max-rows", type=int, default=None, help="리스 모드에서 이번 실행의 최대 처리 행 수")
+    parser.add_argument("--scheduled", action="store_true",
+                        help="오늘 남은 쿼터만큼 신규 → 주소 변경 → 실패 재시도 순으로 처리")
+    parser.add_argument("--daily-quota", type=int, default=None, help="카카오 일일 호출 한도 (기본 KAKAO_DAILY_QUOTA)")
+    args = parser.parse_args()
+
+    with timer("stage_seconds", stage="kakao_geocode"):
+        if args.scheduled:
+            KakaoCoordinateUpdateService().run_scheduled(ApiQuota("kakao", args.daily_quota))
+        elif not args.lease:
+            KakaoCoordinateUpdateService().run()
+        elif args.workers > 1:
+            run_lease_workers(args.workers, args.max_rows)
+        else:
+            KakaoCoordinateUpdateService().run_leased(args.max_rows)
+    print("[pool]", get_pool().metrics())
+    write_run_metrics("kakao_geocode")
@@ -1,13 +1,34 @@
+import argparse
 import asyncio
+import logging
 
 from config.logging import setup_logging
-from db.connection import get_db_connection
-from service.store_sync_service import sync_all_regions
-from service.store_transform_service import transform_and_upsert_cleaned_data
+from db.connection import get_pool
+from service.store_sync_service import replay_snapshot, sync_all_regions, sync_failed_pages
+from service.store_transform_service import run_transform_cleaned_store
+from util.metrics import set_gauge, timer, write_run_metrics
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지역화폐 가맹점 수집 → 정제 배치")
+    parser.add_argument("--full-rebuild", action="store_true", help="정제 테이블을 local_store 전체로 다시 변환")
+    parser.add_argument("--retry-failed", action="store_true", help="failed_pages.jsonl에 남은 페이지만 다시 수집")
+    parser.add_argument("--replay", metavar="RUN_ID", help="API 대신 저장된 스냅샷(RUN_ID 또는 latest)으로 적재")
+    parser.add_argument("--no-archive", action="store_true", help="원본 응답 스냅샷을 남기지 않음")
+    args = parser.parse_args()
+
     setup_logging()
-    conn = get_db_connection()
-    asyncio.run(sync_all_regions(conn))
-    transform_and_upsert_cleaned_data(conn)
-    conn.close()
+    with timer("stage_seconds", stage="fetch_upsert"):
+        if args.replay:
+            asyncio.run(replay_snapshot(args.replay))
+        elif args.retry_failed:
+            asyncio.run(sync_failed_pages())
+        else:
+            asyncio.run(sync_all_regions(archive=not args.no_archive))
+    with timer("stage_seconds", stage="cleaned_transform"):
+        run_transform_cleaned_store(full_rebuild=args.full_rebuild)
+
+    pool_metrics = get_pool().metrics()
+    logging.info(f"DB 커넥션 풀 - {pool_metrics}")
+    for key, value in pool_metrics.items():
+        set_gauge(f"db_pool_{key}", value)
+    write_run_metrics("store_sync")
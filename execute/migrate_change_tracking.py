@@ -0,0 +1,18 @@
+import argparse
+
+from db.change_tracking import CHANGE_TRACKED_TABLES, ensure_updated_at_column, ensure_watermark_table
+from db.connection import pooled_connection
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="증분 처리용 updated_at 컬럼/워터마크 테이블 추가 (한 번만 실행)")
+    parser.add_argument("--tables", nargs="+", default=list(CHANGE_TRACKED_TABLES))
+    args = parser.parse_args()
+
+    # ALTER TABLE은 테이블을 다시 쓰므로 배치가 돌지 않는 시간에 실행
+    with pooled_connection() as conn:
+        ensure_watermark_table(conn)
+        for table in args.tables:
+            if ensure_updated_at_column(conn, table):
+                print(f"✅ {table}.updated_at 추가 완료")
+            else:
+                print(f"{table}.updated_at 이미 있음")
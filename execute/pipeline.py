@@ -0,0 +1,28 @@
+import argparse
+import logging
+
+from config.logging import setup_logging
+from db.connection import get_pool
+from service.pipeline_service import PIPELINE_WORKERS, STAGE_NAMES, PipelineRunner
+from util.metrics import set_gauge, write_run_metrics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="수집 → 적재 → 보정 → 정제 → 지오코딩 → 동기화 → uuid → 샤드맵 전체 배치")
+    parser.add_argument("--only", nargs="+", choices=STAGE_NAMES, help="지정한 단계만 실행 (나머지는 건너뜀)")
+    parser.add_argument("--force", action="store_true", help="입력이 그대로여도 모든 단계를 실행")
+    parser.add_argument("--replay", metavar="RUN_ID", help="수집 대신 저장된 스냅샷(RUN_ID 또는 latest)을 적재")
+    parser.add_argument("--full-rebuild", action="store_true", help="정제 테이블을 local_store 전체로 다시 변환")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS, help="동시에 실행할 단계 수")
+    args = parser.parse_args()
+
+    setup_logging()
+    results = PipelineRunner(only=args.only, force=args.force, replay=args.replay,
+                             full_rebuild=args.full_rebuild, workers=args.workers).run()
+
+    pool_metrics = get_pool().metrics()
+    logging.info(f"DB 커넥션 풀 - {pool_metrics}")
+    for key, value in pool_metrics.items():
+        set_gauge(f"db_pool_{key}", value)
+    write_run_metrics("pipeline", extra={"stages": results})
+    if any(r["status"] in ("failed", "blocked") for r in results.values()):
+        raise SystemExit(1)
@@ -1,4 +1,36 @@
-from service.road_address_update_service import run_sync_batch
+import argparse
+import asyncio
+
+from db.connection import get_pool
+from service.api_quota import ApiQuota
+from service.road_address_update_service import (
+    CONCURRENCY, MAX_IN_FLIGHT, RATE_PER_SEC, run_async_batch
+)
+from util.metrics import timer, write_run_metrics
 
 if __name__ == "__main__":
-    run_sync_batch(batch_size=100)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="지번주소 → 도로명주소 비동기 보정 배치")
+    parser.add_argument("--min-id", type=int, default=1)
+    parser.add_argument("--max-id", type=int, default=1000000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=RATE_PER_SEC, help="초당 최대 요청 수")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT)
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 min-id부터 다시 시작")
+    parser.add_argument("--daily-quota", type=int, default=None,
+                        help="주소 API 일일 호출 한도 (기본 JUSO_DAILY_QUOTA, 0이면 제한 없음)")
+    args = parser.parse_args()
+
+    with timer("stage_seconds", stage="road_address"):
+        asyncio.run(run_async_batch(
+            min_id=args.min_id,
+            max_id=args.max_id,
+            page_size=args.page_size,
+            concurrency=args.concurrency,
+            rate_per_sec=args.rate,
+            max_in_flight=args.max_in_flight,
+            resume=not args.restart,
+            quota=ApiQuota("juso", args.daily_quota),
+        ))
+    print("[pool]", get_pool().metrics())
+    write_run_metrics("road_address")
@@ -0,0 +1,23 @@
+import argparse
+
+from config.logging import setup_logging
+from service.shard_executor_service import JOBS, run_sharded
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="shard_map 기준으로 샤드마다 워커 프로세스를 띄워 배치 실행")
+    parser.add_argument("job", choices=JOBS)
+    parser.add_argument("--shards", type=int, nargs="+", help="이 호스트에서 돌릴 샤드 id (기본: 전체)")
+    parser.add_argument("--rate", type=float, help="kakao/road_addr: 이 호스트 전체 초당 요청 수 (샤드 수로 나눔)")
+    parser.add_argument("--max-rows", type=int, help="kakao: 이 호스트 전체 최대 처리 행 수 (샤드 수로 나눔)")
+    parser.add_argument("--uuid-version", type=int, choices=(4, 7), default=4)
+    args = parser.parse_args()
+
+    setup_logging()
+    options = {}
+    if args.job in ("kakao", "road_addr") and args.rate:
+        options["rate_per_sec"] = args.rate
+    if args.job == "kakao" and args.max_rows:
+        options["max_rows"] = args.max_rows
+    if args.job == "uuid":
+        options["uuid_version"] = args.uuid_version
+    run_sharded(args.job, args.shards, options)
@@ -2,4 +2,5 @@
 
 cd /Users/junkiheo/PycharmProjects/SpartaBatch
 source .venv/bin/activate
-python kakao_main.py >> logs/kakao_batch_$(date +\%Y-\%m-\%d).log 2>&1
+# 수집부터 샤드맵까지 단계 DAG로 실행 (입력이 그대로인 단계는 자동으로 건너뜀)
+python -m execute.pipeline >> logs/pipeline_batch_$(date +\%Y-\%m-\%d).log 2>&1
@@ -0,0 +1,62 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from db.api_quota_repository import add_usage, get_usage
+from util.metrics import REGISTRY, set_gauge
+
+load_dotenv()
+DAILY_QUOTAS = {
+    "kakao": int(os.getenv("KAKAO_DAILY_QUOTA", "95000")),
+    "juso": int(os.getenv("JUSO_DAILY_QUOTA", "0")),  # 0 = 제한 없음
+}
+# API별로 이 프로세스가 마지막으로 DB에 반영한 http_requests_total 값.
+# 인스턴스가 여러 개여도 같은 호출을 두 번 더하지 않도록 프로세스 전체에서 공유
+_synced = {}
+_synced_lock = threading.Lock()
+
+
+class ApiQuota:
+    """
+    API별 일일 호출 한도. 실제로 나간 HTTP 호출(캐시 미스)만 http_requests_total 지표에서 세어
+    api_quota_usage 테이블에 날짜별로 누적 → 재시작하거나 여러 프로세스가 돌아도 같은 사용량을 봄.
+    스케줄 모드뿐 아니라 API를 호출하는 모든 실행 경로가 sync로 사용량을 남겨야 남은 쿼터가 맞음.
+    """
+
+    def __init__(self, api: str, daily_limit: int = None):
+        self.api = api
+        self.daily_limit = DAILY_QUOTAS.get(api, 0) if daily_limit is None else daily_limit
+        with _synced_lock:
+            _synced.setdefault(api, REGISTRY.counter_total("http_requests_total", endpoint=api))
+
+    @property
+    def unlimited(self) -> bool:
+        return self.daily_limit <= 0
+
+    def sync(self, conn) -> int:
+        """지난 sync 이후 호출 수를 DB에 더함. return: 더한 호출 수"""
+        with _synced_lock:
+            now = REGISTRY.counter_total("http_requests_total", endpoint=self.api)
+            seen = _synced[self.api]
+            calls = now - seen if now >= seen else now  # 지표가 reset된 경우
+            _synced[self.api] = now
+        if calls:
+            add_usage(conn, self.api, calls)
+        return calls
+
+    def remaining(self, conn):
+        """오늘 남은 호출 수. 제한이 없으면 None"""
+        self.sync(conn)
+        if self.unlimited:
+            return None
+        left = max(0, self.daily_limit - get_usage(conn, self.api))
+        set_gauge("api_quota_remaining", left, api=self.api)
+        return left
+
+    def report(self, conn) -> str:
+        self.sync(conn)
+        used = get_usage(conn, self.api)
+        if self.unlimited:
+            return f"[quota] {self.api}: 오늘 {used}회 사용 (제한 없음)"
+        return f"[quota] {self.api}: 오늘 {used}/{self.daily_limit}회 사용, 남은 호출 {max(0, self.daily_limit - used)}회"
@@ -0,0 +1,277 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from db.change_tracking import (
+    db_now, ensure_watermark_table, get_watermark, require_updated_at_column, save_watermark
+)
+from db.cleaned_store_repository import get_column_types, get_table_columns, iter_cleaned_chunks
+from db.connection import pooled_connection
+from db.shard_map_repository import get_shard_codes
+from util.metrics import inc, timer
+
+load_dotenv()
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "20000"))
+EXPORT_COMPRESSION = os.getenv("EXPORT_COMPRESSION", "zstd")
+# 파티션마다 이만큼 모아서 row group 하나로 씀 (청크마다 쓰면 작은 row group이 잔뜩 생김)
+EXPORT_ROW_GROUP_ROWS = int(os.getenv("EXPORT_ROW_GROUP_ROWS", "128000"))
+# 모든 파티션 버퍼 합계 상한. 넘으면 가장 큰 파티션부터 씀
+EXPORT_BUFFER_ROWS = int(os.getenv("EXPORT_BUFFER_ROWS", "1000000"))
+WATERMARK_NAME = "cleaned_export"
+DATASET = "local_store_cleaned"
+PARTITIONS = ("institution_code", "shard")
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("컬럼 파일 내보내기에는 pyarrow가 필요합니다: pip install pyarrow")
+    return pyarrow
+
+
+def _arrow_type(pa, column):
+    """information_schema.COLUMNS 한 행 → Arrow 타입 (pymysql이 돌려주는 파이썬 타입 기준)"""
+    data_type = column["data_type"].lower()
+    unsigned = "unsigned" in column["column_type"].lower()
+    integers = {
+        "tinyint": (pa.int8(), pa.uint8()),
+        "smallint": (pa.int16(), pa.uint16()),
+        "mediumint": (pa.int32(), pa.uint32()),
+        "int": (pa.int32(), pa.uint32()),
+        "integer": (pa.int32(), pa.uint32()),
+        "bigint": (pa.int64(), pa.uint64()),
+    }
+    if data_type in integers:
+        return integers[data_type][unsigned]
+    if data_type in ("decimal", "numeric"):
+        return pa.decimal128(int(column["num_precision"]), int(column["num_scale"] or 0))
+    if data_type == "float":
+        return pa.float32()
+    if data_type in ("double", "real"):
+        return pa.float64()
+    if data_type == "year":
+        return pa.int16()
+    if data_type == "date":
+        return pa.date32()
+    if data_type in ("datetime", "timestamp"):
+        return pa.timestamp("us")
+    if data_type == "time":
+        return pa.duration("us")
+    if data_type in ("char", "varchar", "tinytext", "text", "mediumtext", "longtext", "enum", "set", "json"):
+        return pa.string()
+    if data_type == "binary":
+        return pa.binary(int(column["max_length"]))
+    if data_type in ("varbinary", "tinyblob", "blob", "mediumblob", "longblob", "bit",
+                     "geometry", "point", "linestring", "polygon"):
+        return pa.binary()
+    raise ValueError(f"Arrow 타입으로 바꿀 수 없는 컬럼 타입입니다: {column['name']} {column['column_type']}")
+
+
+def _arrow_schema(pa, columns, column_types):
+    return pa.schema([(name, _arrow_type(pa, column_types[name])) for name in columns])
+
+
+class _PartitionWriters:
+    """
+    파티션 값별로 파일을 하나씩 열어 두고 청크를 이어 씀. 끝나면 .tmp → 최종 이름으로 교체.
+    청크는 파티션별로 row_group_rows까지 모았다가 row group 하나로 씀
+    (버퍼 합계가 buffer_rows를 넘으면 가장 큰 파티션부터 먼저 씀)
+    """
+
+    def __init__(self, pa, schema, directory, partition_by, run_id, file_format,
+                 row_group_rows=EXPORT_ROW_GROUP_ROWS, buffer_rows=EXPORT_BUFFER_ROWS):
+        self.pa = pa
+        self.schema = schema
+        self.directory = directory
+        self.partition_by = partition_by
+        self.file_name = f"{run_id}.{FORMATS[file_format]}"
+        self.file_format = file_format
+        self.row_group_rows = row_group_rows
+        self.buffer_rows = buffer_rows
+        self.writers = {}
+        self.rows = {}
+        self.pending = {}  # 파티션 값 → 아직 쓰지 않은 테이블 목록
+        self.pending_rows = {}
+
+    def _open(self, value):
+        path = os.path.join(self.directory, f"{self.partition_by}={value}", self.file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        if self.file_format == "parquet":
+            writer = self.pa.parquet.ParquetWriter(tmp_path, self.schema, compression=EXPORT_COMPRESSION)
+        else:
+            options = self.pa.ipc.IpcWriteOptions(compression=EXPORT_COMPRESSION)
+            writer = self.pa.ipc.new_file(tmp_path, self.schema, options=options)
+        self.writers[value] = (writer, tmp_path, path)
+        self.rows[value] = 0
+        return writer
+
+    def write(self, value, table):
+        self.pending.setdefault(value, []).append(table)
+        self.pending_rows[value] = self.pending_rows.get(value, 0) + table.num_rows
+        if self.pending_rows[value] >= self.row_group_rows:
+            self._flush(value, full_groups_only=True)
+        while sum(self.pending_rows.values()) > self.buffer_rows:
+            self._flush(max(self.pending_rows, key=self.pending_rows.get))
+
+    def _flush(self, value, full_groups_only=False):
+        """버퍼를 씀. full_groups_only면 row_group_rows 배수만큼만 쓰고 나머지는 버퍼에 남김"""
+        tables = self.pending.pop(value, None)
+        self.pending_rows.pop(value, None)
+        if not tables:
+            return
+        table = self.pa.concat_tables(tables).combine_chunks()
+        if full_groups_only:
+            size = table.num_rows - table.num_rows % self.row_group_rows
+            if size < table.num_rows:
+                self.pending[value] = [table.slice(size)]
+                self.pending_rows[value] = table.num_rows - size
+            table = table.slice(0, size)
+        writer = self.writers[value][0] if value in self.writers else self._open(value)
+        if self.file_format == "parquet":
+            writer.write_table(table, row_group_size=self.row_group_rows)
+        else:
+            writer.write_table(table, max_chunksize=self.row_group_rows)
+        self.rows[value] += table.num_rows
+
+    def close(self, keep=True):
+        """return: 완성된 파일 경로 목록 (keep=False면 임시 파일 삭제)"""
+        if keep:
+            for value in list(self.pending):
+                self._flush(value)
+        paths = []
+        for writer, tmp_path, path in self.writers.values():
+            writer.close()
+            if keep:
+                os.replace(tmp_path, path)
+                paths.append(path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return paths
+
+
+def _load_manifest(root):
+    path = os.path.join(root, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(root, manifest):
+    fd, tmp_path = tempfile.mkstemp(prefix=".manifest.", dir=root)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(root, "manifest.json"))
+
+
+def _partition_func(conn, partition_by, columns):
+    code_index = columns.index("institution_code")
+    if partition_by == "institution_code":
+        return lambda row: row[code_index] or "unknown"
+    shard_of = {code: sid for sid, codes in get_shard_codes(conn).items() for code in codes}
+    return lambda row: shard_of.get(str(row[code_index]), "unassigned")
+
+
+def export_cleaned(incremental=False, partition_by="institution_code", file_format="parquet",
+                   chunk_size=EXPORT_CHUNK_SIZE, directory=EXPORT_DIR):
+    """
+    local_store_cleaned → 압축 컬럼 파일(Parquet/Arrow IPC), partition_by별 디렉터리로 분할.
+    exports/local_store_cleaned/
+        manifest.json                       ← 현재 base, 실행 이력
+        base_<run_id>/<partition>=<값>/<run_id>.parquet
+    - 전체(full): 새 base 디렉터리에 전체를 쓰고 manifest를 교체 (이전 base 하나만 남기고 정리)
+    - 증분(incremental): 지난 내보내기 이후 updated_at이 바뀐 행만 같은 base에 파일 추가
+      → 읽는 쪽은 base 전체를 읽고 id별로 updated_at이 가장 큰 행을 쓰면 됨
+    return: 이번 실행 manifest 항목
+    """
+    if partition_by not in PARTITIONS:
+        raise ValueError(f"partition_by는 {PARTITIONS} 중 하나여야 합니다: {partition_by}")
+    if file_format not in FORMATS:
+        raise ValueError(f"file_format은 {tuple(FORMATS)} 중 하나여야 합니다: {file_format}")
+    pa = _require_pyarrow()
+
+    root = os.path.join(directory, DATASET)
+    os.makedirs(root, exist_ok=True)
+    manifest = _load_manifest(root)
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+    with pooled_connection() as conn:
+        # 읽기 전용 내보내기 → 컬럼이 없으면 ALTER TABLE 대신 바로 실패
+        require_updated_at_column(conn, DATASET)
+        ensure_watermark_table(conn)
+        since = None
+        if incremental:
+            since = get_watermark(conn, WATERMARK_NAME)
+            if (since is None or manifest is None
+                    or manifest["partition_by"] != partition_by or manifest["format"] != file_format):
+                raise RuntimeError("증분 내보내기 기준이 없습니다. 같은 분할/포맷으로 전체 내보내기를 먼저 실행하세요.")
+            base = manifest["base"]
+        else:
+            base = f"base_{run_id}"
+        started_at = db_now(conn)
+
+        columns = get_table_columns(conn, DATASET)
+        columns.remove("id")
+        columns.insert(0, "id")
+        schema = _arrow_schema(pa, columns, get_column_types(conn, DATASET))
+        partition_of = _partition_func(conn, partition_by, columns)
+        writers = _PartitionWriters(pa, schema, os.path.join(root, base), partition_by, run_id, file_format)
+
+        total = 0
+        try:
+            for rows in iter_cleaned_chunks(conn, columns, chunk_size, since):
+                with timer("db_statement_seconds", statement="cleaned_export_write"):
+                    table = pa.Table.from_arrays(
+                        [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)],
+                        schema=schema)
+                    groups = {}
+                    for i, row in enumerate(rows):
+                        groups.setdefault(partition_of(row), []).append(i)
+                    for value, indices in groups.items():
+                        writers.write(value, table.take(indices))
+                total += len(rows)
+                inc("rows_written_total", len(rows), table="export", stage="cleaned_export")
+                logging.info(f"정제 테이블 내보내기 - {total}행 (마지막 id {rows[-1][0]})")
+            files = writers.close()
+        except BaseException:
+            writers.close(keep=False)
+            raise
+
+        entry = {
+            "run_id": run_id,
+            "mode": "incremental" if incremental else "full",
+            "since": since.isoformat() if since else None,
+            "until": started_at.isoformat(),
+            "rows": total,
+            "files": [os.path.relpath(path, root) for path in files],
+        }
+        if incremental:
+            manifest["runs"].append(entry)
+        else:
+            previous = manifest["base"] if manifest else None
+            manifest = {"base": base, "partition_by": partition_by, "format": file_format,
+                        "columns": columns, "runs": [entry]}
+        _save_manifest(root, manifest)
+        # 파일·manifest가 모두 확정된 뒤에 워터마크 저장 → 실패하면 다음 실행이 같은 구간을 다시 내보냄
+        save_watermark(conn, WATERMARK_NAME, started_at)
+
+    if not incremental:
+        for name in os.listdir(root):
+            if name.startswith("base_") and name not in (base, previous):
+                shutil.rmtree(os.path.join(root, name))
+
+    print(f"✅ 정제 테이블 내보내기 완료 ({entry['mode']}) - {total}행, 파일 {len(files)}개 → {os.path.join(root, base)}")
+    return entry
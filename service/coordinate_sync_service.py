@@ -1,9 +1,14 @@
+from db.connection import run_in_transaction
+from util.metrics import inc, timer
+
+
 class CoordinateSyncService:
     def __init__(self, conn):
         self.conn = conn
 
     def sync(self):
-        with self.conn.cursor() as cursor:
+        """전체 동기화. 카카오 배치는 flush 때 POINT까지 직접 쓰므로 수동 백필/복구용으로만 사용"""
+        with self.conn.cursor() as cursor, timer("db_statement_seconds", statement="coordinate_sync_full"):
             update_sql = """
                 UPDATE local_store_coordinate AS coord
                 JOIN local_store_cleaned AS new
@@ -30,3 +35,94 @@ class CoordinateSyncService:
 
         self.conn.commit()
         print("✅ 좌표 테이블 동기화 완료")
+
+    def _sync_where(self, where_sql, params):
+        """where_sql 조건(new 별칭 기준)에 맞는 행만 반영. 위치가 같은 행은 건너뜀"""
+        with self.conn.cursor() as cursor:
+            updated = cursor.execute(f"""
+                UPDATE local_store_coordinate AS coord
+                JOIN local_store_cleaned AS new
+                    ON new.id = coord.cleaned_id
+                SET coord.location = ST_SRID(POINT(new.longitude, new.latitude), 4326)
+                WHERE {where_sql}
+                  AND new.longitude IS NOT NULL
+                  AND new.latitude IS NOT NULL
+                  AND (coord.location IS NULL
+                       OR NOT ST_Equals(coord.location, ST_SRID(POINT(new.longitude, new.latitude), 4326)));
+            """, params)
+
+            inserted = cursor.execute(f"""
+                INSERT INTO local_store_coordinate (cleaned_id, location)
+                SELECT
+                    new.id,
+                    ST_SRID(POINT(new.longitude, new.latitude), 4326)
+                FROM local_store_cleaned AS new
+                LEFT JOIN local_store_coordinate AS coord
+                    ON coord.cleaned_id = new.id
+                WHERE {where_sql}
+                  AND new.longitude IS NOT NULL
+                  AND new.latitude IS NOT NULL
+                  AND coord.cleaned_id IS NULL;
+            """, params)
+        return updated + inserted
+
+    def _sync_chunk(self, where_sql, params):
+        with timer("db_statement_seconds", statement="coordinate_sync_chunk"):
+            touched = run_in_transaction(self.conn, lambda conn: self._sync_where(where_sql, params))
+        inc("rows_written_total", touched, table="local_store_coordinate", stage="coordinate_sync")
+        return touched
+
+    def sync_ids(self, ids, chunk_size=1000) -> int:
+        """
+        이번 배치에서 바뀐 local_store_cleaned id만 chunk_size개씩 트랜잭션으로 반영.
+        return: 실제로 추가/변경된 좌표 행 수
+        """
+        ids = sorted(set(ids))
+        touched = 0
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            touched += self._sync_chunk(f"new.id IN ({placeholders})", chunk)
+        print(f"✅ 좌표 테이블 증분 동기화 완료 - 대상 {len(ids)}건, 반영 {touched}건")
+        return touched
+
+    def sync_range(self, min_id, max_id, chunk_size=5000) -> int:
+        """min_id ~ max_id 구간만 chunk_size 단위 트랜잭션으로 반영"""
+        touched = 0
+        for start in range(min_id, max_id + 1, chunk_size):
+            end = min(start + chunk_size - 1, max_id)
+            touched += self._sync_chunk("new.id BETWEEN %s AND %s", (start, end))
+        print(f"✅ 좌표 테이블 증분 동기화 완료 - id {min_id}~{max_id}, 반영 {touched}건")
+        return touched
+
+    def sync_missing(self, chunk_size=1000) -> int:
+        """
+        정합성 점검: 좌표는 있는데 local_store_coordinate에 POINT 행이 없는 id만 찾아 반영.
+        지오코딩 flush가 POINT까지 같이 쓰므로 보통은 읽기만 하고 끝남 (전체 구간을 다시 쓰지 않음)
+        return: 실제로 추가/변경된 좌표 행 수
+        """
+        last_id = 0
+        missing = touched = 0
+        while True:
+            with self.conn.cursor() as cursor:
+                cursor.execute("""
+                               SELECT new.id
+                               FROM local_store_cleaned AS new
+                               LEFT JOIN local_store_coordinate AS coord
+                                   ON coord.cleaned_id = new.id
+                               WHERE new.id > %s
+                                 AND new.latitude IS NOT NULL
+                                 AND new.longitude IS NOT NULL
+                                 AND coord.cleaned_id IS NULL
+                               ORDER BY new.id
+                               LIMIT %s
+                               """, (last_id, chunk_size))
+                ids = [row["id"] for row in cursor.fetchall()]
+            if not ids:
+                break
+            missing += len(ids)
+            placeholders = ", ".join(["%s"] * len(ids))
+            touched += self._sync_chunk(f"new.id IN ({placeholders})", ids)
+            last_id = ids[-1]
+        print(f"✅ 좌표 테이블 정합성 점검 완료 - POINT 누락 {missing}건, 반영 {touched}건")
+        return touched
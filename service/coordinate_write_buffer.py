@@ -0,0 +1,47 @@
+import os
+import time
+
+from dotenv import load_dotenv
+
+from db.connection import run_in_transaction
+from db.kakao_cleaned_store_repository import update_coordinates_bulk
+from util.metrics import inc, timer
+
+load_dotenv()
+FLUSH_ROWS = int(os.getenv("KAKAO_FLUSH_ROWS", "1000"))
+FLUSH_SECONDS = float(os.getenv("KAKAO_FLUSH_SECONDS", "10"))
+
+
+class CoordinateWriteBuffer:
+    """
+    지오코딩 결과를 모아 두었다가 flush_rows개 또는 flush_seconds초마다 한 트랜잭션으로 저장.
+    local_store_cleaned 좌표와 local_store_coordinate POINT를 함께 써서 별도 동기화 단계가 필요 없음.
+    """
+
+    def __init__(self, flush_rows: int = FLUSH_ROWS, flush_seconds: float = FLUSH_SECONDS):
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.rows = []
+        self._last_flush = time.monotonic()
+
+    def add(self, id: int, lat: float, lng: float):
+        self.rows.append((id, lat, lng))
+
+    def due(self) -> bool:
+        return (len(self.rows) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_seconds)
+
+    def flush(self, conn) -> int:
+        """return: 저장한 행 수. 실패 시 롤백하고 버퍼는 그대로 둠 (데드락/락 대기 초과는 재시도)"""
+        self._last_flush = time.monotonic()
+        if not self.rows:
+            return 0
+
+        # id 순서로 잠가서 같은 테이블을 id 순으로 갱신하는 단계(uuid 등)와 데드락 가능성을 줄임
+        rows = sorted(self.rows)
+        with timer("db_statement_seconds", statement="kakao_flush"):
+            points = run_in_transaction(conn, lambda c: update_coordinates_bulk(c, rows))
+        self.rows = []
+        inc("rows_written_total", len(rows), table="local_store_cleaned", stage="kakao_geocode")
+        inc("rows_written_total", points, table="local_store_coordinate", stage="kakao_geocode")
+        return len(rows)
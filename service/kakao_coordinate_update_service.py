@@ -1,51 +1,315 @@
 import os
-import time
+import asyncio
 import logging
+import multiprocessing
+import socket
+import time
 from dotenv import load_dotenv
-from api.kakao_fetcher import get_coordinates
-from db.connection import get_db_connection
-from db.kakao_cleaned_store_repository import get_batch_after_id, update_coordinates
-from service.coordinate_sync_service import CoordinateSyncService
-from util.kakao_progress import load_progress, save_progress
+from db.api_quota_repository import ensure_quota_tables, fetch_prioritized_rows, record_attempts
+from db.connection import get_pool
+from db.geocode_lease_repository import (
+    claim_rows, defer_leases, ensure_lease_table, release_leases, renew_leases
+)
+from db.kakao_cleaned_store_repository import get_batch_after_id
+from service.api_quota import ApiQuota
+from service.coordinate_write_buffer import CoordinateWriteBuffer
+from service.kakao_geocoding_engine import RATE_PER_SEC, KakaoGeocodingEngine
+from util.address_normalizer import group_by_canonical
+from util.checkpoint import CheckpointStore, ContiguousTracker
+from util.geocode_cache import get_cache
+from util.kakao_progress import PROGRESS_FILE, load_progress
+from util.metrics import inc, set_gauge
+from util.worker_results import collect_results
 from config.kakao_logging import setup_logging
 
+load_dotenv()
+LEASE_CHUNK_SIZE = int(os.getenv("KAKAO_LEASE_CHUNK_SIZE", "1000"))
+LEASE_SECONDS = int(os.getenv("KAKAO_LEASE_SECONDS", "600"))
+LEASE_RETRY_AFTER_SECONDS = int(os.getenv("KAKAO_LEASE_RETRY_AFTER_SECONDS", "86400"))
+SCHEDULE_CHUNK_SIZE = int(os.getenv("KAKAO_SCHEDULE_CHUNK_SIZE", "1000"))
+RETRY_BACKOFF_BASE_SECONDS = int(os.getenv("KAKAO_RETRY_BACKOFF_BASE_SECONDS", "86400"))
+RETRY_BACKOFF_MAX_SECONDS = int(os.getenv("KAKAO_RETRY_BACKOFF_MAX_SECONDS", str(30 * 86400)))
+DEFAULT_BATCH_SIZE = 95000
+
 
 class KakaoCoordinateUpdateService:
-    def __init__(self):
+    def __init__(self, institution_codes=None, checkpoint_namespace="kakao", rate_per_sec=RATE_PER_SEC,
+                 batch_size=DEFAULT_BATCH_SIZE):
+        """
+        institution_codes/checkpoint_namespace: 샤드 워커가 자기 기관코드와 체크포인트만 쓰도록 지정
+        rate_per_sec: 여러 워커가 쿼터를 나눠 쓸 때 워커당 초당 요청 수
+        batch_size: 한 번 실행에서 처리할 최대 행 수 (샤드 워커는 샤드 수로 나눈 값)
+        """
         load_dotenv()
         self.api_key = os.getenv("KAKAO_API_KEY")
-        self.batch_size = 95000
-        self.conn = get_db_connection()
+        self.batch_size = batch_size
+        self.conn = None
+        self.buffer = CoordinateWriteBuffer()
+        self.institution_codes = institution_codes
+        self.checkpoint = CheckpointStore(checkpoint_namespace)
+        self.tracker = None
+        self.worker_id = None
+        self.leased_ids = []
+        self.scheduled = False
+        self.succeeded = set()
+        self.engine = KakaoGeocodingEngine(self.api_key, rate_per_sec=rate_per_sec)
+        # 모든 실행 모드가 실제 호출 수를 api_quota_usage에 남김 (스케줄 모드의 남은 쿼터 계산용)
+        self.quota = ApiQuota("kakao")
         setup_logging()
 
     def run(self):
-        last_id = load_progress()
-        rows = get_batch_after_id(self.conn, last_id, self.batch_size)
+        return asyncio.run(self.run_async())
+
+    async def run_async(self):
+        """return: 이번 배치에서 처리한 행 수"""
+        self.conn = get_pool().acquire()
+        try:
+            ensure_quota_tables(self.conn)
+            return await self._run_batch()
+        finally:
+            self.quota.sync(self.conn)
+            get_pool().release(self.conn)
+            self.conn = None
+
+    def run_leased(self, max_rows=None):
+        return asyncio.run(self.run_leased_async(max_rows))
+
+    async def run_leased_async(self, max_rows=None):
+        """
+        리스 모드: progress 커서 대신 좌표가 없는 행을 LEASE_CHUNK_SIZE개씩 리스해서 처리.
+        여러 프로세스/호스트가 동시에 돌아도 같은 행을 잡지 않고, 죽은 워커의 리스는 만료 후 다시 잡힘.
+        max_rows: 이 워커가 처리할 최대 행 수 (None이면 남은 행이 없을 때까지)
+        return: 처리한 행 수
+        """
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.conn = get_pool().acquire()
+        processed = 0
+        try:
+            ensure_lease_table(self.conn)
+            ensure_quota_tables(self.conn)
+            while max_rows is None or processed < max_rows:
+                limit = LEASE_CHUNK_SIZE if max_rows is None else min(LEASE_CHUNK_SIZE, max_rows - processed)
+                rows = claim_rows(self.conn, self.worker_id, limit, LEASE_SECONDS, self.institution_codes)
+                if not rows:
+                    break
+                await self._run_leased_chunk(rows)
+                processed += len(rows)
+                logging.info(f"[{self.worker_id}] 리스 {len(rows)}건 처리 (누적 {processed}건)")
+        finally:
+            self.quota.sync(self.conn)
+            get_pool().release(self.conn)
+            self.conn = None
+
+        print(f"[{self.worker_id}] 완료: {processed}개 처리")
+        print(get_cache().report())
+        return processed
+
+    async def _geocode_rows(self, rows):
+        """rows를 주소 중복 제거 후 지오코딩하고 버퍼까지 flush. 성공한 id는 self.succeeded"""
+        self.buffer.rows = []
+        self.succeeded = set()
+        self.tracker = ContiguousTracker(row["id"] for row in rows)
+        targets = self._dedup_targets(rows)
+        if targets:
+            await self.engine.geocode_all(targets, self._handle_group)
+        self._flush_buffer()
+
+    async def _run_leased_chunk(self, rows):
+        self.leased_ids = [row["id"] for row in rows]
+        await self._geocode_rows(rows)
+        # 저장된 행은 리스 삭제(이후 좌표가 있어 조회되지 않음), 실패한 행은 재시도 시각까지 미룸
+        release_leases(self.conn, self.succeeded)
+        defer_leases(self.conn, [row["id"] for row in rows if row["id"] not in self.succeeded],
+                     LEASE_RETRY_AFTER_SECONDS)
+        self.checkpoint.reset()
+
+    def run_scheduled(self, quota: ApiQuota = None):
+        return asyncio.run(self.run_scheduled_async(quota))
+
+    async def run_scheduled_async(self, quota: ApiQuota = None):
+        """
+        쿼터 스케줄 모드: 오늘 남은 카카오 호출 수만큼, 가치가 높은 행부터 처리.
+        신규(좌표 없음) → 주소 변경 → 실패 재시도(지수 백오프) 순.
+        청크마다 실제 호출 수(캐시 미스)를 DB에 누적하고 남은 쿼터를 다시 계산함.
+        return: 처리한 행 수
+        """
+        quota = self.quota = quota or self.quota
+        self.scheduled = True
+        self.conn = get_pool().acquire()
+        processed = {"new": 0, "changed": 0, "retry": 0}
+        try:
+            ensure_quota_tables(self.conn)
+            while True:
+                remaining = quota.remaining(self.conn)
+                if remaining == 0:
+                    print("오늘 카카오 쿼터를 모두 사용했습니다.")
+                    break
+                # 행 하나당 호출은 최대 1회 → 남은 쿼터보다 많이 고르지 않음
+                limit = SCHEDULE_CHUNK_SIZE if remaining is None else min(SCHEDULE_CHUNK_SIZE, remaining)
+                rows = fetch_prioritized_rows(self.conn, limit, self.institution_codes)
+                if not rows:
+                    print("완료: 더 이상 처리할 데이터가 없습니다.")
+                    break
+                await self._geocode_rows(rows)
+                record_attempts(
+                    self.conn,
+                    [(row["id"], row["address"]) for row in rows if row["id"] in self.succeeded],
+                    [(row["id"], row["address"]) for row in rows if row["id"] not in self.succeeded],
+                    RETRY_BACKOFF_BASE_SECONDS, RETRY_BACKOFF_MAX_SECONDS,
+                )
+                for row in rows:
+                    processed[row["priority"]] += 1
+                    inc("rows_scheduled_total", stage="kakao_geocode", priority=row["priority"])
+            print(f"우선순위별 처리: {processed}")
+            print(quota.report(self.conn))
+        finally:
+            get_pool().release(self.conn)
+            self.conn = None
+            self.scheduled = False
+
+        print(get_cache().report())
+        return sum(processed.values())
+
+    def _resume_id(self):
+        state = self.checkpoint.load()
+        if "last_id" in state:
+            return state["last_id"]
+        # 체크포인트 도입 이전의 progress.json 이어받기
+        return load_progress(PROGRESS_FILE) if self.checkpoint.namespace == "kakao" else 0
+
+    async def _run_batch(self):
+        last_id = self._resume_id()
+        rows = get_batch_after_id(self.conn, last_id, self.batch_size, self.institution_codes)
 
         if not rows:
             print("완료: 더 이상 처리할 데이터가 없습니다.")
+            return 0
+
+        self.buffer.rows = []
+        self.succeeded = set()
+        self.tracker = ContiguousTracker(row["id"] for row in rows)
+        self.resume_id = last_id
+        targets = self._dedup_targets(rows)
+        await self.engine.geocode_all(targets, self._handle_group)
+        self._commit_checkpoint()
+
+        print(f"{len(rows)}개 처리완료. 마지막 ID: {rows[-1]['id']}")
+        print(get_cache().report())
+        return len(rows)
+
+    def _dedup_targets(self, rows):
+        """
+        정규화 주소가 같은 행을 묶어 주소당 한 번만 지오코딩.
+        정규화 결과가 비어 있는 행은 API 호출 없이 실패로 처리.
+        """
+        groups = group_by_canonical(rows)
+        empty = groups.pop("", [])
+        for row in empty:
+            self._handle_result(row, None, None)
+
+        targets = [{"id": members[0]["id"], "address": canonical, "rows": members}
+                   for canonical, members in groups.items()]
+        ratio = 1 - len(targets) / len(rows)
+        set_gauge("geocode_dedup_ratio", round(ratio, 4), stage="kakao_geocode")
+        inc("geocode_dedup_saved_total", len(rows) - len(empty) - len(targets), stage="kakao_geocode")
+        print(f"주소 정규화: {len(rows)}행 → 고유 주소 {len(targets)}개 (중복 제거율 {ratio:.1%})")
+        return targets
+
+    def _handle_group(self, target, lat, lng):
+        """고유 주소 하나의 결과를 같은 주소의 모든 행에 반영"""
+        for row in target["rows"]:
+            self._handle_result(row, lat, lng)
+
+    def _commit_checkpoint(self):
+        """
+        버퍼 flush(좌표 + POINT 한 트랜잭션) → 체크포인트 저장 순서.
+        앞쪽 행이 모두 끝난 id(safe_id)까지만 저장하므로 재시작 시 그 다음부터 이어서 처리함.
+        """
+        self._flush_buffer()
+        self.quota.sync(self.conn)
+        if self.worker_id or self.scheduled:
+            # 리스/스케줄 모드는 progress 체크포인트를 쓰지 않음 (리스 모드는 대신 리스 연장)
+            if self.worker_id:
+                renew_leases(self.conn, self.worker_id, self.leased_ids, LEASE_SECONDS)
+            self.checkpoint.reset()
             return
+        safe_id = self.tracker.safe_id
+        if safe_id is not None and safe_id != self.resume_id:
+            self.checkpoint.save({"last_id": safe_id})
+            self.resume_id = safe_id
+        else:
+            self.checkpoint.reset()
+
+    def _flush_buffer(self):
+        """
+        버퍼 flush. 재시도(데드락/락 대기)까지 실패하면 배치를 멈추지 않고 버퍼의 행만 실패로 기록.
+        그 행들은 성공 목록과 safe_id에서 빠지므로 다음 실행(리스 모드는 재시도 시각 후)에 다시 처리됨.
+        """
+        try:
+            self.buffer.flush(self.conn)
+        except Exception as e:
+            failed = [id for id, _, _ in self.buffer.rows]
+            self.buffer.rows = []
+            self.succeeded.difference_update(failed)
+            self.tracker.hold(failed)
+            inc("rows_failed_total", len(failed), stage="kakao_geocode", reason="update_failed")
+            fail_logger = logging.getLogger("fail")
+            for id in failed:
+                fail_logger.info(f"id={id}, reason=update_failed")
+            logging.error(f"좌표 저장 실패 - {len(failed)}행 건너뜀: {e}")
 
-        for row in rows:
-            id = row["id"]
-            address = row["address"]
+    def _handle_result(self, row, lat, lng):
+        id = row["id"]
+        address = row["address"]
 
-            lat, lng = get_coordinates(address, self.api_key)
+        try:
+            inc("rows_processed_total", stage="kakao_geocode")
             if lat is None or lng is None:
+                inc("rows_failed_total", stage="kakao_geocode", reason="coordinate_fetch_failed")
                 logging.getLogger("fail").info(f"id={id}, address='{address}', reason=coordinate_fetch_failed")
-                continue
+                return
 
-            try:
-                update_coordinates(self.conn, id, lat, lng)
-            except Exception as e:
-                logging.getLogger("fail").info(f"id={id}, address='{address}', reason=update_failed: {e}")
-                continue
+            self.buffer.add(id, lat, lng)
+            self.succeeded.add(id)
+        finally:
+            self.tracker.mark_done(id)
+            if self.checkpoint.due(1) or self.buffer.due():
+                self._commit_checkpoint()
 
-            time.sleep(0.05)
 
-        self.conn.commit()
+def _lease_worker(institution_codes, rate_per_sec, max_rows, results):
+    name = multiprocessing.current_process().name
+    try:
+        service = KakaoCoordinateUpdateService(institution_codes, rate_per_sec=rate_per_sec)
+        results.put((name, service.run_leased(max_rows)))
+    except Exception:
+        logging.exception("리스 워커 실패")
+        results.put((name, None))
 
-        CoordinateSyncService(self.conn).sync()
 
-        save_progress(rows[-1]["id"])
-        print(f"{len(rows)}개 처리완료. 마지막 ID: {rows[-1]['id']}")
\ No newline at end of file
+def run_lease_workers(workers: int, max_rows=None, institution_codes=None, rate_per_sec=RATE_PER_SEC):
+    """
+    이 호스트에서 리스 워커 workers개를 띄움. 초당 요청 수와 max_rows는 워커 수로 나눔
+    (다른 호스트에서도 같은 명령을 돌리면 같은 리스 테이블을 공유).
+    결과 없이 죽은 워커는 기다리지 않고 실패로 집계 (잡고 있던 리스는 만료 후 다른 워커가 가져감).
+    return: 전체 처리 행 수
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    per_worker_rows = None if max_rows is None else -(-max_rows // workers)
+    started = time.monotonic()
+    processes = [
+        ctx.Process(target=_lease_worker, name=f"kakao-lease{n}",
+                    args=(institution_codes, rate_per_sec / workers, per_worker_rows, results))
+        for n in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    collected = collect_results(processes, results)
+    for p in processes:
+        p.join()
+    total = sum(rows for rows in collected.values() if rows)
+    failed = [name for name, rows in collected.items() if rows is None]
+    print(f"리스 워커 {workers}개 - {total}개 처리, 실패 {len(failed)}개 {failed or ''}, "
+          f"{time.monotonic() - started:.1f}s")
+    return total
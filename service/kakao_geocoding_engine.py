@@ -0,0 +1,49 @@
+import asyncio
+import os
+
+import aiohttp
+from dotenv import load_dotenv
+
+from api.kakao_fetcher import fetch_coordinates
+from util.metrics import set_gauge
+from util.rate_limiter import TokenBucketRateLimiter
+
+load_dotenv()
+RATE_PER_SEC = float(os.getenv("KAKAO_RATE_PER_SEC", "20"))
+MAX_IN_FLIGHT = int(os.getenv("KAKAO_MAX_IN_FLIGHT", "10"))
+CONCURRENCY = int(os.getenv("KAKAO_CONCURRENCY", "20"))
+
+
+class KakaoGeocodingEngine:
+    """
+    하나의 aiohttp 세션(커넥션 풀)과 토큰 버킷으로 카카오 주소 검색을 병렬 수행.
+    rows: [{"id": ..., "address": ...}] → on_result(row, lat, lng) 콜백으로 결과 전달
+    """
+
+    def __init__(self, api_key: str, rate_per_sec: float = RATE_PER_SEC,
+                 max_in_flight: int = MAX_IN_FLIGHT, concurrency: int = CONCURRENCY):
+        self.api_key = api_key
+        self.rate_per_sec = rate_per_sec
+        self.max_in_flight = max_in_flight
+        self.concurrency = concurrency
+
+    async def geocode_all(self, rows, on_result):
+        limiter = TokenBucketRateLimiter(self.rate_per_sec, self.max_in_flight)
+        queue = asyncio.Queue()
+        for row in rows:
+            queue.put_nowait(row)
+
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, keepalive_timeout=30)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def worker():
+                while True:
+                    try:
+                        row = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    set_gauge("queue_depth", queue.qsize(), queue="kakao_geocode")
+                    lat, lng = await fetch_coordinates(session, row["address"], self.api_key, limiter)
+                    on_result(row, lat, lng)
+
+            workers = [asyncio.create_task(worker()) for _ in range(max(1, self.concurrency))]
+            await asyncio.gather(*workers)
@@ -0,0 +1,224 @@
+import math
+import os
+import time
+from array import array
+from heapq import heappush, heappushpop
+
+from dotenv import load_dotenv
+
+from db.kakao_cleaned_store_repository import iter_store_points
+
+load_dotenv()
+CELL_DEG = float(os.getenv("SPATIAL_CELL_DEG", "0.01"))  # 위도 기준 약 1.1km
+MAX_KNN_RADIUS_M = float(os.getenv("SPATIAL_MAX_KNN_RADIUS_M", "50000"))
+COMPACT_RATIO = 0.2  # 지워진 슬롯이 이 비율을 넘으면 재구성
+REFRESH_CHUNK = 1000
+
+EARTH_RADIUS_M = 6370986  # MySQL ST_Distance_Sphere 기본 반지름과 맞춤
+METERS_PER_DEG = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat1, lng1, lat2, lng2) -> float:
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2
+         + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+class NearbyStoreIndex:
+    """
+    local_store_cleaned 좌표를 메모리에 한 번 적재해 두고 "내 주변 가게"를 조회하는 격자 인덱스.
+    - 좌표/업종은 행 단위 dict가 아니라 위치(pos)별 array 컬럼으로 보관
+    - 격자 셀(cell_deg 단위)마다 해당 위치 목록(array)만 가짐
+    - refresh(ids)로 바뀐 행만 다시 읽어 반영 (기존 슬롯은 지움 표시 후 뒤에 추가)
+    결과는 [(id, 거리 m)] 가까운 순.
+    """
+
+    def __init__(self, cell_deg: float = CELL_DEG):
+        self.cell_deg = cell_deg
+        self.ids = array("q")
+        self.lats = array("d")
+        self.lngs = array("d")
+        self.sectors = array("i")  # sector_names 인덱스, 업종 없으면 -1
+        self.alive = bytearray()
+        self.sector_names = []
+        self._sector_codes = {}
+        self._cells = {}  # (row, col) → array("I") 위치 목록
+        self._pos = {}  # id → 위치
+        self.dead = 0
+
+    def __len__(self):
+        return len(self._pos)
+
+    @classmethod
+    def load(cls, conn, cell_deg: float = CELL_DEG):
+        index = cls(cell_deg)
+        started = time.perf_counter()
+        for id, lat, lng, sector in iter_store_points(conn):
+            index.add(id, lat, lng, sector)
+        print(f"✅ 공간 인덱스 적재 - {len(index)}건, 셀 {len(index._cells)}개 "
+              f"({time.perf_counter() - started:.1f}s)")
+        return index
+
+    def _cell(self, lat, lng):
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def _sector_code(self, name, create=True):
+        if name is None:
+            return -1
+        code = self._sector_codes.get(name)
+        if code is None and create:
+            code = len(self.sector_names)
+            self.sector_names.append(name)
+            self._sector_codes[name] = code
+        return code
+
+    def add(self, id, lat, lng, sector_name=None):
+        """새 행 추가. 이미 있는 id면 기존 슬롯을 지우고 새로 추가"""
+        self.remove(id)
+        pos = len(self.ids)
+        self.ids.append(id)
+        self.lats.append(lat)
+        self.lngs.append(lng)
+        self.sectors.append(self._sector_code(sector_name))
+        self.alive.append(1)
+        self._cells.setdefault(self._cell(lat, lng), array("I")).append(pos)
+        self._pos[id] = pos
+
+    def remove(self, id):
+        pos = self._pos.pop(id, None)
+        if pos is not None:
+            self.alive[pos] = 0
+            self.dead += 1
+
+    def refresh(self, conn, ids) -> int:
+        """
+        ids: 좌표나 업종이 바뀐 local_store_cleaned id. DB에서 다시 읽어 반영하고
+        좌표가 없어진 행은 인덱스에서 뺌. return: 반영된 행 수
+        """
+        ids = list(set(ids))
+        found = set()
+        for start in range(0, len(ids), REFRESH_CHUNK):
+            for id, lat, lng, sector in iter_store_points(conn, ids[start:start + REFRESH_CHUNK]):
+                self.add(id, lat, lng, sector)
+                found.add(id)
+        for id in ids:
+            if id not in found:
+                self.remove(id)
+        if self.dead > len(self._pos) * COMPACT_RATIO:
+            self.compact()
+        return len(found)
+
+    def compact(self):
+        """지워진 슬롯을 걷어내고 array/셀을 다시 만듦"""
+        live = [pos for pos in range(len(self.ids)) if self.alive[pos]]
+        rebuilt = NearbyStoreIndex(self.cell_deg)
+        for pos in live:
+            code = self.sectors[pos]
+            rebuilt.add(self.ids[pos], self.lats[pos], self.lngs[pos],
+                        self.sector_names[code] if code >= 0 else None)
+        self.__dict__.update(rebuilt.__dict__)
+
+    def radius(self, lat, lng, radius_m, sector_name=None, limit=None):
+        """(lat, lng)에서 radius_m 이내 가게. sector_name을 주면 해당 업종만"""
+        sector = self._sector_code(sector_name, create=False)
+        if sector_name is not None and sector is None:
+            return []
+
+        dlat = radius_m / METERS_PER_DEG
+        dlng = radius_m / (METERS_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+        row0, col0 = self._cell(lat - dlat, lng - dlng)
+        row1, col1 = self._cell(lat + dlat, lng + dlng)
+
+        hits = []
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                positions = self._cells.get((row, col))
+                if positions is None:
+                    continue
+                for pos in positions:
+                    if not self.alive[pos] or (sector_name is not None and self.sectors[pos] != sector):
+                        continue
+                    p_lat = self.lats[pos]
+                    p_lng = self.lngs[pos]
+                    if abs(p_lat - lat) > dlat or abs(p_lng - lng) > dlng:
+                        continue
+                    distance = haversine_m(lat, lng, p_lat, p_lng)
+                    if distance <= radius_m:
+                        hits.append((distance, self.ids[pos]))
+        hits.sort()
+        if limit is not None:
+            hits = hits[:limit]
+        return [(id, distance) for distance, id in hits]
+
+    def _ring(self, row0, col0, r):
+        if r == 0:
+            yield row0, col0
+            return
+        for col in range(col0 - r, col0 + r + 1):
+            yield row0 - r, col
+            yield row0 + r, col
+        for row in range(row0 - r + 1, row0 + r):
+            yield row, col0 - r
+            yield row, col0 + r
+
+    def nearest(self, lat, lng, k=10, sector_name=None, max_radius_m=MAX_KNN_RADIUS_M):
+        """
+        가까운 k개. 쿼리 셀부터 고리 모양으로 넓혀 가다가,
+        아직 안 본 셀까지의 최소 거리가 k번째 거리보다 멀어지면 멈춤.
+        """
+        sector = self._sector_code(sector_name, create=False)
+        if k <= 0 or not self._pos or (sector_name is not None and sector is None):
+            return []
+
+        # 셀 한 칸의 최소 폭(m). 경도 폭은 위도가 높을수록 좁아지므로 탐색 범위 끝 위도 기준
+        edge_lat = min(89.0, abs(lat) + max_radius_m / METERS_PER_DEG + self.cell_deg)
+        cell_m = self.cell_deg * METERS_PER_DEG * math.cos(math.radians(edge_lat))
+        row0, col0 = self._cell(lat, lng)
+        lng_m = METERS_PER_DEG * math.cos(math.radians(lat))
+        heap = []  # (-거리, id) 최대 힙, 크기 k
+        bound = None
+        r = 0
+        while r * cell_m <= max_radius_m:
+            for cell in self._ring(row0, col0, r):
+                positions = self._cells.get(cell)
+                if positions is None:
+                    continue
+                for pos in positions:
+                    if not self.alive[pos] or (sector_name is not None and self.sectors[pos] != sector):
+                        continue
+                    p_lat = self.lats[pos]
+                    p_lng = self.lngs[pos]
+                    if len(heap) == k:
+                        # 평면 근사 거리로 먼저 거름 (오차 여유 2%)
+                        dy = (p_lat - lat) * METERS_PER_DEG
+                        dx = (p_lng - lng) * lng_m
+                        if dy * dy + dx * dx > bound:
+                            continue
+                    distance = haversine_m(lat, lng, p_lat, p_lng)
+                    if distance > max_radius_m:
+                        continue
+                    if len(heap) < k:
+                        heappush(heap, (-distance, self.ids[pos]))
+                        if len(heap) == k:
+                            bound = (-heap[0][0] * 1.02) ** 2
+                    elif distance < -heap[0][0]:
+                        heappushpop(heap, (-distance, self.ids[pos]))
+                        bound = (-heap[0][0] * 1.02) ** 2
+            # 다음 고리부터는 최소 r * cell_m 이상 떨어져 있음
+            if len(heap) == k and -heap[0][0] <= r * cell_m:
+                break
+            r += 1
+        return sorted(((id, -neg) for neg, id in heap), key=lambda hit: hit[1])
+
+    def stats(self) -> dict:
+        column_bytes = sum(col.itemsize * len(col) for col in (self.ids, self.lats, self.lngs, self.sectors))
+        cell_bytes = sum(positions.itemsize * len(positions) for positions in self._cells.values())
+        return {
+            "points": len(self._pos),
+            "dead_slots": self.dead,
+            "cells": len(self._cells),
+            "sectors": len(self.sector_names),
+            "array_bytes": column_bytes + len(self.alive) + cell_bytes,
+        }
@@ -0,0 +1,328 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from db.api_quota_repository import ensure_quota_tables
+from db.change_tracking import require_updated_at_column
+from db.connection import pooled_connection
+from db.stage_run_repository import ensure_stage_run_table, last_success, record_stage_run
+from util.metrics import inc, timer
+from util.snapshot_archive import resolve_run_id, snapshot_fingerprint
+
+load_dotenv()
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "3"))
+ROAD_ADDRESS_MAX_ID = 2 ** 62
+UUID_TABLES = ("local_store_cleaned", "institution_code")
+
+
+class Stage:
+    """
+    파이프라인 단계 하나.
+    - run(ctx) → {"rows": 처리 건수, "complete": 남은 일 없이 끝났는지, "skipped": 건너뛴 이유, "detail": ...}
+    - signature(conn, ctx) → 입력 상태 요약 dict ("rows"는 입력 건수). 없으면 항상 실행
+    - recheck: 단계가 자기 입력을 바꾸는 경우(예: 좌표를 채우면 '좌표 없는 행 수'가 줄어듦)
+      실행 후 입력 상태를 다시 계산해서 기록 → 다음 실행에서 그 상태 그대로면 건너뜀
+    """
+
+    def __init__(self, name, deps, run, signature=None, recheck=False):
+        self.name = name
+        self.deps = deps
+        self.run = run
+        self.signature = signature
+        self.recheck = recheck
+
+
+def _fingerprint(signature: dict) -> str:
+    return hashlib.sha1(json.dumps(signature, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _query_one(conn, sql, params=()):
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()
+
+
+# ===== 단계별 입력 상태 =====
+def _raw_upsert_signature(conn, ctx):
+    content, items = snapshot_fingerprint(ctx["snapshot_run_id"] or "latest")
+    return {"rows": items, "content": content}
+
+
+def _road_address_signature(conn, ctx):
+    row = _query_one(conn, """
+        SELECT COUNT(*) AS total,
+               MAX(id) AS max_id,
+               SUM((road_addr IS NULL OR road_addr = '') AND lotno_addr IS NOT NULL AND lotno_addr != '') AS pending
+        FROM local_store
+    """)
+    return {"rows": row["total"], "max_id": row["max_id"], "pending": row["pending"]}
+
+
+def _cleaned_transform_signature(conn, ctx):
+    require_updated_at_column(conn, "local_store")
+    row = _query_one(conn, "SELECT COUNT(*) AS total, MAX(id) AS max_id, MAX(updated_at) AS last_updated FROM local_store")
+    return {"rows": row["total"], "max_id": row["max_id"], "last_updated": row["last_updated"]}
+
+
+def _geocode_signature(conn, ctx):
+    ensure_quota_tables(conn)
+    row = _query_one(conn, """
+        SELECT COUNT(*) AS total,
+               MAX(id) AS max_id,
+               SUM(latitude IS NULL OR longitude IS NULL) AS pending,
+               BIT_XOR(CRC32(CONCAT(id, ':', COALESCE(address, '')))) AS address_checksum
+        FROM local_store_cleaned
+    """)
+    retry = _query_one(conn, """
+        SELECT COUNT(*) AS due
+        FROM geocode_attempt
+        WHERE status = 'failed'
+          AND next_attempt_at <= NOW(6)
+    """)
+    return {"rows": row["total"], "max_id": row["max_id"], "pending": row["pending"],
+            "address_checksum": row["address_checksum"], "retry_due": retry["due"]}
+
+
+def _coordinate_sync_signature(conn, ctx):
+    row = _query_one(conn, """
+        SELECT COUNT(*) AS total,
+               BIT_XOR(CRC32(CONCAT(id, ':', latitude, ':', longitude))) AS coordinate_checksum
+        FROM local_store_cleaned
+        WHERE latitude IS NOT NULL
+          AND longitude IS NOT NULL
+    """)
+    return {"rows": row["total"], "coordinate_checksum": row["coordinate_checksum"]}
+
+
+def _uuid_signature(conn, ctx):
+    signature = {"rows": 0}
+    for table in UUID_TABLES:
+        row = _query_one(conn, f"SELECT COUNT(*) AS total, SUM(uuid IS NULL) AS missing FROM {table}")
+        signature["rows"] += row["total"]
+        signature[table] = {"total": row["total"], "missing": row["missing"]}
+    return signature
+
+
+def _shard_map_signature(conn, ctx):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       SELECT institution_code, COUNT(*) AS cnt
+                       FROM local_store_cleaned
+                       GROUP BY institution_code
+                       ORDER BY institution_code
+                       """)
+        counts = [(row["institution_code"], row["cnt"]) for row in cursor.fetchall()]
+    return {"rows": sum(cnt for _, cnt in counts), "counts": _fingerprint({"counts": counts})}
+
+
+# ===== 단계 실행 =====
+def _run_fetch(ctx):
+    if ctx["snapshot_run_id"]:
+        return {"rows": 0, "skipped": f"스냅샷 재생 ({ctx['snapshot_run_id']})"}
+    from service.store_sync_service import fetch_to_snapshot
+
+    run_id, fetched = asyncio.run(fetch_to_snapshot())
+    ctx["snapshot_run_id"] = run_id
+    return {"rows": fetched, "detail": {"snapshot": run_id}}
+
+
+def _run_raw_upsert(ctx):
+    from service.store_sync_service import replay_snapshot
+
+    run_id = resolve_run_id(ctx["snapshot_run_id"] or "latest")
+    stats = asyncio.run(replay_snapshot(run_id))
+    written = sum(region["new"] + region["changed"] for region in stats.values())
+    return {"rows": written, "detail": {"snapshot": run_id}}
+
+
+def _run_road_address(ctx):
+    from service.api_quota import ApiQuota
+    from service.road_address_update_service import run_async_batch
+
+    quota = ApiQuota("juso")
+    total, converted = asyncio.run(run_async_batch(min_id=1, max_id=ROAD_ADDRESS_MAX_ID,
+                                                   checkpoint_namespace="road_address_pipeline", quota=quota))
+    with pooled_connection() as conn:
+        left = quota.remaining(conn)
+    return {"rows": converted, "complete": left != 0, "detail": {"targets": total, "quota_left": left}}
+
+
+def _run_cleaned_transform(ctx):
+    from db.cleaned_store_repository import transform_and_upsert_cleaned_data, transform_incremental
+
+    with pooled_connection() as conn:
+        if ctx["full_rebuild"]:
+            return {"rows": transform_and_upsert_cleaned_data(conn)}
+        return {"rows": transform_incremental(conn)}
+
+
+def _run_geocode(ctx):
+    from service.api_quota import ApiQuota
+    from service.kakao_coordinate_update_service import KakaoCoordinateUpdateService
+
+    quota = ApiQuota("kakao")
+    processed = KakaoCoordinateUpdateService().run_scheduled(quota)
+    with pooled_connection() as conn:
+        left = quota.remaining(conn)
+    # 쿼터가 바닥나서 멈췄으면 남은 일이 있으므로 다음 실행에서 건너뛰지 않음
+    return {"rows": processed, "complete": left != 0, "detail": {"quota_left": left}}
+
+
+def _run_coordinate_sync(ctx):
+    from service.coordinate_sync_service import CoordinateSyncService
+
+    # 지오코딩 flush가 좌표와 POINT를 같이 쓰므로 전체 구간을 다시 동기화하지 않고
+    # POINT가 빠진 행(다른 경로로 좌표가 들어온 경우 등)만 찾아 채움
+    with pooled_connection() as conn:
+        return {"rows": CoordinateSyncService(conn).sync_missing()}
+
+
+def _run_uuid(ctx):
+    from update_uuid import backfill_uuid_parallel
+
+    results = backfill_uuid_parallel(list(UUID_TABLES), 5000, 4, checkpoint_prefix="uuid_pipeline")
+    return {"rows": sum(n for n, _ in results.values())}
+
+
+def _run_shard_map(ctx):
+    from shard_map import run_rebalance
+
+    with pooled_connection() as conn:
+        moved = run_rebalance(conn, float(os.getenv("SHARD_TOLERANCE", "0.05")), refine=True, apply=True)
+    return {"rows": moved}
+
+
+# fetch → raw upsert → 도로명 보정 → 정제 변환 → (지오코딩 → 좌표 정합성 점검) / uuid / 샤드맵
+# 지오코딩과 uuid는 동시에 local_store_cleaned를 갱신함 → 청크 트랜잭션은 run_in_transaction으로
+# 데드락/락 대기 초과 시 재시도. 샤드맵은 local_store_cleaned를 읽기만 함
+STAGES = [
+    Stage("fetch", [], _run_fetch),
+    Stage("raw_upsert", ["fetch"], _run_raw_upsert, _raw_upsert_signature),
+    Stage("road_address", ["raw_upsert"], _run_road_address, _road_address_signature, recheck=True),
+    Stage("cleaned_transform", ["road_address"], _run_cleaned_transform, _cleaned_transform_signature),
+    Stage("geocode", ["cleaned_transform"], _run_geocode, _geocode_signature, recheck=True),
+    Stage("coordinate_sync", ["geocode"], _run_coordinate_sync, _coordinate_sync_signature),
+    Stage("uuid", ["cleaned_transform"], _run_uuid, _uuid_signature, recheck=True),
+    Stage("shard_map", ["cleaned_transform"], _run_shard_map, _shard_map_signature),
+]
+STAGE_NAMES = tuple(stage.name for stage in STAGES)
+
+
+class PipelineRunner:
+    """
+    배치 전체를 단계 DAG로 실행.
+    - 선행 단계가 모두 끝난 단계부터 workers개까지 동시에 실행 (예: 지오코딩 / uuid / 샤드맵)
+    - 단계마다 입력 상태 fingerprint와 건수를 batch_stage_run에 기록하고,
+      마지막 성공 실행과 fingerprint가 같으면 자동으로 건너뜀 (force=True면 항상 실행)
+    - 선행 단계가 실패하면 하위 단계는 blocked
+    """
+
+    def __init__(self, only=None, force=False, replay=None, full_rebuild=False, workers=PIPELINE_WORKERS):
+        unknown = set(only or ()) - set(STAGE_NAMES)
+        if unknown:
+            raise ValueError(f"알 수 없는 단계: {sorted(unknown)} (가능: {STAGE_NAMES})")
+        self.only = set(only) if only else set(STAGE_NAMES)
+        self.force = force
+        self.workers = max(1, workers)
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.ctx = {"snapshot_run_id": resolve_run_id(replay) if replay else None, "full_rebuild": full_rebuild}
+        self.results = {}
+
+    def run(self):
+        with pooled_connection() as conn:
+            ensure_stage_run_table(conn)
+
+        pending = {stage.name: stage for stage in STAGES}
+        running = {}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stage") as executor:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    dep_status = [self.results[d]["status"] for d in stage.deps if d in self.results]
+                    if len(dep_status) < len(stage.deps):
+                        continue
+                    del pending[name]
+                    if any(status in ("failed", "blocked") for status in dep_status):
+                        self._finish(stage, "blocked", detail={"reason": "선행 단계 실패"})
+                    elif name not in self.only:
+                        self.results[name] = {"stage": name, "status": "not_selected"}
+                    else:
+                        running[executor.submit(self._execute, stage)] = stage
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    future.result()
+
+        self.print_summary(time.monotonic() - started)
+        return self.results
+
+    def _execute(self, stage):
+        started_at = datetime.now()
+        started = time.monotonic()
+        signature = None
+        try:
+            if stage.signature:
+                with pooled_connection() as conn:
+                    signature = stage.signature(conn, self.ctx)
+                    previous = last_success(conn, stage.name)
+                if (not self.force and previous
+                        and previous["input_fingerprint"] == _fingerprint(signature)):
+                    logging.info(f"[{stage.name}] 입력 변경 없음 → 건너뜀 (마지막 성공 {previous['run_id']})")
+                    return self._finish(stage, "skipped", signature, started_at, started,
+                                        detail={"unchanged_since": previous["run_id"]})
+
+            logging.info(f"[{stage.name}] 시작")
+            with timer("stage_seconds", stage=stage.name):
+                outcome = stage.run(self.ctx) or {}
+            if outcome.get("skipped"):
+                return self._finish(stage, "skipped", signature, started_at, started,
+                                    detail={"reason": outcome["skipped"]})
+            if stage.signature and stage.recheck:
+                with pooled_connection() as conn:
+                    signature = stage.signature(conn, self.ctx)
+            status = "ok" if outcome.get("complete", True) else "incomplete"
+            return self._finish(stage, status, signature, started_at, started,
+                                output_rows=outcome.get("rows"), detail=outcome.get("detail"))
+        except Exception as e:
+            logging.exception(f"[{stage.name}] 실패")
+            return self._finish(stage, "failed", signature, started_at, started, detail={"error": str(e)})
+
+    def _finish(self, stage, status, signature=None, started_at=None, started=None, output_rows=None, detail=None):
+        finished_at = datetime.now()
+        result = {
+            "stage": stage.name,
+            "status": status,
+            "input_rows": signature["rows"] if signature else None,
+            "output_rows": output_rows,
+            "seconds": round(time.monotonic() - started, 1) if started else 0,
+            "detail": detail,
+        }
+        self.results[stage.name] = result
+        inc("pipeline_stage_total", stage=stage.name, status=status)
+        with pooled_connection() as conn:
+            # 건너뛴 실행은 fingerprint를 남기지 않음 → 기준은 항상 실제로 실행한 마지막 성공
+            record_stage_run(conn, self.run_id, stage.name, status, started_at or finished_at, finished_at,
+                             _fingerprint(signature) if signature and status == "ok" else None,
+                             result["input_rows"], output_rows, detail)
+        logging.info(f"[{stage.name}] {status} - 입력 {result['input_rows']}, 출력 {output_rows}, "
+                     f"{result['seconds']}s")
+        return result
+
+    def print_summary(self, wall_elapsed):
+        print(f"\n[pipeline {self.run_id}] 단계별 결과")
+        print(f"{'stage':<18} {'status':<13} {'input':>10} {'output':>10} {'sec':>8}")
+        fmt = lambda value: "-" if value is None else str(value)
+        for name in STAGE_NAMES:
+            r = self.results.get(name, {"status": "-"})
+            print(f"{name:<18} {r['status']:<13} {fmt(r.get('input_rows')):>10} {fmt(r.get('output_rows')):>10} "
+                  f"{r.get('seconds', 0):>8.1f}")
+        print(f"{'total':<18} {'':<13} {'':>10} {'':>10} {wall_elapsed:>8.1f}")
@@ -1,18 +1,37 @@
 # service/road_address_update_service.py
+import asyncio
 import time
+import aiohttp
 import requests
 import os
 from dotenv import load_dotenv
 
-from db.road_address_repository import fetch_target_rows, update_road_address
+from api.juso_fetcher import CACHE_NAMESPACE, fetch_road_address
+from db.api_quota_repository import ensure_quota_tables
+from db.connection import get_pool
+from db.road_address_repository import (
+    fetch_target_rows, fetch_target_rows_after, update_road_address, update_road_addresses
+)
+from service.api_quota import ApiQuota
+from util.checkpoint import CheckpointStore
+from util.geocode_cache import MISSING, get_cache
+from util.metrics import inc, record_http, timer
+from util.rate_limiter import TokenBucketRateLimiter
 
 # 환경변수 로딩
 load_dotenv()
 API_KEY = os.getenv("JUSO_API_KEY")
 API_URL = os.getenv("JUSO_API_URL")
 MAX_ID = 200000
+RATE_PER_SEC = float(os.getenv("JUSO_RATE_PER_SEC", "20"))
+MAX_IN_FLIGHT = int(os.getenv("JUSO_MAX_IN_FLIGHT", "10"))
+CONCURRENCY = int(os.getenv("JUSO_CONCURRENCY", "20"))
 
 def convert_lotno_to_road(lotno_addr):
+    cached = get_cache().get(CACHE_NAMESPACE, lotno_addr)
+    if cached is not MISSING:
+        return cached
+
     params = {
         "confmKey": API_KEY,
         "currentPage": 1,
@@ -21,8 +40,11 @@ def convert_lotno_to_road(lotno_addr):
         "resultType": "json"
     }
 
+    started = time.perf_counter()
+    status = "error"
     try:
         res = requests.get(API_URL, params=params, timeout=5)
+        status = res.status_code
         data = res.json()
 
         common = data.get("results", {}).get("common", {})
@@ -36,13 +58,18 @@ def convert_lotno_to_road(lotno_addr):
         juso_list = data.get("results", {}).get("juso", [])
         if not juso_list:
             print(f"[주소 없음] {lotno_addr}")
+            get_cache().set(CACHE_NAMESPACE, lotno_addr, None)
             return None
 
-        return juso_list[0]["roadAddr"]
+        road = juso_list[0]["roadAddr"]
+        get_cache().set(CACHE_NAMESPACE, lotno_addr, road)
+        return road
 
     except Exception as e:
         print(f"[요청 실패] {lotno_addr} → 예외: {e}")
         return None
+    finally:
+        record_http("juso", status, time.perf_counter() - started)
 
 def run_sync_batch(batch_size=100, min_id=1000000, max_id=1000000):
     batch_count = 1
@@ -66,4 +93,100 @@ def run_sync_batch(batch_size=100, min_id=1000000, max_id=1000000):
             last_id = row["id"]
 
         batch_count += 1
-        print(f"✅ {batch_count}번째 배치 완료\n")
\ No newline at end of file
+        print(f"✅ {batch_count}번째 배치 완료\n")
+
+    print(get_cache().report())
+
+
+async def _convert_page(session, limiter, rows, concurrency):
+    """한 페이지의 지번주소를 병렬 변환 → [(id, road_addr)] (실패 건 제외)"""
+    queue = asyncio.Queue()
+    for row in rows:
+        queue.put_nowait(row)
+    results = []
+
+    async def worker():
+        while True:
+            try:
+                row = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            road = await fetch_road_address(session, row["lotno_addr"], limiter)
+            if road:
+                results.append((row["id"], road))
+
+    await asyncio.gather(*[asyncio.create_task(worker()) for _ in range(max(1, concurrency))])
+    return results
+
+
+async def run_async_batch(min_id=1, max_id=1000000, page_size=1000, concurrency=CONCURRENCY,
+                          rate_per_sec=RATE_PER_SEC, max_in_flight=MAX_IN_FLIGHT, institution_codes=None,
+                          checkpoint_namespace="road_address", resume=True, quota=None):
+    """
+    fetch_road_address 기반 비동기 도로명주소 보정.
+    id 키셋으로 page_size씩 읽고 → 병렬 변환 → 페이지 단위 일괄 UPDATE
+    institution_codes를 주면 해당 기관코드 행만 처리 (샤드 워커용)
+    resume=True면 같은 id 구간의 마지막 커밋 지점부터 이어서 처리
+    quota(ApiQuota)를 주면 오늘 남은 주소 API 호출 수 안에서만 처리하고 멈춤 (다음 실행이 체크포인트부터 이어감)
+    quota가 없어도 실제 호출 수는 api_quota_usage에 남김
+    return: (대상 건수, 변환 성공 건수)
+    """
+    checkpoint = CheckpointStore(checkpoint_namespace)
+    state = checkpoint.load() if resume else {}
+    last_id = min_id - 1
+    if state.get("min_id") == min_id and state.get("max_id") == max_id:
+        last_id = state["last_id"]
+        print(f"체크포인트에서 재개 - last_id={last_id}")
+
+    conn = get_pool().acquire()
+    limiter = TokenBucketRateLimiter(rate_per_sec, max_in_flight)
+    connector = aiohttp.TCPConnector(limit=max_in_flight, keepalive_timeout=30)
+    total = converted = 0
+    started = time.monotonic()
+
+    usage = quota or ApiQuota("juso")
+    quota_stopped = False
+    try:
+        ensure_quota_tables(conn)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            while True:
+                limit = page_size
+                if quota is not None:
+                    remaining = quota.remaining(conn)
+                    if remaining == 0:
+                        print("오늘 주소 API 쿼터를 모두 사용했습니다.")
+                        quota_stopped = True
+                        break
+                    limit = page_size if remaining is None else min(page_size, remaining)
+                rows = fetch_target_rows_after(conn, last_id, max_id, limit, institution_codes)
+                if not rows:
+                    break
+
+                pairs = await _convert_page(session, limiter, rows, concurrency)
+                if pairs:
+                    with timer("db_statement_seconds", statement="road_address_update"):
+                        update_road_addresses(conn, pairs)
+                inc("rows_processed_total", len(rows), stage="road_address")
+                inc("rows_written_total", len(pairs), table="local_store", stage="road_address")
+
+                usage.sync(conn)
+                total += len(rows)
+                converted += len(pairs)
+                last_id = rows[-1]["id"]
+                if checkpoint.due(len(rows)):
+                    checkpoint.commit(conn, {"min_id": min_id, "max_id": max_id, "last_id": last_id})
+                elapsed = time.monotonic() - started
+                print(f"✅ ~{last_id}: {converted}/{total}건 변환 ({total / max(elapsed, 1e-9):.1f}건/s)")
+        if not quota_stopped:
+            # 구간을 끝까지 돌았으면 다음 실행은 처음부터 새로 생긴 대상을 찾도록 초기화
+            # (쿼터로 멈춘 경우만 이어받기 지점을 남김)
+            last_id = min_id - 1
+        checkpoint.commit(conn, {"min_id": min_id, "max_id": max_id, "last_id": last_id})
+        if quota is not None:
+            print(quota.report(conn))
+    finally:
+        get_pool().release(conn)
+
+    print(f"🎉 전체 처리 완료 - 변환 {converted}건, 실패 {total - converted}건")
+    print(get_cache().report())
+    return total, converted
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+
+from db.connection import pooled_connection
+from db.shard_map_repository import get_shard_codes
+from util.metrics import write_run_metrics
+from util.worker_results import collect_results
+
+JOBS = ("kakao", "road_addr", "uuid")
+
+
+def _run_job(job, shard_id, codes, options):
+    """
+    워커 프로세스 안에서 실제 작업 실행. return: 처리한 행 수
+    options의 rate_per_sec/max_rows는 run_sharded가 이미 샤드 수로 나눈 샤드당 값
+    """
+    if job == "kakao":
+        from service.kakao_coordinate_update_service import KakaoCoordinateUpdateService
+        service = KakaoCoordinateUpdateService(institution_codes=codes,
+                                               checkpoint_namespace=f"kakao_shard{shard_id}",
+                                               rate_per_sec=options["rate_per_sec"],
+                                               batch_size=options["max_rows"])
+        return service.run()
+    if job == "road_addr":
+        from service.road_address_update_service import run_async_batch
+        total, _ = asyncio.run(run_async_batch(institution_codes=codes,
+                                               checkpoint_namespace=f"road_address_shard{shard_id}",
+                                               rate_per_sec=options["rate_per_sec"]))
+        return total
+    if job == "uuid":
+        from update_uuid import backfill_uuid_parallel
+        results = backfill_uuid_parallel(options.get("tables", ["local_store_cleaned", "institution_code"]),
+                                         options.get("chunk_size", 5000), options.get("uuid_version", 4), codes,
+                                         checkpoint_prefix=f"uuid_shard{shard_id}")
+        return sum(n for n, _ in results.values())
+    raise ValueError(f"알 수 없는 작업: {job}")
+
+
+def _worker(job, shard_id, codes, options, results):
+    started = time.monotonic()
+    result = {"shard": shard_id, "codes": len(codes), "rows": 0, "error": None}
+    try:
+        result["rows"] = _run_job(job, shard_id, codes, options) or 0
+    except Exception as e:
+        logging.exception(f"shard{shard_id} {job} 실패")
+        result["error"] = str(e)
+    result["elapsed"] = time.monotonic() - started
+    write_run_metrics(f"{job}_shard{shard_id}", extra={"shard": shard_id})
+    results.put((multiprocessing.current_process().name, result))
+
+
+def _split_options(job, options, shard_count):
+    """
+    초당 요청 수와 행 예산은 같은 API 키를 쓰는 샤드 전체의 값 → 샤드 수로 나눔
+    (나누지 않으면 샤드 N개가 N배 속도로 호출하고 일일 쿼터도 N배로 씀)
+    """
+    options = dict(options)
+    if job == "kakao":
+        from service.kakao_coordinate_update_service import DEFAULT_BATCH_SIZE
+        from service.kakao_geocoding_engine import RATE_PER_SEC
+        options["rate_per_sec"] = options.get("rate_per_sec", RATE_PER_SEC) / shard_count
+        options["max_rows"] = -(-options.get("max_rows", DEFAULT_BATCH_SIZE) // shard_count)
+    elif job == "road_addr":
+        from service.road_address_update_service import RATE_PER_SEC
+        options["rate_per_sec"] = options.get("rate_per_sec", RATE_PER_SEC) / shard_count
+    return options
+
+
+def run_sharded(job, shard_ids=None, options=None):
+    """
+    shard_map을 읽어 샤드마다 워커 프로세스 하나씩 띄워 job을 실행.
+    shard_ids로 일부 샤드만 지정하면 여러 호스트에 나눠 돌릴 수 있음.
+    options의 rate_per_sec/max_rows는 이 호스트 전체 기준이고 샤드마다 나눠서 넘김.
+    결과 없이 죽은 샤드 프로세스는 실패(error)로 집계함.
+    return: 샤드별 결과 목록
+    """
+    if job not in JOBS:
+        raise ValueError(f"job은 {JOBS} 중 하나여야 합니다: {job}")
+    with pooled_connection() as conn:
+        shards = get_shard_codes(conn)
+    if shard_ids:
+        shards = {sid: codes for sid, codes in shards.items() if sid in shard_ids}
+    if not shards:
+        raise RuntimeError("shard_map이 비어 있습니다. shard_map.py를 먼저 실행하세요.")
+
+    options = _split_options(job, options or {}, len(shards))
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    started = time.monotonic()
+    processes = {
+        sid: ctx.Process(target=_worker, args=(job, sid, codes, options, results), name=f"{job}-shard{sid}")
+        for sid, codes in sorted(shards.items())
+    }
+    for p in processes.values():
+        p.start()
+    collected = collect_results(processes.values(), results)
+    for p in processes.values():
+        p.join()
+
+    summary = []
+    for sid, p in processes.items():
+        result = collected[p.name]
+        if result is None:
+            result = {"shard": sid, "codes": len(shards[sid]), "rows": 0,
+                      "elapsed": time.monotonic() - started,
+                      "error": f"프로세스 비정상 종료 (exitcode={p.exitcode})"}
+        summary.append(result)
+
+    print_summary(job, sorted(summary, key=lambda r: r["shard"]), time.monotonic() - started)
+    return summary
+
+
+def print_summary(job, summary, wall_elapsed):
+    print(f"\n[{job}] 샤드별 결과")
+    print(f"{'shard':>6} {'codes':>6} {'rows':>10} {'sec':>9} {'rows/s':>9}  error")
+    for r in summary:
+        rate = r["rows"] / r["elapsed"] if r["elapsed"] else 0
+        print(f"{r['shard']:>6} {r['codes']:>6} {r['rows']:>10} {r['elapsed']:>9.1f} {rate:>9.1f}  {r['error'] or ''}")
+    total = sum(r["rows"] for r in summary)
+    print(f"{'total':>6} {sum(r['codes'] for r in summary):>6} {total:>10} {wall_elapsed:>9.1f} "
+          f"{total / wall_elapsed if wall_elapsed else 0:>9.1f}")
@@ -1,27 +1,238 @@
 import asyncio
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from aiohttp import ClientSession
-from api.store_fetcher import fetch_and_parse
+from api.store_fetcher import PageFetchError, fetch_page, iter_pages
+from db.connection import get_pool, pooled_connection
 from db.institution_code import get_institution_codes
-from db.raw_store_repository import upsert_store_data
+from db.raw_store_repository import ensure_fingerprint_table, upsert_store_data_bulk
+from util.failed_pages import FailedPageList, FailedPageQueue
+from util.metrics import inc, set_gauge
+from util.snapshot_archive import SnapshotWriter, iter_snapshot_pages, resolve_run_id
+
+WRITER_COUNT = int(os.getenv("STORE_WRITER_COUNT", "2"))
+WRITE_QUEUE_SIZE = int(os.getenv("STORE_WRITE_QUEUE_SIZE", "20"))
+
+
+class _PageWriter:
+    """
+    쓰기 전용 스레드 풀. 스레드마다 커넥션 풀에서 자기 커넥션을 하나씩 빌려 사용함.
+    (pymysql 커넥션은 스레드 간 공유 불가)
+    """
+
+    def __init__(self, writer_count):
+        self.executor = ThreadPoolExecutor(max_workers=writer_count, thread_name_prefix="store-writer")
+        self._local = threading.local()
+        self._conns = []
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = get_pool().acquire()
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
 
-async def sync_one_region(session, code, region_name, semaphore, conn):
+    def write(self, items):
+        return upsert_store_data_bulk(self._conn(), items)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for conn in self._conns:
+            get_pool().release(conn)
+
+
+async def sync_one_region(session, code, region_name, semaphore, queue, failed_pages=None, archive=None):
+    fetched = 0
     try:
-        items = await fetch_and_parse(session, code, region_name, semaphore)
-        if not items:
+        async for page_items in iter_pages(session, code, semaphore, failed_pages):
+            if archive:
+                archive.write_page(code, page_items)
+            fetched += len(page_items)
+            inc("rows_fetched_total", len(page_items), endpoint="open_api")
+            await queue.put((region_name, page_items))
+            set_gauge("queue_depth", queue.qsize(), queue="store_write")
+        if not fetched:
             logging.warning(f"{region_name} 데이터 없음")
         else:
-            upsert_store_data(conn, items)
+            logging.info(f"{region_name} 수집 완료 - 총 {fetched}건")
     except Exception as e:
         logging.exception(f"{region_name} 처리 중 오류: {e}")
 
-async def sync_all_regions(conn):
+
+async def _drain(queue, writer, stats):
+    loop = asyncio.get_running_loop()
+    while True:
+        job = await queue.get()
+        set_gauge("queue_depth", queue.qsize(), queue="store_write")
+        try:
+            if job is None:
+                return
+            region_name, items = job
+            try:
+                result = await loop.run_in_executor(writer.executor, writer.write, items)
+            except Exception as e:
+                logging.exception(f"{region_name} 저장 중 오류: {e}")
+                continue
+            region = stats.setdefault(region_name, {})
+            for key, value in result.items():
+                region[key] = region.get(key, 0) + value
+        finally:
+            queue.task_done()
+
+
+async def _run_pipeline(produce, writer_count, queue_size, use_network=True):
+    """
+    produce(session, queue)가 (지역명, 페이지 items)를 큐에 넣으면
+    writer_count개의 writer가 스레드 풀에서 DB에 기록함.
+    use_network=False(스냅샷 재생)면 session 없이 produce(None, queue)로 호출.
+    return: 지역별 저장 결과 합계
+    """
+    with pooled_connection() as conn:
+        ensure_fingerprint_table(conn)
+
+    queue = asyncio.Queue(maxsize=queue_size)
+    writer = _PageWriter(writer_count)
+    stats = {}
+
+    try:
+        drainers = [asyncio.create_task(_drain(queue, writer, stats)) for _ in range(writer_count)]
+
+        if use_network:
+            async with ClientSession() as session:
+                await produce(session, queue)
+        else:
+            await produce(None, queue)
+
+        for _ in drainers:
+            await queue.put(None)
+        await asyncio.gather(*drainers)
+    finally:
+        writer.close()
+
+    for region_name, result in sorted(stats.items()):
+        logging.info(
+            f"{region_name} 저장 완료 - 신규 {result['new']}, 변경 {result['changed']}, "
+            f"동일(건너뜀) {result['skipped']}, 실패 {result['failed']} "
+            f"(DB insert {result['inserted']}, update {result['updated']})"
+        )
+    return stats
+
+
+async def sync_all_regions(writer_count=WRITER_COUNT, queue_size=WRITE_QUEUE_SIZE, failed_pages=None,
+                           archive=True):
+    """
+    수집(생산자)과 저장(소비자)을 분리한 파이프라인.
+    지역별 페이지가 도착하는 대로 크기 제한 큐에 넣고, writer_count개의 writer가
+    스레드 풀에서 DB에 기록함 → 네트워크/DB 작업이 겹치고 메모리는 큐 크기로 제한됨.
+    재시도 후에도 실패한 페이지는 failed_pages(기본 FailedPageQueue)에 남음.
+    archive=True면 원본 페이지를 snapshots/<run_id>/에 보관 (SnapshotWriter를 직접 넘겨도 됨).
+    """
     codes = get_institution_codes()
     semaphore = asyncio.Semaphore(10)
+    failed_pages = failed_pages or FailedPageQueue()
+    if archive is True:
+        archive = SnapshotWriter()
+    if archive:
+        logging.info(f"원본 스냅샷 저장 위치: {archive.path}")
 
-    async with ClientSession() as session:
+    async def produce(session, queue):
         tasks = [
-            sync_one_region(session, code["code"], code["region_name"], semaphore, conn)
+            sync_one_region(session, code["code"], code["region_name"], semaphore, queue, failed_pages, archive)
             for code in codes
         ]
-        await asyncio.gather(*tasks, return_exceptions=True)
\ No newline at end of file
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return await _run_pipeline(produce, writer_count, queue_size)
+
+
+async def fetch_to_snapshot(failed_pages=None, archive=None):
+    """
+    수집만 하고 DB에는 쓰지 않음 → 원본 페이지를 스냅샷으로만 남김.
+    적재는 replay_snapshot(run_id)로 따로 실행 (파이프라인 fetch → raw_upsert 단계 분리용).
+    return: (스냅샷 run_id, 수집 건수)
+    """
+    codes = get_institution_codes()
+    semaphore = asyncio.Semaphore(10)
+    failed_pages = failed_pages or FailedPageQueue()
+    archive = archive or SnapshotWriter()
+    fetched = 0
+
+    async def fetch_one(session, code, region_name):
+        nonlocal fetched
+        try:
+            async for page_items in iter_pages(session, code, semaphore, failed_pages):
+                archive.write_page(code, page_items)
+                fetched += len(page_items)
+                inc("rows_fetched_total", len(page_items), endpoint="open_api")
+        except Exception as e:
+            logging.exception(f"{region_name} 수집 중 오류: {e}")
+
+    logging.info(f"원본 스냅샷 수집 시작 - {archive.path}")
+    async with ClientSession() as session:
+        await asyncio.gather(*[fetch_one(session, code["code"], code["region_name"]) for code in codes])
+    logging.info(f"원본 스냅샷 수집 완료 - {fetched}건")
+    return archive.run_id, fetched
+
+
+async def sync_failed_pages(writer_count=WRITER_COUNT, queue_size=WRITE_QUEUE_SIZE, failed_pages=None):
+    """
+    failed_pages에 쌓인 페이지만 다시 받아서 저장 (--retry-failed).
+    resume 항목은 그 페이지부터 iter_pages로 지역 끝까지 다시 받음.
+    이번에도 실패한 페이지만 큐에 남김.
+    """
+    failed_pages = failed_pages or FailedPageQueue()
+    targets = failed_pages.load()
+    if not targets:
+        logging.info("재처리할 실패 페이지 없음")
+        return {}
+
+    region_names = {code["code"]: code["region_name"] for code in get_institution_codes()}
+    semaphore = asyncio.Semaphore(10)
+    remaining = FailedPageList()
+
+    async def retry_one(session, queue, instt_code, page, resume):
+        region_name = region_names.get(instt_code, instt_code)
+        if resume:
+            async for page_items in iter_pages(session, instt_code, semaphore, remaining, start_page=page):
+                inc("rows_fetched_total", len(page_items), endpoint="open_api")
+                await queue.put((region_name, page_items))
+            return
+        try:
+            page_items = await fetch_page(session, instt_code, page, semaphore)
+        except PageFetchError as e:
+            remaining.add(instt_code, page, e.reason)
+            return
+        if page_items:
+            await queue.put((region_name, page_items))
+
+    async def produce(session, queue):
+        await asyncio.gather(*[retry_one(session, queue, *target) for target in targets])
+
+    logging.info(f"실패 페이지 재처리 시작 - {len(targets)}건 (이어받기 {sum(t[2] for t in targets)}건)")
+    stats = await _run_pipeline(produce, writer_count, queue_size)
+    failed_pages.replace(remaining.entries)
+    logging.info(f"실패 페이지 재처리 완료 - 대상 {len(targets)}건, 남음 {len(remaining.entries)}건")
+    return stats
+
+
+async def replay_snapshot(run_id="latest", writer_count=WRITER_COUNT, queue_size=WRITE_QUEUE_SIZE):
+    """
+    보관된 스냅샷을 네트워크 없이 같은 저장 파이프라인(upsert_store_data_bulk)으로 다시 흘려보냄.
+    변환 재실행/백필을 디스크 속도로 처리할 때 사용.
+    """
+    run_id = resolve_run_id(run_id)
+    region_names = {code["code"]: code["region_name"] for code in get_institution_codes()}
+
+    async def produce(_, queue):
+        for instt_code, items in iter_snapshot_pages(run_id):
+            inc("rows_fetched_total", len(items), endpoint="snapshot")
+            await queue.put((region_names.get(instt_code, instt_code), items))
+
+    logging.info(f"스냅샷 재생 시작 - {run_id}")
+    return await _run_pipeline(produce, writer_count, queue_size, use_network=False)
@@ -1,13 +1,15 @@
 import logging
-from db.cleaned_store_repository import transform_and_upsert_cleaned_data
-from db.connection import get_db_connection
+from db.cleaned_store_repository import transform_and_upsert_cleaned_data, transform_incremental
+from db.connection import pooled_connection
 
 
-def run_transform_cleaned_store():
-    conn = get_db_connection()
+def run_transform_cleaned_store(full_rebuild=False):
+    """기본은 증분 변환, full_rebuild=True면 local_store 전체를 다시 변환"""
     try:
-        transform_and_upsert_cleaned_data(conn)
+        with pooled_connection() as conn:
+            if full_rebuild:
+                transform_and_upsert_cleaned_data(conn)
+            else:
+                transform_incremental(conn)
     except Exception as e:
         logging.exception("정제 테이블 변환 중 오류 발생")
-    finally:
-        conn.close()
@@ -1,22 +1,16 @@
 # build_shard_map.py
 # 메인 DB에서 institution_code별 건수를 집계 → 4개 샤드 균등 배분 → shard_map 채움
+import argparse
 import os
 import re
-import pymysql
 from heapq import heappush, heappop, heapify
 from dotenv import load_dotenv, find_dotenv
 
+from db.connection import DB_CONFIG, get_pool, pooled_connection
+
 load_dotenv(find_dotenv())
 
 # ===== 설정 =====
-MAIN = dict(
-    host=os.getenv("DB_HOST", "127.0.0.1"),
-    port=int(os.getenv("DB_PORT", "3307")),
-    user=os.getenv("DB_USER", "root"),
-    password=os.getenv("DB_PASSWORD", ""),
-    db=os.getenv("DB_NAME", "sparta"),
-    charset="utf8mb4",
-)
 SHARD_COUNT = int(os.getenv("SHARD_COUNT", "4"))   # 기본 4
 SOURCE_TABLE = os.getenv("SHARD_SOURCE_TABLE", "local_store_cleaned")  # 집계 기준 테이블
 SOURCE_COL   = os.getenv("SHARD_SOURCE_KEY",   "institution_code")     # 샤딩키 컬럼
@@ -28,14 +22,6 @@ NUMERIC_ONLY = os.getenv("SHARD_NUMERIC_ONLY", "true").lower() in ("1","true","y
 PINNED = {}  # 필요시 수정
 
 # ===== 유틸 =====
-def connect_mysql(cfg: dict):
-    return pymysql.connect(
-        host=cfg["host"], port=int(cfg["port"]),
-        user=cfg["user"], password=cfg["password"],
-        db=cfg["db"], charset=cfg.get("charset","utf8mb4"),
-        autocommit=True, cursorclass=pymysql.cursors.DictCursor
-    )
-
 def ensure_table(conn):
     with conn.cursor() as cur:
         cur.execute("""
@@ -73,61 +59,167 @@ def assign_balanced(pairs, shard_count, pinned: dict[str,int]):
     pinned: {code: shard_id} 선배치
     return: assignments dict {code: shard_id}, totals dict {sid: sum}
     """
-    # 최소힙: (sum, shard_id, list_codes)  — sum이 작은 샤드부터 배정
-    heap = [(0, sid, []) for sid in range(1, shard_count+1)]
-    heapify(heap)
-
+    totals = {sid: 0 for sid in range(1, shard_count+1)}
     assignments = {}
 
-    # 1) 고정코드 선배치
-    for code, cnt in list(pairs):
+    # 1) 고정코드 선배치 (힙을 만들기 전에 합계에 바로 반영)
+    rest = []
+    for code, cnt in pairs:
         if code in pinned:
             sid = pinned[code]
-            # heap에서 해당 sid 찾아 sum 갱신
-            tmp = []
-            target = None
-            while heap:
-                ssum, s, lst = heappop(heap)
-                if s == sid:
-                    target = (ssum, s, lst)
-                    break
-                tmp.append((ssum, s, lst))
-            for item in tmp:
-                heappush(heap, item)
-            if target is None:
-                # 이론상 발생X
-                raise RuntimeError("Pinned shard not found in heap")
-
-            ssum, s, lst = target
-            lst.append((code, cnt))
-            heappush(heap, (ssum + cnt, s, lst))
+            if sid not in totals:
+                raise RuntimeError(f"Pinned shard {sid} out of range for {code}")
+            totals[sid] += cnt
             assignments[code] = sid
-            pairs.remove((code, cnt))
+        else:
+            rest.append((code, cnt))
 
-    # 2) 나머지 그리디 배치
-    for code, cnt in pairs:
-        ssum, sid, lst = heappop(heap)
-        lst.append((code, cnt))
-        heappush(heap, (ssum + cnt, sid, lst))
+    # 2) 나머지 그리디 배치 (LPT) - 최소힙: (sum, shard_id)
+    heap = [(ssum, sid) for sid, ssum in totals.items()]
+    heapify(heap)
+    for code, cnt in sorted(rest, key=lambda x: x[1], reverse=True):
+        ssum, sid = heappop(heap)
+        heappush(heap, (ssum + cnt, sid))
         assignments[code] = sid
-
-    # 샤드별 합계 계산
-    totals = {}
-    while heap:
-        ssum, sid, lst = heappop(heap)
-        totals[sid] = ssum
+        totals[sid] = ssum + cnt
     return assignments, totals
 
-def build_insert_sql(assignments: dict[str,int]) -> str:
-    values = ",\n".join([f"('{code}', {sid})" for code, sid in sorted(assignments.items())])
-    sql = f"""INSERT INTO shard_map (institution_code, shard_id) VALUES
-{values}
-ON DUPLICATE KEY UPDATE shard_id=VALUES(shard_id);"""
-    return sql
+def fetch_current(conn) -> dict[str,int]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT institution_code, shard_id FROM shard_map")
+        return {str(r["institution_code"]): int(r["shard_id"]) for r in cur.fetchall()}
+
+def shard_totals(assignments: dict[str,int], counts: dict[str,int], shard_count: int) -> dict[int,int]:
+    totals = {sid: 0 for sid in range(1, shard_count+1)}
+    for code, sid in assignments.items():
+        totals[sid] += counts.get(code, 0)
+    return totals
+
+def skew(totals: dict[int,int]) -> float:
+    """가장 큰 샤드가 평균보다 얼마나 큰지 (0.05 = 평균 대비 +5%)"""
+    mean = sum(totals.values()) / max(1, len(totals))
+    return max(totals.values()) / mean - 1 if mean else 0.0
+
+def _best_move(totals, members, counts, limit, movable):
+    """가장 무거운 샤드 → 가장 가벼운 샤드로 옮길 코드 1개 선택 (없으면 None)"""
+    heavy = max(totals, key=totals.get)
+    light = min(totals, key=totals.get)
+    gap = totals[heavy] - totals[light]
+    excess = totals[heavy] - limit
+    candidates = [c for c in members[heavy] if c in movable and 0 < counts[c] < gap]
+    if not candidates:
+        return None
+    # 한 번에 허용치 안으로 들어오는 코드 중 가장 작은 것 → 옮기는 행 수 최소
+    fits = [c for c in candidates if counts[c] >= excess and totals[light] + counts[c] <= limit]
+    if fits:
+        return min(fits, key=lambda c: counts[c]), heavy, light
+    # 없으면 두 샤드 중 큰 쪽을 가장 많이 줄이는 코드
+    return max(candidates, key=lambda c: min(counts[c], gap - counts[c])), heavy, light
+
+def _best_swap(totals, members, counts, movable):
+    """가장 무거운/가벼운 샤드 간 코드 맞교환으로 차이를 가장 많이 줄이는 쌍 (없으면 None)"""
+    heavy = max(totals, key=totals.get)
+    light = min(totals, key=totals.get)
+    gap = totals[heavy] - totals[light]
+    best, best_gain = None, 0
+    for a in members[heavy]:
+        if a not in movable:
+            continue
+        for b in members[light]:
+            if b not in movable:
+                continue
+            diff = counts[a] - counts[b]
+            gain = min(diff, gap - diff)
+            if 0 < diff < gap and gain > best_gain:
+                best, best_gain = (a, b, heavy, light), gain
+    return best
+
+def rebalance(pairs, current: dict[str,int], shard_count: int, tolerance: float,
+              pinned: dict[str,int], refine: bool = True, max_steps: int = 10000):
+    """
+    기존 shard_map에서 출발해 skew <= tolerance가 될 때까지 최소한으로만 옮김.
+    - 신규 코드는 가장 가벼운 샤드에 배치 (이동으로 세지 않음)
+    - 옮길 때는 허용치 안으로 들어오는 가장 작은 코드를 우선 → 이동 행 수 최소
+    - refine=True면 단일 이동으로 더 줄일 수 없을 때 샤드 간 맞교환 시도
+    return: assignments {code: sid}, moves [(code, from_sid, to_sid, cnt)]
+    """
+    counts = dict(pairs)
+    assignments = {c: sid for c, sid in current.items() if c in counts and 1 <= sid <= shard_count}
+    for code, sid in pinned.items():
+        if code in counts:
+            assignments[code] = sid
+
+    totals = shard_totals(assignments, counts, shard_count)
+    for code, cnt in sorted(pairs, key=lambda x: x[1], reverse=True):
+        if code not in assignments:
+            sid = min(totals, key=totals.get)
+            assignments[code] = sid
+            totals[sid] += cnt
+
+    members = {sid: set() for sid in totals}
+    for code, sid in assignments.items():
+        members[sid].add(code)
+    movable = {c for c in assignments if c not in pinned}
+    limit = (1 + tolerance) * sum(totals.values()) / max(1, shard_count)
+
+    def relocate(code, src, dst):
+        members[src].remove(code)
+        members[dst].add(code)
+        totals[src] -= counts[code]
+        totals[dst] += counts[code]
+        assignments[code] = dst
+
+    for _ in range(max_steps):
+        if skew(totals) <= tolerance:
+            break
+        move = _best_move(totals, members, counts, limit, movable)
+        if move:
+            relocate(*move)
+            continue
+        swap = _best_swap(totals, members, counts, movable) if refine else None
+        if not swap:
+            break
+        a, b, heavy, light = swap
+        relocate(a, heavy, light)
+        relocate(b, light, heavy)
+
+    moves = [(code, current[code], sid, counts[code])
+             for code, sid in sorted(assignments.items())
+             if code in current and current[code] != sid]
+    return assignments, moves
+
+def upsert_assignments(conn, assignments: dict[str,int], batch_size: int = 500):
+    sql = """INSERT INTO shard_map (institution_code, shard_id) VALUES (%s, %s)
+ON DUPLICATE KEY UPDATE shard_id=VALUES(shard_id)"""
+    rows = sorted(assignments.items())
+    with conn.cursor() as cur:
+        for i in range(0, len(rows), batch_size):
+            cur.executemany(sql, rows[i:i+batch_size])
+
+def print_totals(label, totals, total_all):
+    print(f"[{label}] per shard (skew={skew(totals):.2%}):")
+    for sid in sorted(totals):
+        print(f"  shard{sid}: {totals[sid]} ({totals[sid]/max(1,total_all):.2%})")
 
 def main():
-    print("[connect] main:", MAIN)
-    conn = connect_mysql(MAIN)
+    parser = argparse.ArgumentParser(description="institution_code → shard 배분")
+    parser.add_argument("--mode", choices=("full", "rebalance"), default="full",
+                        help="full: 처음부터 재배치 후 적용 / rebalance: 기존 배치에서 최소 이동")
+    parser.add_argument("--tolerance", type=float, default=float(os.getenv("SHARD_TOLERANCE", "0.05")),
+                        help="허용 skew (최대 샤드 / 평균 - 1)")
+    parser.add_argument("--no-refine", action="store_true", help="맞교환 보정 단계 생략")
+    parser.add_argument("--apply", action="store_true", help="rebalance 계획을 실제로 적용 (기본은 dry-run)")
+    args = parser.parse_args()
+
+    print("[connect] main:", {k: v for k, v in DB_CONFIG.items() if k != "password"})
+    with pooled_connection() as conn:
+        if args.mode == "rebalance":
+            run_rebalance(conn, args.tolerance, not args.no_refine, args.apply)
+        else:
+            run(conn)
+    print("[pool]", get_pool().metrics())
+
+def run(conn):
     ensure_table(conn)
 
     pairs = fetch_counts(conn)
@@ -138,15 +230,10 @@ def main():
         print(f"[info] pinned codes: {len(PINNED)} -> {PINNED}")
 
     assignments, totals = assign_balanced(pairs, SHARD_COUNT, PINNED)
-    print("[totals] per shard:")
-    for sid in sorted(totals):
-        print(f"  shard{sid}: {totals[sid]} ({totals[sid]/max(1,total_all):.2%})")
-
-    sql = build_insert_sql(assignments)
+    print_totals("totals", totals, total_all)
 
     # 실행(업서트)
-    with conn.cursor() as cur:
-        cur.execute(sql)
+    upsert_assignments(conn, assignments)
     print("[done] shard_map upserted.")
 
     # 확인용 몇 줄 출력
@@ -154,5 +241,35 @@ def main():
     for i, (code, sid) in enumerate(sorted(assignments.items())[:20]):
         print(code, "->", sid)
 
+def run_rebalance(conn, tolerance: float, refine: bool, apply: bool):
+    ensure_table(conn)
+
+    pairs = fetch_counts(conn)
+    counts = dict(pairs)
+    total_all = sum(counts.values())
+    current = fetch_current(conn)
+    print(f"[info] distinct codes={len(pairs)}, mapped={len(current)}, total rows={total_all}")
+
+    before = shard_totals({c: s for c, s in current.items() if c in counts and 1 <= s <= SHARD_COUNT},
+                          counts, SHARD_COUNT)
+    assignments, moves = rebalance(pairs, current, SHARD_COUNT, tolerance, PINNED, refine)
+    after = shard_totals(assignments, counts, SHARD_COUNT)
+
+    print_totals("before", before, total_all)
+    print_totals("after", after, total_all)
+    new_codes = [c for c in assignments if c not in current]
+    print(f"[plan] moves={len(moves)}, moved rows={sum(m[3] for m in moves)}, new codes={len(new_codes)}")
+    for code, src, dst, cnt in moves:
+        print(f"  {code}: shard{src} -> shard{dst} ({cnt} rows)")
+
+    if not apply:
+        print("[dry-run] --apply 옵션을 주면 반영합니다.")
+        return 0
+
+    changed = {c: s for c, s in assignments.items() if current.get(c) != s}
+    upsert_assignments(conn, changed)
+    print(f"[done] shard_map upserted ({len(changed)} rows).")
+    return len(changed)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,33 @@
+import pytest
+
+from util.address_normalizer import canonicalize, group_by_canonical
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("서울 강남구 테헤란로 123 (역삼동)", "서울특별시 강남구 테헤란로 123"),
+    ("서울특별시 강남구 테헤란로 123, 2층 201호", "서울특별시 강남구 테헤란로 123"),
+    ("서울특별시  강남구 테헤란로 123 지하1층", "서울특별시 강남구 테헤란로 123"),
+    ("서울특별시 강남구 테헤란로 123 ABC빌딩", "서울특별시 강남구 테헤란로 123"),
+    ("경기 성남시 분당구 정자동 178-1 번지 A동", "경기도 성남시 분당구 정자동 178-1"),
+    ("부산시 해운대구 우동 산 12 - 3", "부산광역시 해운대구 우동 산 12-3"),
+])
+def test_canonicalize(address, expected):
+    assert canonicalize(address) == expected
+
+
+@pytest.mark.parametrize("address", [None, "", "   ", "(참고)"])
+def test_canonicalize_empty(address):
+    assert canonicalize(address) == ""
+
+
+def test_group_by_canonical_keeps_first_seen_order():
+    rows = [
+        {"id": 1, "address": "서울 강남구 테헤란로 123"},
+        {"id": 2, "address": "경기 성남시 분당구 정자동 178-1"},
+        {"id": 3, "address": "서울특별시 강남구 테헤란로 123, 3층"},
+        {"id": 4, "address": None},
+    ]
+    groups = group_by_canonical(rows)
+    assert list(groups) == ["서울특별시 강남구 테헤란로 123", "경기도 성남시 분당구 정자동 178-1", ""]
+    assert [row["id"] for row in groups["서울특별시 강남구 테헤란로 123"]] == [1, 3]
+    assert [row["id"] for row in groups[""]] == [4]
@@ -0,0 +1,40 @@
+from util.checkpoint import CheckpointStore, ContiguousTracker
+
+
+def test_tracker_advances_only_over_contiguous_prefix():
+    tracker = ContiguousTracker([10, 20, 30, 40])
+    assert tracker.safe_id is None
+    tracker.mark_done(20)
+    tracker.mark_done(40)
+    assert tracker.safe_id is None
+    tracker.mark_done(10)
+    assert tracker.safe_id == 20
+    tracker.mark_done(30)
+    assert tracker.safe_id == 40
+
+
+def test_tracker_hold_stops_before_held_rows():
+    tracker = ContiguousTracker([1, 2, 3, 4])
+    for row_id in (1, 2, 3, 4):
+        tracker.mark_done(row_id)
+    tracker.hold([3, 4])
+    assert tracker.safe_id == 2
+    tracker.hold([1])
+    assert tracker.safe_id is None
+
+
+def test_tracker_hold_ignores_unknown_ids():
+    tracker = ContiguousTracker([1, 2])
+    tracker.mark_done(1)
+    tracker.hold([99])
+    assert tracker.safe_id == 1
+
+
+def test_checkpoint_store_round_trip(tmp_path):
+    store = CheckpointStore("test", directory=str(tmp_path), every_rows=3, every_seconds=3600)
+    assert store.load() == {}
+    assert not store.due(2)
+    assert store.due(1)
+    store.save({"last_id": 7})
+    assert store.load()["last_id"] == 7
+    assert not store.due(2)
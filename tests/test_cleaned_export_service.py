@@ -0,0 +1,35 @@
+import pytest
+
+from service.cleaned_export_service import _arrow_type
+
+pa = pytest.importorskip("pyarrow")
+
+
+def column(data_type, column_type=None, **extra):
+    return {"name": "c", "data_type": data_type, "column_type": column_type or data_type, **extra}
+
+
+@pytest.mark.parametrize("col, expected", [
+    (column("int"), pa.int32()),
+    (column("int", "int unsigned"), pa.uint32()),
+    (column("bigint"), pa.int64()),
+    (column("tinyint", "tinyint(1)"), pa.int8()),
+    (column("decimal", "decimal(10,2)", num_precision=10, num_scale=2), pa.decimal128(10, 2)),
+    (column("double"), pa.float64()),
+    (column("float"), pa.float32()),
+    (column("year"), pa.int16()),
+    (column("date"), pa.date32()),
+    (column("datetime", "datetime(6)"), pa.timestamp("us")),
+    (column("time"), pa.duration("us")),
+    (column("varchar", "varchar(255)"), pa.string()),
+    (column("json"), pa.string()),
+    (column("binary", "binary(16)", max_length=16), pa.binary(16)),
+    (column("point"), pa.binary()),
+])
+def test_arrow_type(col, expected):
+    assert _arrow_type(pa, col) == expected
+
+
+def test_arrow_type_rejects_unknown():
+    with pytest.raises(ValueError):
+        _arrow_type(pa, column("vector"))
@@ -0,0 +1,75 @@
+import service.coordinate_write_buffer as coordinate_write_buffer
+from service.coordinate_write_buffer import CoordinateWriteBuffer
+from service.kakao_coordinate_update_service import KakaoCoordinateUpdateService
+from util.checkpoint import ContiguousTracker
+from util.metrics import REGISTRY
+
+
+class QuotaStub:
+    def sync(self, conn):
+        pass
+
+
+class CheckpointStub:
+    def __init__(self):
+        self.saved = []
+
+    def save(self, state):
+        self.saved.append(state)
+
+    def reset(self):
+        pass
+
+
+def make_service():
+    service = KakaoCoordinateUpdateService.__new__(KakaoCoordinateUpdateService)
+    service.conn = None
+    service.buffer = CoordinateWriteBuffer()
+    service.quota = QuotaStub()
+    service.checkpoint = CheckpointStub()
+    service.worker_id = None
+    service.scheduled = False
+    service.resume_id = 0
+    service.succeeded = set()
+    service.tracker = ContiguousTracker([1, 2, 3, 4])
+    return service
+
+
+def test_flush_failure_marks_buffered_rows_failed(monkeypatch):
+    def fail(conn, fn, retries=None):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(coordinate_write_buffer, "run_in_transaction", fail)
+    REGISTRY.reset()
+    service = make_service()
+    for id in (1, 2, 3, 4):
+        if id != 2:
+            service.buffer.add(id, 37.5, 127.0)
+            service.succeeded.add(id)
+        service.tracker.mark_done(id)
+
+    service._commit_checkpoint()
+
+    assert service.buffer.rows == []
+    assert service.succeeded == set()
+    assert service.checkpoint.saved == []  # safe_id가 첫 실패 행(1) 앞에서 멈춤
+    assert REGISTRY.counter_total("rows_failed_total") == 3
+
+
+def test_flush_failure_keeps_earlier_rows_safe(monkeypatch):
+    monkeypatch.setattr(coordinate_write_buffer, "run_in_transaction", lambda conn, fn, retries=None: 0)
+    service = make_service()
+    service.tracker.mark_done(1)
+    service.buffer.add(1, 37.5, 127.0)
+    service._commit_checkpoint()
+    assert service.checkpoint.saved == [{"last_id": 1}]
+
+    def fail(conn, fn, retries=None):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(coordinate_write_buffer, "run_in_transaction", fail)
+    for id in (2, 3, 4):
+        service.buffer.add(id, 37.5, 127.0)
+        service.tracker.mark_done(id)
+    service._commit_checkpoint()
+    assert service.checkpoint.saved == [{"last_id": 1}]
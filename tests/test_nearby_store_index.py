@@ -0,0 +1,53 @@
+import random
+
+from service.nearby_store_index import NearbyStoreIndex, haversine_m
+
+
+def brute_force(points, lat, lng, sector=None):
+    return sorted((haversine_m(lat, lng, p_lat, p_lng), id)
+                  for id, p_lat, p_lng, p_sector in points if sector is None or p_sector == sector)
+
+
+def build(count=2000, seed=7):
+    rng = random.Random(seed)
+    points = [(id, rng.uniform(37.4, 37.7), rng.uniform(126.8, 127.2), rng.choice(["편의점", "마트", None]))
+              for id in range(1, count + 1)]
+    index = NearbyStoreIndex(cell_deg=0.01)
+    for point in points:
+        index.add(*point)
+    return index, points
+
+
+def test_radius_matches_brute_force():
+    index, points = build()
+    for lat, lng in [(37.55, 127.0), (37.41, 126.81), (37.6, 127.1)]:
+        for sector in (None, "편의점"):
+            expected = [id for distance, id in brute_force(points, lat, lng, sector) if distance <= 1500]
+            assert [id for id, _ in index.radius(lat, lng, 1500, sector)] == expected
+
+
+def test_nearest_matches_brute_force():
+    index, points = build()
+    for lat, lng in [(37.55, 127.0), (37.41, 126.81), (37.8, 127.3)]:
+        expected = [id for _, id in brute_force(points, lat, lng)[:10]]
+        assert [id for id, _ in index.nearest(lat, lng, 10)] == expected
+
+
+def test_unknown_sector_returns_nothing():
+    index, _ = build(100)
+    assert index.radius(37.55, 127.0, 5000, "없는업종") == []
+    assert index.nearest(37.55, 127.0, 5, "없는업종") == []
+
+
+def test_add_existing_id_moves_point_and_compact_keeps_results():
+    index = NearbyStoreIndex(cell_deg=0.01)
+    index.add(1, 37.5, 127.0, "마트")
+    index.add(2, 37.5001, 127.0001, "마트")
+    index.add(1, 37.6, 127.1, "마트")
+    assert len(index) == 2
+    assert [id for id, _ in index.radius(37.5, 127.0, 100)] == [2]
+
+    index.remove(2)
+    index.compact()
+    assert index.dead == 0
+    assert [id for id, _ in index.nearest(37.5, 127.0, 5)] == [1]
@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+
+import pytest
+
+import service.pipeline_service as pipeline_service
+from service.pipeline_service import PipelineRunner, Stage, _fingerprint
+
+
+@pytest.fixture
+def runner_env(monkeypatch):
+    recorded = []
+    previous = {}
+
+    @contextmanager
+    def pooled_connection():
+        yield None
+
+    def record_stage_run(conn, run_id, stage, status, *args):
+        recorded.append((stage, status))
+
+    monkeypatch.setattr(pipeline_service, "pooled_connection", pooled_connection)
+    monkeypatch.setattr(pipeline_service, "ensure_stage_run_table", lambda conn: None)
+    monkeypatch.setattr(pipeline_service, "record_stage_run", record_stage_run)
+    monkeypatch.setattr(pipeline_service, "last_success", lambda conn, stage: previous.get(stage))
+
+    def install(stages):
+        monkeypatch.setattr(pipeline_service, "STAGES", stages)
+        monkeypatch.setattr(pipeline_service, "STAGE_NAMES", tuple(stage.name for stage in stages))
+
+    return install, previous, recorded
+
+
+def ok(ctx):
+    return {"rows": 1}
+
+
+def fail(ctx):
+    raise RuntimeError("boom")
+
+
+def test_failed_stage_blocks_descendants_only(runner_env):
+    install, _, _ = runner_env
+    install([
+        Stage("a", [], ok),
+        Stage("b", ["a"], fail),
+        Stage("c", ["b"], ok),
+        Stage("d", ["c"], ok),
+        Stage("e", ["a"], ok),
+    ])
+    results = PipelineRunner(workers=2).run()
+    assert {name: r["status"] for name, r in results.items()} == {
+        "a": "ok", "b": "failed", "c": "blocked", "d": "blocked", "e": "ok"}
+
+
+def test_unchanged_input_is_skipped_unless_forced(runner_env):
+    install, previous, recorded = runner_env
+    signature = {"rows": 3, "max_id": 9}
+    install([Stage("a", [], ok, lambda conn, ctx: signature)])
+    previous["a"] = {"run_id": "r0", "input_fingerprint": _fingerprint(signature)}
+
+    assert PipelineRunner().run()["a"]["status"] == "skipped"
+    assert PipelineRunner(force=True).run()["a"]["status"] == "ok"
+
+    signature["max_id"] = 10
+    assert PipelineRunner().run()["a"]["status"] == "ok"
+    assert recorded == [("a", "skipped"), ("a", "ok"), ("a", "ok")]
+
+
+def test_only_marks_other_stages_not_selected(runner_env):
+    install, _, _ = runner_env
+    install([Stage("a", [], ok), Stage("b", ["a"], ok), Stage("c", ["b"], ok)])
+    results = PipelineRunner(only=["b"]).run()
+    assert {name: r["status"] for name, r in results.items()} == {
+        "a": "not_selected", "b": "ok", "c": "not_selected"}
+
+
+def test_incomplete_stage_does_not_block(runner_env):
+    install, _, _ = runner_env
+    install([Stage("a", [], lambda ctx: {"rows": 1, "complete": False}), Stage("b", ["a"], ok)])
+    results = PipelineRunner().run()
+    assert (results["a"]["status"], results["b"]["status"]) == ("incomplete", "ok")
+
+
+def test_unknown_stage_is_rejected(runner_env):
+    install, _, _ = runner_env
+    install([Stage("a", [], ok)])
+    with pytest.raises(ValueError):
+        PipelineRunner(only=["nope"])
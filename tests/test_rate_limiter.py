@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+from util.rate_limiter import TokenBucketRateLimiter
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(0, 1)
+
+
+def test_rate_is_limited_after_burst():
+    limiter = TokenBucketRateLimiter(rate=50, max_in_flight=10, burst=5)
+
+    async def run():
+        started = time.monotonic()
+        for _ in range(15):
+            async with limiter:
+                pass
+        return time.monotonic() - started
+
+    # 버스트 5개는 바로, 나머지 10개는 초당 50개 → 약 0.2초
+    elapsed = asyncio.run(run())
+    assert 0.15 <= elapsed < 1.0
+
+
+def test_in_flight_is_bounded():
+    limiter = TokenBucketRateLimiter(rate=1000, max_in_flight=3, burst=100)
+    active = peak = 0
+
+    async def call():
+        nonlocal active, peak
+        async with limiter:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run():
+        await asyncio.gather(*[call() for _ in range(12)])
+
+    asyncio.run(run())
+    assert peak == 3
+
+
+def test_slot_released_when_cancelled_while_waiting_for_token():
+    limiter = TokenBucketRateLimiter(rate=1, max_in_flight=1, burst=1)
+
+    async def run():
+        async with limiter:
+            pass
+        waiter = asyncio.create_task(limiter.__aenter__())
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return limiter._in_flight.locked()
+
+    assert asyncio.run(run()) is False
@@ -0,0 +1,71 @@
+from db.raw_store_repository import fingerprint, map_item, upsert_store_data_bulk
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if "FROM local_store_fingerprint" in sql:
+            self._rows = [{"store_key": key, "content_hash": self.conn.fingerprints[key]}
+                          for key in params if key in self.conn.fingerprints]
+        return 0
+
+    def executemany(self, sql, params):
+        self.conn.pending.update(params)
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeConn:
+    def __init__(self, fingerprints=None):
+        self.fingerprints = dict(fingerprints or {})
+        self.pending = {}
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def begin(self):
+        self.pending = {}
+
+    def commit(self):
+        self.fingerprints.update(self.pending)
+
+    def rollback(self):
+        self.pending = {}
+
+
+def item(name, telno):
+    return {"affiliateNm": name, "lctnLotnoAddr": f"{name} 1", "insttCode": "A", "telno": telno}
+
+
+def test_counts_come_from_fingerprint_classification():
+    conn = FakeConn(dict([fingerprint(map_item(item("same", "1"))), fingerprint(map_item(item("edit", "1")))]))
+    items = [item("same", "1"), item("edit", "2"), item("new", "1"), item("new", "1")]
+
+    result = upsert_store_data_bulk(conn, items)
+
+    assert result == {"new": 1, "changed": 1, "skipped": 2,
+                      "inserted": 1, "updated": 1, "unchanged": 0, "failed": 0}
+    assert upsert_store_data_bulk(conn, items)["skipped"] == 4
+
+
+def test_keep_unchanged_writes_without_counting_as_update():
+    conn = FakeConn(dict([fingerprint(map_item(item("same", "1")))]))
+
+    result = upsert_store_data_bulk(conn, [item("same", "1")], skip_unchanged=False)
+
+    assert (result["skipped"], result["inserted"], result["updated"], result["unchanged"]) == (0, 0, 0, 1)
+
+
+def test_unwritten_columns_do_not_change_the_hash():
+    before = map_item({**item("a", "1"), "crtrYmd": "2024-01-01", "lctnRoadNmAddr": "길 1"})
+    after = map_item({**item("a", "1"), "crtrYmd": "2024-06-01", "lctnRoadNmAddr": "길 2"})
+    assert fingerprint(before) == fingerprint(after)
@@ -0,0 +1,30 @@
+from shard_map import rebalance, shard_totals, skew
+
+PAIRS = [("A", 500), ("B", 300), ("C", 200), ("D", 100), ("E", 100), ("F", 50), ("G", 50)]
+
+
+def test_rebalance_brings_skew_within_tolerance_with_few_moves():
+    current = {code: 1 for code, _ in PAIRS}
+    assignments, moves = rebalance(PAIRS, current, 2, tolerance=0.1, pinned={})
+
+    totals = shard_totals(assignments, dict(PAIRS), 2)
+    assert skew(totals) <= 0.1
+    assert sum(totals.values()) == sum(cnt for _, cnt in PAIRS)
+    assert all(assignments[code] == dst and src == 1 for code, src, dst, _ in moves)
+    assert {code for code, *_ in moves} <= {code for code, _ in PAIRS}
+
+
+def test_rebalance_keeps_balanced_map_unchanged():
+    current = {"A": 1, "F": 1, "B": 2, "C": 2, "G": 2, "D": 1, "E": 2}
+    assignments, moves = rebalance(PAIRS, current, 2, tolerance=0.1, pinned={})
+    assert moves == []
+    assert assignments == current
+
+
+def test_rebalance_respects_pins_and_places_new_codes():
+    current = {"A": 1, "B": 1}
+    assignments, moves = rebalance(PAIRS, current, 2, tolerance=0.2, pinned={"A": 1, "B": 1})
+    assert assignments["A"] == 1 and assignments["B"] == 1
+    assert set(assignments) == {code for code, _ in PAIRS}
+    # 신규 코드 배치는 이동으로 세지 않음
+    assert all(code in current for code, *_ in moves)
@@ -0,0 +1,35 @@
+import gzip
+import json
+
+from util.snapshot_archive import SnapshotWriter, _iter_complete_lines, iter_snapshot_pages
+
+
+def test_truncated_last_member_keeps_complete_lines(tmp_path, caplog):
+    writer = SnapshotWriter("run1", directory=str(tmp_path))
+    path = tmp_path / "run1" / "A.ndjson.gz"
+    writer.write_page("A", [{"n": 1}, {"n": 2}])
+    first_member = path.stat().st_size
+    writer.write_page("A", [{"n": n} for n in range(3, 500)])
+    # 두 번째 페이지(gzip member)를 쓰다가 죽은 것처럼 중간에서 자름
+    data = path.read_bytes()
+    path.write_bytes(data[:first_member + (len(data) - first_member) // 2])
+
+    lines = [json.loads(line) for line in _iter_complete_lines(str(path))]
+    assert lines[:2] == [{"n": 1}, {"n": 2}]
+    assert len(lines) < 499
+    assert [line["n"] for line in lines] == list(range(1, len(lines) + 1))
+    assert "잘려 있어" in caplog.text
+
+
+def test_partial_last_line_is_dropped(tmp_path):
+    path = tmp_path / "B.ndjson.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(b'{"n": 1}\n{"n": 2}\n{"n": 3')
+    assert [json.loads(line) for line in _iter_complete_lines(str(path))] == [{"n": 1}, {"n": 2}]
+
+
+def test_iter_snapshot_pages_splits_by_page_size(tmp_path):
+    writer = SnapshotWriter("run2", directory=str(tmp_path))
+    writer.write_page("A", [{"n": n} for n in range(5)])
+    pages = list(iter_snapshot_pages("run2", directory=str(tmp_path), page_size=2))
+    assert [(code, len(items)) for code, items in pages] == [("A", 2), ("A", 2), ("A", 1)]
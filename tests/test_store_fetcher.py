@@ -0,0 +1,78 @@
+import asyncio
+
+import api.store_fetcher as store_fetcher
+import service.store_sync_service as store_sync_service
+from api.store_fetcher import PageFetchError, iter_pages
+from util.failed_pages import FailedPageList, FailedPageQueue
+
+ROWS = store_fetcher.NUM_OF_ROWS
+
+
+def fake_source(monkeypatch, last_page, failing):
+    """totalCount 없는 응답: 1..last_page 페이지가 꽉 차 있고 failing에 있는 페이지는 실패"""
+    failing = set(failing)
+
+    async def fetch_page_body(session, instt_code, page, semaphore):
+        if page in failing:
+            raise PageFetchError(instt_code, page, "boom")
+        return {"items": [{"page": page}] * ROWS if page <= last_page else []}
+
+    async def fetch_page(session, instt_code, page, semaphore):
+        return (await fetch_page_body(session, instt_code, page, semaphore))["items"]
+
+    monkeypatch.setattr(store_fetcher, "fetch_page_body", fetch_page_body)
+    monkeypatch.setattr(store_fetcher, "fetch_page", fetch_page)
+    monkeypatch.setattr(store_sync_service, "fetch_page", fetch_page)
+    return failing
+
+
+def collect(instt_code, failed_pages, start_page=1):
+    async def run():
+        return [items[0]["page"] async for items in
+                iter_pages(None, instt_code, asyncio.Semaphore(1), failed_pages, start_page=start_page)]
+    return asyncio.run(run())
+
+
+def test_first_page_failure_queues_resume(monkeypatch):
+    fake_source(monkeypatch, last_page=5, failing={1})
+    failed = FailedPageList()
+    assert collect("A", failed) == []
+    assert failed.entries == [("A", 1, True)]
+
+
+def test_consecutive_failures_queue_resume_from_first_failed_page(monkeypatch):
+    fake_source(monkeypatch, last_page=10, failing={3, 4, 5})
+    failed = FailedPageList()
+    assert collect("A", failed) == [1, 2]
+    assert failed.entries == [("A", 3, True)]
+
+
+def test_isolated_failure_queues_single_page(monkeypatch):
+    fake_source(monkeypatch, last_page=6, failing={3})
+    failed = FailedPageList()
+    assert collect("A", failed) == [1, 2, 4, 5, 6]
+    assert failed.entries == [("A", 3, False)]
+
+
+def test_retry_failed_resumes_region(monkeypatch, tmp_path):
+    failing = fake_source(monkeypatch, last_page=10, failing={3, 4, 5})
+    queue = FailedPageQueue(str(tmp_path / "failed_pages.jsonl"))
+    collect("A", queue)
+    assert queue.load() == [("A", 3, True)]
+
+    failing.clear()
+    written = []
+
+    async def run_pipeline(produce, writer_count, queue_size, use_network=True):
+        q = asyncio.Queue()
+        await produce(None, q)
+        while not q.empty():
+            written.append(q.get_nowait()[1][0]["page"])
+        return {}
+
+    monkeypatch.setattr(store_sync_service, "_run_pipeline", run_pipeline)
+    monkeypatch.setattr(store_sync_service, "get_institution_codes", lambda: [{"code": "A", "region_name": "서울"}])
+    asyncio.run(store_sync_service.sync_failed_pages(failed_pages=queue))
+
+    assert written == list(range(3, 11))
+    assert queue.load() == []
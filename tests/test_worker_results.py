@@ -0,0 +1,27 @@
+import multiprocessing
+import os
+
+from util.worker_results import collect_results
+
+
+def _post_result(results):
+    results.put((multiprocessing.current_process().name, 42))
+
+
+def _die(results):
+    os._exit(9)
+
+
+def test_dead_process_is_reported_as_none():
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_post_result, args=(results,), name="ok-worker"),
+                 ctx.Process(target=_die, args=(results,), name="dead-worker")]
+    for process in processes:
+        process.start()
+    try:
+        collected = collect_results(processes, results, poll_seconds=0.2)
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+    assert collected == {"ok-worker": 42, "dead-worker": None}
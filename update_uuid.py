@@ -1,46 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
 import os
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple
 
-import pymysql
-from pymysql.cursors import DictCursor
-from dotenv import load_dotenv, find_dotenv
-
-# -------------------------
-# .env 로드
-# -------------------------
-load_dotenv(find_dotenv())
-
-def _env(primary: str, default: str = "", *alts: str) -> str:
-    for k in (primary, *alts):
-        v = os.getenv(k)
-        if v:
-            return v
-    return default
-
-MAIN = dict(
-    host=_env("DB_HOST", "127.0.0.1"),
-    port=int(_env("DB_PORT", "3307")),
-    user=_env("DB_USER", "root"),
-    password=_env("DB_PASSWORD", ""),
-    db=_env("DB_NAME", "sparta"),
-    charset="utf8mb4",
-)
-
-def connect_mysql(cfg: Dict[str, Any]):
-    return pymysql.connect(
-        host=cfg["host"],
-        port=int(cfg["port"]),
-        user=cfg["user"],
-        password=cfg["password"],
-        db=cfg["db"],
-        charset=cfg.get("charset", "utf8mb4"),
-        autocommit=False,
-        cursorclass=DictCursor,
-    )
+from db.connection import DB_CONFIG, get_pool, pooled_connection, run_in_transaction
+from db.shard_map_repository import institution_filter
+from util.checkpoint import CheckpointStore
 
 # -------------------------
 # UUID v4 채우기 (BINARY(16) 가정)
@@ -51,6 +21,7 @@ def update_uuid_v4_one_conn(conn, table_name: str) -> Tuple[int, int]:
     """
     null_count = 0
     updated = 0
+    conn.begin()
     with conn.cursor() as cursor:
         cursor.execute(f"SELECT id FROM {table_name} WHERE uuid IS NULL")
         rows: List[Dict[str, Any]] = cursor.fetchall()
@@ -68,15 +39,115 @@ def update_uuid_v4_one_conn(conn, table_name: str) -> Tuple[int, int]:
 
 def update_uuid_v4_all(table_name: str):
     # 메인 DB
-    print(f"[main:{MAIN['db']}] {table_name} 처리 시작")
-    main_conn = connect_mysql(MAIN)
-    try:
+    print(f"[main:{DB_CONFIG['db']}] {table_name} 처리 시작")
+    with pooled_connection() as main_conn:
         n, u = update_uuid_v4_one_conn(main_conn, table_name)
-        print(f"[main:{MAIN['db']}] NULL={n}, UPDATED={u}")
-    finally:
-        main_conn.close()
+        print(f"[main:{DB_CONFIG['db']}] NULL={n}, UPDATED={u}")
+
+
+# -------------------------
+# 시간 순서 UUID (v7)
+# -------------------------
+def uuid7_bytes() -> bytes:
+    """RFC 9562 UUIDv7: 앞 48bit가 unix ms 타임스탬프 → 인덱스에 순서대로 쌓여 페이지 분할이 적음"""
+    ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (ts_ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76                         # version
+    value |= ((rand >> 62) & 0xFFF) << 64      # rand_a (12bit)
+    value |= 0b10 << 62                        # variant
+    value |= rand & 0x3FFFFFFFFFFFFFFF         # rand_b (62bit)
+    return value.to_bytes(16, "big")
+
+
+def new_uuid_bytes(version: int) -> bytes:
+    return uuid7_bytes() if version == 7 else uuid.uuid4().bytes
+
+
+# -------------------------
+# 키셋 청크 단위 채우기
+# -------------------------
+# 샤드 워커용: 테이블별 기관코드 컬럼
+INSTITUTION_COLUMNS = {"local_store_cleaned": "institution_code", "institution_code": "code"}
+
+def backfill_uuid_chunked(conn, table_name: str, chunk_size: int = 5000, version: int = 4,
+                          institution_codes: List[str] = None, checkpoint: CheckpointStore = None) -> Tuple[int, int]:
+    """id 키셋으로 chunk_size개씩 읽어 → 값 목록과 JOIN한 UPDATE 한 번 → 청크마다 커밋.
+    institution_codes를 주면 해당 기관코드 행만 처리.
+    checkpoint를 주면 마지막으로 커밋된 청크 다음부터 이어서 처리.
+    return: (처리한 NULL 건수, 업데이트 성공 건수)
+    """
+    code_sql, code_params = institution_filter(INSTITUTION_COLUMNS.get(table_name, "institution_code"), institution_codes)
+    last_id = checkpoint.load().get("last_id", 0) if checkpoint else 0
+    null_count = 0
+    updated = 0
+    while True:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {table_name} WHERE id > %s AND uuid IS NULL {code_sql} ORDER BY id LIMIT %s",
+                (last_id, *code_params, chunk_size))
+            ids = [r["id"] for r in cursor.fetchall()]
+        if not ids:
+            break
+
+        staged = " UNION ALL ".join(["SELECT %s AS id, %s AS uuid"] * len(ids))
+        params: List[Any] = []
+        for row_id in ids:
+            params.extend((row_id, new_uuid_bytes(version)))
+
+        def update_chunk(conn):
+            with conn.cursor() as cursor:
+                return cursor.execute(f"""
+                    UPDATE {table_name} AS t
+                    JOIN ({staged}) AS v ON v.id = t.id
+                    SET t.uuid = v.uuid
+                    WHERE t.uuid IS NULL
+                """, params)
+
+        # 지오코딩 flush와 같은 행을 잠글 수 있음 → 데드락/락 대기 초과면 청크를 다시 실행
+        updated += run_in_transaction(conn, update_chunk)
+
+        null_count += len(ids)
+        last_id = ids[-1]
+        if checkpoint and checkpoint.due(len(ids)):
+            checkpoint.save({"last_id": last_id})
+        print(f"[main:{DB_CONFIG['db']}] {table_name} ~id {last_id}: UPDATED={updated}")
+    if checkpoint:
+        # 다 채웠으면 다음 실행은 처음부터 새로 생긴 NULL을 찾도록 초기화
+        checkpoint.save({"last_id": 0})
+    return (null_count, updated)
+
+def backfill_uuid_table(table_name: str, chunk_size: int, version: int, institution_codes: List[str] = None,
+                        checkpoint_prefix: str = "uuid"):
+    print(f"[main:{DB_CONFIG['db']}] {table_name} 처리 시작 (v{version}, chunk={chunk_size})")
+    checkpoint = CheckpointStore(f"{checkpoint_prefix}_{table_name}")
+    with pooled_connection() as conn:
+        n, u = backfill_uuid_chunked(conn, table_name, chunk_size, version, institution_codes, checkpoint)
+    print(f"[main:{DB_CONFIG['db']}] {table_name} NULL={n}, UPDATED={u}")
+    return n, u
+
+def backfill_uuid_parallel(tables: List[str], chunk_size: int, version: int, institution_codes: List[str] = None,
+                           checkpoint_prefix: str = "uuid"):
+    """테이블마다 별도 스레드/커넥션으로 동시에 채움"""
+    with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+        futures = {t: executor.submit(backfill_uuid_table, t, chunk_size, version, institution_codes,
+                                      checkpoint_prefix)
+                   for t in tables}
+        return {t: f.result() for t, f in futures.items()}
 
 
 if __name__ == "__main__":
-    update_uuid_v4_all("local_store_cleaned")
-    update_uuid_v4_all("institution_code")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="uuid IS NULL 행에 UUID(BINARY(16)) 채우기")
+    parser.add_argument("--tables", nargs="+", default=["local_store_cleaned", "institution_code"])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--uuid-version", type=int, choices=(4, 7), default=4)
+    parser.add_argument("--single-transaction", action="store_true",
+                        help="기존 방식(전체 조회 후 한 트랜잭션에서 행마다 UPDATE, v4)")
+    args = parser.parse_args()
+
+    if args.single_transaction:
+        for table in args.tables:
+            update_uuid_v4_all(table)
+    else:
+        backfill_uuid_parallel(args.tables, args.chunk_size, args.uuid_version)
+    print("[pool]", get_pool().metrics())
\ No newline at end of file
@@ -0,0 +1,66 @@
+import re
+import unicodedata
+
+# 시도 약칭 → 정식 명칭 (첫 토큰만 변환)
+SIDO_ALIASES = {
+    "서울": "서울특별시", "서울시": "서울특별시",
+    "부산": "부산광역시", "부산시": "부산광역시",
+    "대구": "대구광역시", "대구시": "대구광역시",
+    "인천": "인천광역시", "인천시": "인천광역시",
+    "광주": "광주광역시", "광주시": "광주광역시",
+    "대전": "대전광역시", "대전시": "대전광역시",
+    "울산": "울산광역시", "울산시": "울산광역시",
+    "세종": "세종특별자치시", "세종시": "세종특별자치시",
+    "경기": "경기도", "강원": "강원특별자치도", "강원도": "강원특별자치도",
+    "충북": "충청북도", "충남": "충청남도",
+    "전북": "전북특별자치도", "전라북도": "전북특별자치도", "전남": "전라남도",
+    "경북": "경상북도", "경남": "경상남도",
+    "제주": "제주특별자치도", "제주도": "제주특별자치도",
+}
+
+_PARENS = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_FLOOR = re.compile(r"(지하|지상)?\s*\d+\s*층|\bB\d+\b|\d+\s*호(?=\s|$|,)", re.IGNORECASE)
+_BASEMENT = re.compile(r"(?<=\s)지하(?=\s*\d)")
+_DASH = re.compile(r"\s*-\s*")
+_SPACES = re.compile(r"\s+")
+# 도로명주소: ...로/길 + 건물번호(부번) / 지번주소: ...동/리/가 + (산) 번지(부번)
+_ROAD_NUMBER = re.compile(r"^(.*?\S(?:로|길)\s*\d+(?:-\d+)?)(?=\s|,|$)")
+_LOT_NUMBER = re.compile(r"^(.*?\S(?:동|리|가)\s*(?:산\s*)?\d+(?:-\d+)?)(?=\s|,|$)")
+
+
+def canonicalize(address: str) -> str:
+    """
+    지오코딩용 주소 정규화. 같은 건물을 가리키는 표기 차이를 하나로 모음.
+    - 괄호 참고항목, 쉼표 뒤 상세주소, 층/호/지하 표기 제거
+    - 건물번호(번지) 뒤의 건물명/동호수 제거
+    - 시도 약칭을 정식 명칭으로, 공백/하이픈 정리
+    """
+    if not address:
+        return ""
+    text = unicodedata.normalize("NFC", address)
+    text = _PARENS.sub(" ", text)
+    text = text.split(",")[0]
+    text = _FLOOR.sub(" ", text)
+    text = _BASEMENT.sub(" ", text)
+    text = _DASH.sub("-", text)
+    text = _SPACES.sub(" ", text).strip()
+
+    match = _ROAD_NUMBER.match(text) or _LOT_NUMBER.match(text)
+    if match:
+        text = match.group(1)
+
+    tokens = text.split(" ")
+    if tokens and tokens[0] in SIDO_ALIASES:
+        tokens[0] = SIDO_ALIASES[tokens[0]]
+    return " ".join(tokens)
+
+
+def group_by_canonical(rows, key="address"):
+    """
+    rows를 정규화 주소 기준으로 묶음 (처음 나온 순서 유지).
+    return: {정규화 주소: [row, ...]} - 정규화 결과가 빈 행은 "" 키로 모임
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(canonicalize(row.get(key)), []).append(row)
+    return groups
@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "checkpoints")
+CHECKPOINT_EVERY_ROWS = int(os.getenv("CHECKPOINT_EVERY_ROWS", "1000"))
+CHECKPOINT_EVERY_SECONDS = float(os.getenv("CHECKPOINT_EVERY_SECONDS", "30"))
+
+
+class CheckpointStore:
+    """
+    작업(namespace)별 체크포인트 파일. checkpoints/<namespace>.json
+    - 임시 파일에 쓰고 fsync 후 os.replace → 중간에 죽어도 이전 체크포인트가 그대로 남음
+    - every_rows행 또는 every_seconds초마다 DB 커밋과 함께 저장
+    """
+
+    def __init__(self, namespace: str, directory: str = CHECKPOINT_DIR,
+                 every_rows: int = CHECKPOINT_EVERY_ROWS, every_seconds: float = CHECKPOINT_EVERY_SECONDS):
+        os.makedirs(directory, exist_ok=True)
+        self.namespace = namespace
+        self.directory = directory
+        self.path = os.path.join(directory, f"{namespace}.json")
+        self.every_rows = every_rows
+        self.every_seconds = every_seconds
+        self._pending_rows = 0
+        self._last_saved = time.monotonic()
+
+    def load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, state: dict):
+        data = {**state, "last_updated": datetime.now().isoformat(timespec="seconds")}
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.namespace}.", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        dir_fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        self.reset()
+
+    def reset(self):
+        """저장 주기 카운터 초기화 (저장할 내용이 없을 때도 호출)"""
+        self._pending_rows = 0
+        self._last_saved = time.monotonic()
+
+    def due(self, rows: int = 0) -> bool:
+        """rows만큼 진행했음을 기록하고, 저장할 시점인지 반환"""
+        self._pending_rows += rows
+        return (self._pending_rows >= self.every_rows
+                or time.monotonic() - self._last_saved >= self.every_seconds)
+
+    def commit(self, conn, state: dict):
+        """DB 커밋이 성공한 뒤에만 체크포인트 저장 → 체크포인트는 항상 DB보다 뒤처지거나 같음"""
+        if conn is not None:
+            conn.commit()
+        self.save(state)
+
+
+class ContiguousTracker:
+    """
+    비동기 처리처럼 완료 순서가 뒤섞일 때, 앞쪽이 모두 끝난 가장 큰 id를 추적.
+    (그 id까지는 재시작해도 다시 처리할 필요가 없음)
+    """
+
+    def __init__(self, ordered_ids):
+        self._ids = list(ordered_ids)
+        self._positions = {row_id: pos for pos, row_id in enumerate(self._ids)}
+        self._done = set()
+        self._pos = 0
+        self._limit = len(self._ids)
+
+    @property
+    def safe_id(self):
+        end = min(self._pos, self._limit)
+        return self._ids[end - 1] if end else None
+
+    def mark_done(self, row_id):
+        self._done.add(row_id)
+        while self._pos < len(self._ids) and self._ids[self._pos] in self._done:
+            self._done.discard(self._ids[self._pos])
+            self._pos += 1
+
+    def hold(self, row_ids):
+        """끝났지만 저장하지 못한 행: safe_id가 이 행들 앞에서 멈춤 → 재시작 시 다시 처리"""
+        for row_id in row_ids:
+            self._limit = min(self._limit, self._positions.get(row_id, self._limit))
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+FAILED_PAGES_FILE = os.getenv("FAILED_PAGES_FILE", "failed_pages.jsonl")
+
+
+class FailedPageQueue:
+    """
+    재시도 후에도 실패한 (기관코드, 페이지)를 쌓아두는 JSONL 파일.
+    --retry-failed 실행 때 다시 꺼내 처리하고, 그래도 실패한 것만 남김.
+    resume=True 항목은 "그 페이지부터 지역 끝까지 다시 받기" (전체 페이지 수를 모르고 중단된 경우)
+    """
+
+    def __init__(self, path: str = FAILED_PAGES_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def add(self, instt_code, page, reason: str = "", resume: bool = False):
+        entry = {"instt_code": instt_code, "page": page, "reason": reason, "resume": resume,
+                 "failed_at": datetime.now().isoformat(timespec="seconds")}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def load(self):
+        """중복을 제거한 [(instt_code, page, resume)] (기록 순서 유지)"""
+        if not os.path.exists(self.path):
+            return []
+        entries = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = (entry["instt_code"], int(entry["page"]))
+                    entries[key] = entries.get(key, False) or bool(entry.get("resume"))
+        return [(instt_code, page, resume) for (instt_code, page), resume in entries.items()]
+
+    def replace(self, remaining):
+        """처리 후 남은 항목으로 파일을 원자적으로 교체"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".failed_pages.")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for instt_code, page, resume in remaining:
+                    f.write(json.dumps({"instt_code": instt_code, "page": page, "resume": resume},
+                                       ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+
+
+class FailedPageList:
+    """재처리 중 다시 실패한 항목을 메모리에 모음 (FailedPageQueue.add와 같은 모양, replace에 그대로 넘김)"""
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, instt_code, page, reason: str = "", resume: bool = False):
+        self.entries.append((instt_code, page, resume))
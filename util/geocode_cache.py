@@ -0,0 +1,126 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from util.metrics import inc
+
+load_dotenv()
+CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "cache/geocode_cache.sqlite3")
+CACHE_TTL_DAYS = float(os.getenv("GEOCODE_CACHE_TTL_DAYS", "90"))
+CACHE_NEGATIVE_TTL_DAYS = float(os.getenv("GEOCODE_CACHE_NEGATIVE_TTL_DAYS", "7"))
+CACHE_MAX_ENTRIES = int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "2000000"))
+
+MISSING = object()
+
+
+def normalize_address(address: str) -> str:
+    """캐시 키용 주소 정규화: 앞뒤 공백 제거 + 연속 공백 하나로"""
+    return " ".join((address or "").split())
+
+
+class GeocodeCache:
+    """
+    주소 → 조회 결과를 로컬 SQLite 파일에 저장하는 캐시. (카카오/도로명주소 API 공용)
+    namespace로 API를 구분하고, 결과 없음(None)도 네거티브 캐시로 저장함.
+    - TTL: 성공 결과 CACHE_TTL_DAYS, 네거티브 결과 CACHE_NEGATIVE_TTL_DAYS
+    - 용량: CACHE_MAX_ENTRIES 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+    """
+
+    def __init__(self, path: str = CACHE_PATH, ttl_days: float = CACHE_TTL_DAYS,
+                 negative_ttl_days: float = CACHE_NEGATIVE_TTL_DAYS, max_entries: int = CACHE_MAX_ENTRIES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl_days * 86400
+        self.negative_ttl = negative_ttl_days * 86400
+        self.max_entries = max_entries
+        self.stats = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                namespace TEXT NOT NULL,
+                address TEXT NOT NULL,
+                value TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, address)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_geocode_cache_access ON geocode_cache (last_access)")
+
+    def _count(self, namespace: str, key: str):
+        ns = self.stats.setdefault(namespace, {"hit": 0, "miss": 0})
+        ns[key] += 1
+        inc("geocode_cache_total", namespace=namespace, result=key)
+
+    def get(self, namespace: str, address: str):
+        """
+        캐시된 값을 반환. 없거나 만료되면 MISSING 반환.
+        네거티브 결과는 None으로 반환되므로 MISSING과 구분해서 써야 함.
+        """
+        key = normalize_address(address)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM geocode_cache WHERE namespace = ? AND address = ?",
+                (namespace, key)).fetchone()
+            if row is None or row[1] < now:
+                self._count(namespace, "miss")
+                return MISSING
+            self._conn.execute(
+                "UPDATE geocode_cache SET last_access = ? WHERE namespace = ? AND address = ?",
+                (now, namespace, key))
+            self._count(namespace, "hit")
+        return None if row[0] is None else json.loads(row[0])
+
+    def set(self, namespace: str, address: str, value):
+        key = normalize_address(address)
+        now = time.time()
+        ttl = self.negative_ttl if value is None else self.ttl
+        encoded = None if value is None else json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (namespace, address, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, encoded, now + ttl, now))
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM geocode_cache WHERE expires_at < ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute("""
+                DELETE FROM geocode_cache WHERE rowid IN (
+                    SELECT rowid FROM geocode_cache ORDER BY last_access ASC LIMIT ?
+                )
+            """, (overflow,))
+
+    def report(self) -> str:
+        parts = []
+        for namespace, s in sorted(self.stats.items()):
+            total = s["hit"] + s["miss"]
+            ratio = s["hit"] / total if total else 0
+            parts.append(f"{namespace}: hit={s['hit']}, miss={s['miss']} ({ratio:.1%})")
+        return "캐시 " + (", ".join(parts) if parts else "사용 없음")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> GeocodeCache:
+    """프로세스 단위로 공유하는 기본 캐시 인스턴스"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = GeocodeCache()
+        return _cache
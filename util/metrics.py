@@ -0,0 +1,179 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_DIR = os.getenv("METRICS_DIR", "metrics")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SAMPLE_SIZE = 10000
+
+
+def _label_key(labels: dict):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = []  # p50/p99 계산용 reservoir sample
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        if len(self.samples) < SAMPLE_SIZE:
+            self.samples.append(value)
+        else:
+            j = random.randrange(self.count)
+            if j < SAMPLE_SIZE:
+                self.samples[j] = value
+
+    def quantile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    """
+    배치 단계 공용 지표 저장소 (counter / gauge / histogram, 라벨 지원).
+    실행이 끝나면 Prometheus textfile과 JSON 요약으로 내보냄.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            if key not in self.histograms:
+                self.histograms[key] = _Histogram(buckets)
+            self.histograms[key].observe(value)
+
+    def counter_total(self, name, **labels):
+        """labels가 일치하는 name 카운터 합계 (나머지 라벨은 모두 합침)"""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(value for (n, key), value in self.counters.items()
+                       if n == name and wanted <= set(key))
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.counters, self.gauges, self.histograms = {}, {}, {}
+
+    def to_prometheus(self, prefix="sparta_batch_"):
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for kind, items in (("counter", self.counters), ("gauge", self.gauges)):
+                typed = set()
+                for (name, labels), value in sorted(items.items()):
+                    if name not in typed:
+                        lines.append(f"# TYPE {prefix}{name} {kind}")
+                        typed.add(name)
+                    lines.append(f"{prefix}{name}{fmt(labels)} {value}")
+            typed = set()
+            for (name, labels), h in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {prefix}{name} histogram")
+                    typed.add(name)
+                for bound, count in zip(h.buckets, h.counts):
+                    lines.append(f"{prefix}{name}_bucket{fmt(labels, [('le', bound)])} {count}")
+                lines.append(f"{prefix}{name}_bucket{fmt(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{prefix}{name}_sum{fmt(labels)} {h.sum}")
+                lines.append(f"{prefix}{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        elapsed = time.time() - self.started_at
+
+        def name_of(name, labels):
+            return name + "".join(f"[{k}={v}]" for k, v in labels)
+
+        with self._lock:
+            counters = {name_of(n, l): v for (n, l), v in sorted(self.counters.items())}
+            rates = {name_of(n, l): v / elapsed for (n, l), v in sorted(self.counters.items())
+                     if n.startswith("rows_") and elapsed > 0}
+            gauges = {name_of(n, l): v for (n, l), v in sorted(self.gauges.items())}
+            histograms = {
+                name_of(n, l): {"count": h.count, "sum": round(h.sum, 6),
+                                "avg": h.sum / h.count if h.count else None,
+                                "p50": h.quantile(0.5), "p99": h.quantile(0.99)}
+                for (n, l), h in sorted(self.histograms.items())
+            }
+        return {"elapsed_seconds": round(elapsed, 3), "counters": counters,
+                "rows_per_second": rates, "gauges": gauges, "histograms": histograms}
+
+
+REGISTRY = MetricsRegistry()
+inc = REGISTRY.inc
+set_gauge = REGISTRY.set_gauge
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+
+
+def record_http(endpoint, status, seconds):
+    """HTTP 호출 1회 기록. status는 응답 코드 또는 'timeout'/'error'"""
+    REGISTRY.inc("http_requests_total", endpoint=endpoint, status=status)
+    REGISTRY.observe("http_request_seconds", seconds, endpoint=endpoint, status=status)
+
+
+def _atomic_write(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics.")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_run_metrics(job: str, directory: str = METRICS_DIR, extra: dict = None):
+    """
+    metrics/<job>.prom (node_exporter textfile collector용, 매번 덮어씀)
+    metrics/<job>_<시각>.json (실행별 요약)
+    return: 요약 dict
+    """
+    summary = {"job": job, "finished_at": datetime.now().isoformat(timespec="seconds"),
+               **REGISTRY.summary(), **(extra or {})}
+    _atomic_write(os.path.join(directory, f"{job}.prom"), REGISTRY.to_prometheus())
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    _atomic_write(os.path.join(directory, f"{job}_{stamp}.json"),
+                  json.dumps(summary, ensure_ascii=False, indent=2, default=str))
+    return summary
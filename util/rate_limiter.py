@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+
+class TokenBucketRateLimiter:
+    """
+    초당 요청 수(rate)와 동시 요청 수(max_in_flight)를 함께 제한하는 토큰 버킷.
+    async with limiter: 로 감싸면 토큰 1개를 소비하고 in-flight 슬롯을 점유함.
+    """
+
+    def __init__(self, rate: float, max_in_flight: int, burst: int = None):
+        if rate <= 0:
+            raise ValueError("rate는 0보다 커야 합니다.")
+        self.rate = rate
+        self.capacity = burst if burst else max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire_token(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def __aenter__(self):
+        await self._in_flight.acquire()
+        try:
+            await self.acquire_token()
+        except BaseException:
+            self._in_flight.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._in_flight.release()
@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import zlib
+from datetime import datetime
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+REPLAY_PAGE_SIZE = 1500
+
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+class SnapshotWriter:
+    """
+    수집한 원본 응답 items를 실행(run_id)·기관코드별 gzip NDJSON으로 보관.
+    snapshots/<run_id>/<instt_code>.ndjson.gz 에 페이지 단위로 이어 붙임 (append-only).
+    """
+
+    def __init__(self, run_id: str = None, directory: str = SNAPSHOT_DIR):
+        self.run_id = run_id or new_run_id()
+        self.path = os.path.join(directory, self.run_id)
+        os.makedirs(self.path, exist_ok=True)
+
+    def write_page(self, instt_code, items):
+        if not items:
+            return
+        path = os.path.join(self.path, f"{instt_code}.ndjson.gz")
+        # 페이지마다 gzip member를 하나씩 추가 → 중간에 죽어도 앞쪽 페이지는 온전함
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+def list_runs(directory: str = SNAPSHOT_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d)))
+
+
+def resolve_run_id(run_id: str, directory: str = SNAPSHOT_DIR) -> str:
+    """'latest'면 가장 최근 실행 id"""
+    if run_id != "latest":
+        return run_id
+    runs = list_runs(directory)
+    if not runs:
+        raise FileNotFoundError(f"{directory}에 스냅샷이 없습니다.")
+    return runs[-1]
+
+
+def _iter_complete_lines(path):
+    """
+    gzip NDJSON 파일의 완전한 줄(bytes)만 순서대로.
+    쓰는 도중 죽어서 마지막 gzip member가 잘렸으면 그 전까지 풀린 줄만 쓰고,
+    줄바꿈 없이 끊긴 마지막 줄은 버림 (경고 로그)
+    """
+    try:
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    logging.warning(f"스냅샷 마지막 줄이 잘려 있어 건너뜀: {path}")
+                    return
+                yield line
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        logging.warning(f"스냅샷 파일이 잘려 있어 온전한 부분까지만 읽음: {path} ({e})")
+
+
+def iter_snapshot_pages(run_id: str, directory: str = SNAPSHOT_DIR, page_size: int = REPLAY_PAGE_SIZE):
+    """스냅샷을 (instt_code, items) 페이지 단위로 다시 읽음. 잘린 파일은 온전한 줄까지만"""
+    path = os.path.join(directory, resolve_run_id(run_id, directory))
+    for name in sorted(os.listdir(path)):
+        if not name.endswith(".ndjson.gz"):
+            continue
+        instt_code = name[:-len(".ndjson.gz")]
+        page = []
+        for line in _iter_complete_lines(os.path.join(path, name)):
+            if line.strip():
+                page.append(json.loads(line))
+            if len(page) >= page_size:
+                yield instt_code, page
+                page = []
+        if page:
+            yield instt_code, page
+
+
+def snapshot_fingerprint(run_id: str, directory: str = SNAPSHOT_DIR):
+    """
+    스냅샷 내용(압축 해제 기준) 해시와 건수. gzip 헤더 시각과 무관하게 내용이 같으면 같은 값.
+    return: (sha1 hex, items 수)
+    """
+    path = os.path.join(directory, resolve_run_id(run_id, directory))
+    digest = hashlib.sha1()
+    items = 0
+    for name in sorted(os.listdir(path)):
+        if not name.endswith(".ndjson.gz"):
+            continue
+        digest.update(name.encode("utf-8"))
+        for line in _iter_complete_lines(os.path.join(path, name)):
+            if line.strip():
+                digest.update(line)
+                items += 1
+    return digest.hexdigest(), items
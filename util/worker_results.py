@@ -0,0 +1,41 @@
+import logging
+import queue
+
+POLL_SECONDS = 5.0
+
+
+def collect_results(processes, results, poll_seconds=POLL_SECONDS):
+    """
+    워커 프로세스마다 results 큐에 (process.name, 결과)를 하나씩 넣는다고 보고 모두 모음.
+    결과를 넣기 전에 죽은 프로세스(OOM kill, segfault, put 전 예외 등)는 끝없이 기다리지 않고
+    poll_seconds마다 확인해서 None으로 채움.
+    return: {process.name: 결과 또는 None}
+    """
+    pending = {p.name: p for p in processes}
+    collected = {}
+
+    def take(name, value):
+        collected[name] = value
+        pending.pop(name, None)
+
+    while pending:
+        try:
+            take(*results.get(timeout=poll_seconds))
+            continue
+        except queue.Empty:
+            pass
+        dead = [name for name, p in pending.items() if not p.is_alive()]
+        if not dead:
+            continue
+        # 종료 직전에 넣은 결과가 아직 큐에 남아 있을 수 있으므로 먼저 비움
+        while True:
+            try:
+                take(*results.get(timeout=0.1))
+            except queue.Empty:
+                break
+        for name in dead:
+            if name in pending:
+                process = pending.pop(name)
+                logging.error(f"{name} 프로세스가 결과 없이 종료됨 (exitcode={process.exitcode})")
+                collected[name] = None
+    return collected